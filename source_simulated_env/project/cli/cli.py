@@ -1,11 +1,33 @@
+import time
+
 import click
-from tasks import (app, revoke_task, simulate_client_data,
+from benchmark import (BATCH_SIZES, BENCHMARK_DIR, CONCURRENCY_LEVELS,
+                       DEFAULT_OPERATIONS, DEFAULT_REPEAT, DEFAULT_TOLERANCE,
+                       GENERATOR_QUANTITIES, SUITES, baseline_path,
+                       benchmark_target, compare_to_baseline, load_baseline,
+                       open_actions, run_action_suite, run_generator_suite,
+                       save_baseline)
+from dataset import (DEFAULT_SEED_BATCH_SIZE, DEFAULT_SHARD_SIZE, FORMATS,
+                     export_dataset, seed_database)
+from rate_limiter import RateSchedule
+from results import DEFAULT_THRESHOLD, ResultsStore, compare_runs, diff_configs
+from saturation import (DEFAULT_INCREASE, DEFAULT_INTERVAL, DEFAULT_START_RATE,
+                        DEFAULT_TARGET_P99)
+from simulator import ACTIONS
+from tasks import (get_ids_tasks_in_progress, get_registry, get_tasks_progress,
+                   revoke_group, revoke_tasks, simulate_client_data,
                    simulate_delivery_data, simulate_driver_data,
-                   simulate_location_data, simulate_product_data,
-                   simulate_vehicle_data)
+                   simulate_in_parallel, simulate_location_data,
+                   simulate_product_data, simulate_profile_data,
+                   simulate_vehicle_data, sync_registry)
 from termcolor import colored
-from utils import (format_info_number_interactions, print_result_list,
-                   print_result_run, print_running_actions, task_elapsed_time)
+from utils import (format_info_number_interactions, format_task_progress,
+                   print_result_benchmark, print_result_comparison,
+                   print_result_export, print_result_fanout, print_result_list,
+                   print_result_run, print_result_runs, print_result_seed,
+                   print_result_summary, print_running_actions,
+                   task_elapsed_time)
+from workload import WorkloadProfile
 
 MODELS_MAPPING = {
     'driver': simulate_driver_data,
@@ -17,6 +39,44 @@ MODELS_MAPPING = {
 }
 
 
+def parse_action_mix(ctx, param, value: str | None) -> dict | None:
+    """
+    Parse an action mix such as ``read=70,update=20,create=10`` into a
+    mapping of the actions to their weights.
+    """
+    if not value:
+        return None
+
+    action_mix = {}
+    for item in value.split(','):
+        action, _, weight = item.partition('=')
+        action = action.strip().lower()
+        try:
+            action_mix[action] = float(weight)
+        except ValueError:
+            raise click.BadParameter(f'invalid weight in "{item.strip()}"')
+        if action not in ACTIONS:
+            raise click.BadParameter(
+                f'"{action}" is not one of {", ".join(ACTIONS)}'
+            )
+        if action_mix[action] < 0:
+            raise click.BadParameter(f'negative weight in "{item.strip()}"')
+    return action_mix
+
+
+def parse_sizes(ctx, param, value: str | None) -> tuple | None:
+    """Parse a list of positive integers such as ``1,50,500``."""
+    if not value:
+        return None
+    try:
+        sizes = tuple(int(size) for size in value.split(','))
+    except ValueError:
+        raise click.BadParameter(f'"{value}" is not a list of integers')
+    if min(sizes) < 1:
+        raise click.BadParameter(f'"{value}" has a size below 1')
+    return sizes
+
+
 @click.group()
 def cli():
     pass
@@ -49,7 +109,7 @@ def cli():
     '-t',
     '--time-action',
     default=None,
-    type=int,
+    type=click.FloatRange(min=0),
     help=('Maximum time for each interaction (in seconds).'),
 )
 @click.option(
@@ -57,8 +117,21 @@ def cli():
     '--custom-actions',
     default=None,
     multiple=True,
-    type=click.Choice(['create', 'update', 'delete'], case_sensitive=False),
-    help=('Specify custom actions (create, update, delete).'),
+    type=click.Choice(ACTIONS, case_sensitive=False),
+    help=(
+        'Specify custom actions (create, update, delete, read, lookup, '
+        'range, aggregate).'
+    ),
+)
+@click.option(
+    '-m',
+    '--action-mix',
+    default=None,
+    callback=parse_action_mix,
+    help=(
+        'Weighted action mix, e.g. "read=70,update=20,create=10" '
+        '(replaces --custom-actions).'
+    ),
 )
 @click.option(
     '-e',
@@ -74,75 +147,480 @@ def cli():
     type=int,
     help=('Total number of interactions to simulate.'),
 )
+@click.option(
+    '-p',
+    '--pool-size',
+    envvar='MONGODB_POOL_SIZE',
+    default=100,
+    type=click.IntRange(min=1),
+    help=('Maximum number of pooled connections per worker process.'),
+)
+@click.option(
+    '--pool-idle-timeout',
+    envvar='MONGODB_POOL_IDLE_TIMEOUT',
+    default=None,
+    type=click.FloatRange(min=0),
+    help=('Seconds an idle pooled connection is kept open.'),
+)
+@click.option(
+    '--keep-pool/--close-pool',
+    default=True,
+    help=(
+        'Keep the connection pool open in the worker for the next '
+        'simulations, or close it when the simulation ends.'
+    ),
+)
+@click.option(
+    '-b',
+    '--batch-size',
+    default=None,
+    type=click.IntRange(min=1),
+    help=(
+        'Number of interactions sent together in one unordered bulk write '
+        '(one interaction per request if omitted).'
+    ),
+)
+@click.option(
+    '-k',
+    '--key-distribution',
+    default='uniform',
+    type=click.Choice(['uniform', 'zipf', 'hotset'], case_sensitive=False),
+    help=(
+        'How update and delete targets are picked among the known documents '
+        '(zipf and hotset favor the most recent ones).'
+    ),
+)
+@click.option(
+    '--key-skew',
+    default=None,
+    type=click.FloatRange(min=0),
+    help=(
+        'Zipf exponent (default 1.0) or share of the picks going to the '
+        'hot set (default 0.8).'
+    ),
+)
+@click.option(
+    '--reservoir-size',
+    default=100_000,
+    type=click.IntRange(min=1),
+    help=('Maximum number of known document ids kept per collection.'),
+)
+@click.option(
+    '-r',
+    '--rate',
+    default=None,
+    type=click.FloatRange(min=0, min_open=True),
+    help=('Target throughput of each simulation (operations per second).'),
+)
+@click.option(
+    '--rate-schedule',
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help=(
+        'JSON file of ramps, plateaus and spikes of the target throughput '
+        '(replaces --rate; the simulation ends with the schedule).'
+    ),
+)
+@click.option(
+    '--profile',
+    default=None,
+    type=click.Path(exists=True, dir_okay=False),
+    help=(
+        'YAML workload profile: run its models as one weighted stream with '
+        'its action mixes, rate, key skew, document sizes and duration '
+        '(replaces MODELS and the options of the run).'
+    ),
+)
+@click.option(
+    '-c',
+    '--concurrency',
+    default=1,
+    type=click.IntRange(min=1),
+    help=(
+        'Number of concurrent virtual clients of each simulation, sharing '
+        'at most 64 request threads; --pool-size is raised to match.'
+    ),
+)
+@click.option(
+    '--parallel',
+    default=1,
+    type=click.IntRange(min=1),
+    help=(
+        'Split each simulation (interactions and rate) into N parallel '
+        'subtasks whose results are aggregated.'
+    ),
+)
+@click.option(
+    '--slice',
+    'slice_seconds',
+    default=None,
+    type=click.FloatRange(min=0, min_open=True),
+    help=(
+        'Run each simulation in slices of N seconds: after each slice the '
+        'task checkpoints its state and re-enqueues itself, so long '
+        'simulations share the workers and stop at a slice boundary when '
+        'revoked with --graceful.'
+    ),
+)
+@click.option(
+    '--slice-ops',
+    'slice_operations',
+    default=None,
+    type=click.IntRange(min=1),
+    help='Run each simulation in slices of N actions (see --slice).',
+)
+@click.option(
+    '--find-max',
+    is_flag=True,
+    help=(
+        'Search the highest throughput sustained under --target-p99: the '
+        'rate starts at --rate and grows by --step-rate every '
+        '--step-seconds, backing off by half when the p99 goes over. Waits '
+        'for the search and shows its latency curve.'
+    ),
+)
+@click.option(
+    '--target-p99',
+    default=DEFAULT_TARGET_P99,
+    show_default=True,
+    type=click.FloatRange(min=0, min_open=True),
+    help='p99 latency target of --find-max, in milliseconds.',
+)
+@click.option(
+    '--step-rate',
+    default=DEFAULT_INCREASE,
+    show_default=True,
+    type=click.FloatRange(min=0, min_open=True),
+    help='Rate increase of each --find-max step (operations per second).',
+)
+@click.option(
+    '--step-seconds',
+    default=DEFAULT_INTERVAL,
+    show_default=True,
+    type=click.FloatRange(min=0, min_open=True),
+    help='Duration of each --find-max step, in seconds.',
+)
+@click.option(
+    '--metrics-interval',
+    default=0,
+    type=click.FloatRange(min=0),
+    help=(
+        'Seconds between two exports of the latency and throughput metrics '
+        'to METRICS_DIR in the Prometheus text format, removed when the run '
+        'ends. Default is 0, no export.'
+    ),
+)
+@click.option(
+    '--prefetch',
+    'prefetch_depth',
+    default=0,
+    type=click.IntRange(min=0),
+    help=(
+        'Number of documents generated ahead by a background thread, so '
+        'data generation is off the write path, e.g. 1000 (0 disables it).'
+    ),
+)
+@click.option(
+    '--templates',
+    'template_pool_size',
+    default=0,
+    type=click.IntRange(min=0),
+    help=(
+        'Insert copies of N pre-encoded BSON documents with a new _id '
+        'instead of encoding each insert (0 disables it).'
+    ),
+)
+@click.option(
+    '--log-sample',
+    type=click.IntRange(min=1),
+    default=None,
+    help=(
+        'Log one action out of N (errors are always logged). Defaults to '
+        'LOG_SAMPLE_RATE.'
+    ),
+)
+@click.option(
+    '--log-json',
+    is_flag=True,
+    default=None,
+    help='Write the log as compact JSON lines. Defaults to LOG_JSON.',
+)
+@click.option(
+    '-l',
+    '--label',
+    default=None,
+    help=(
+        'Label of the run in the results store, e.g. the MongoDB '
+        'configuration under test (see simulate-report).'
+    ),
+)
+@click.option(
+    '-w',
+    '--wait',
+    is_flag=True,
+    help=('Wait for the simulations to finish and show their summary.'),
+)
 def run(
     models,
     db_address,
     db_name,
     time_action,
     custom_actions,
+    action_mix,
     editing_grade,
     quantity_interactions,
+    pool_size,
+    pool_idle_timeout,
+    keep_pool,
+    batch_size,
+    key_distribution,
+    key_skew,
+    reservoir_size,
+    rate,
+    rate_schedule,
+    profile,
+    concurrency,
+    parallel,
+    slice_seconds,
+    slice_operations,
+    find_max,
+    target_p99,
+    step_rate,
+    step_seconds,
+    metrics_interval,
+    log_sample,
+    log_json,
+    prefetch_depth,
+    template_pool_size,
+    label,
+    wait,
 ):
     """
     Start the simulation through a task (Warning: If started directly without
     parameters, it performs random actions and an undetermined number of
     interactions))
     """
+    if rate_schedule:
+        try:
+            rate_schedule = RateSchedule.from_file(rate_schedule).to_config()
+        except ValueError as error:
+            raise click.BadParameter(str(error), param_hint='--rate-schedule')
+    if action_mix:
+        custom_actions = tuple(action_mix)
+    if find_max:
+        if parallel > 1 or rate_schedule or slice_seconds or slice_operations:
+            raise click.BadParameter(
+                'not supported with --parallel, --rate-schedule or --slice',
+                param_hint='--find-max',
+            )
+        find_max = {
+            'target_p99': target_p99,
+            'start_rate': rate or DEFAULT_START_RATE,
+            'increase': step_rate,
+            'interval': step_seconds,
+        }
+        wait = True
+    else:
+        find_max = None
+    if profile:
+        run_profile(
+            profile,
+            models,
+            db_address,
+            db_name,
+            parallel,
+            {
+                'metrics_interval': metrics_interval,
+                'log_sample': log_sample,
+                'log_json': log_json,
+                'prefetch_depth': prefetch_depth,
+                'template_pool_size': template_pool_size,
+                'slice_seconds': slice_seconds,
+                'slice_operations': slice_operations,
+                'find_max': find_max,
+                'label': label,
+            },
+            wait,
+        )
+        return
+
+    results = []
     for model in models:
         if model in MODELS_MAPPING:
             task_function = MODELS_MAPPING[model]
-            result = task_function.apply_async(
-                args=(
-                    db_address,
-                    db_name,
-                    time_action,
-                    custom_actions,
-                    editing_grade,
-                    quantity_interactions,
-                )
-            )
-            click.echo(
-                f'\n{print_result_run(task_function.__name__, result.id)}\n'
+            args = (
+                db_address,
+                db_name,
+                time_action,
+                custom_actions,
+                editing_grade,
+                quantity_interactions,
             )
+            kwargs = {
+                'action_weights': action_mix,
+                'pool_size': pool_size,
+                'pool_idle_timeout': pool_idle_timeout,
+                'keep_pool_alive': keep_pool,
+                'batch_size': batch_size,
+                'key_distribution': key_distribution.lower(),
+                'key_skew': key_skew,
+                'reservoir_size': reservoir_size,
+                'rate': rate,
+                'rate_schedule': rate_schedule,
+                'concurrency': concurrency,
+                'metrics_interval': metrics_interval,
+                'log_sample': log_sample,
+                'log_json': log_json,
+                'prefetch_depth': prefetch_depth,
+                'template_pool_size': template_pool_size,
+                'slice_seconds': slice_seconds,
+                'slice_operations': slice_operations,
+                'find_max': find_max,
+                'label': label,
+            }
+
+            if parallel > 1:
+                result = simulate_in_parallel(
+                    task_function, parallel, args, kwargs
+                )
+                click.echo(
+                    f'\n{print_result_fanout(task_function.__name__, result.parent.id, result.id, parallel)}\n'
+                )
+            else:
+                result = task_function.apply_async(args=args, kwargs=kwargs)
+                click.echo(
+                    f'\n{print_result_run(task_function.__name__, result.id)}\n'
+                )
+            results.append((task_function.__name__, result))
 
+    if wait:
+        for task_name, result in results:
+            summary = result.get()
+            click.echo(f'\n{print_result_summary(task_name, summary)}\n')
 
-@cli.command(name='simulate-list')
-def list():
-    """Lists and displays information about all running simulations(tasks)."""
-    active_tasks = app.control.inspect().active()
+
+def run_profile(
+    path: str,
+    models: tuple,
+    db_address: str,
+    db_name: str,
+    parallel: int,
+    kwargs: dict,
+    wait: bool,
+):
+    """Start the single task running the models of a workload profile."""
+    if models:
+        raise click.BadParameter(
+            'the models are given by the profile', param_hint='MODELS'
+        )
+    if parallel > 1:
+        raise click.BadParameter(
+            'not supported with --profile', param_hint='--parallel'
+        )
+    try:
+        profile = WorkloadProfile.from_file(path)
+    except ValueError as error:
+        raise click.BadParameter(str(error), param_hint='--profile')
+
+    result = simulate_profile_data.apply_async(
+        args=(db_address, db_name, profile.to_config()), kwargs=kwargs
+    )
+    task_name = simulate_profile_data.__name__
+    click.echo(f'\n{print_result_run(task_name, result.id)}\n')
+
+    if wait:
+        summary = result.get()
+        click.echo(f'\n{print_result_summary(task_name, summary)}\n')
+
+
+def get_task_list() -> list:
+    """
+    Collect the running simulations with their arguments and progress, with
+    one read of the task registry and one of their progress.
+
+    Returns:
+        - ``list``: The rows of the ``simulate-list`` table.
+    """
+    tasks = get_registry().tasks()
+    progress = get_tasks_progress([task['id'] for task in tasks])
     task_list = []
 
-    if any(active_tasks.values()):
-
-        for worker, tasks in active_tasks.items():
-            for task in tasks:
-                task_id = task['id']
-                task_name = task['name']
-                task_args = task['args']
-                time_start = task['time_start']
-                interactions = task_args[-1]
-                time_ago_formatted = task_elapsed_time(time_start)
-                formatted_interactions = format_info_number_interactions(
-                    interactions
-                )
+    for task in tasks:
+        task_id = task['id']
+        task_name = task['name']
+        task_args = task['args']
+        time_start = task['time_start']
+        if task_name == simulate_profile_data.name:
+            profile = WorkloadProfile.from_config(task_args[2])
+            interactions = profile.options.get('quantity')
+            custom_actions = profile.actions()
+        else:
+            interactions = task_args[-1]
+            custom_actions = task_args[3]
+        time_ago_formatted = task_elapsed_time(time_start)
+        formatted_interactions = format_info_number_interactions(
+            interactions
+        )
 
-                custom_actions = task_args[3]
-                action_str = print_running_actions(custom_actions)
-
-                task_list.append(
-                    [
-                        task_id,
-                        task_name,
-                        time_ago_formatted,
-                        formatted_interactions,
-                        action_str,
-                    ]
-                )
+        action_str = print_running_actions(custom_actions)
 
-        click.echo(f'\n{print_result_list(task_list)}\n')
-        
-    else:
-        click.echo(colored(f'\n[ ! ] THERE ARE NO TASKS CURRENTLY RUNNING.\n', 'yellow'))
+        task_list.append(
+            [
+                task_id,
+                task_name,
+                time_ago_formatted,
+                formatted_interactions,
+                action_str,
+                *format_task_progress(progress[task_id]),
+            ]
+        )
+
+    return task_list
+
+
+@cli.command(name='simulate-list')
+@click.option(
+    '-w',
+    '--watch',
+    is_flag=True,
+    help='Refresh the list in place until interrupted (Ctrl+C).',
+)
+@click.option(
+    '-i',
+    '--interval',
+    type=click.FloatRange(min=0.5),
+    default=2,
+    show_default=True,
+    help='Seconds between two refreshes of --watch.',
+)
+@click.option(
+    '--sync',
+    is_flag=True,
+    help=(
+        'Rebuild the task registry from the workers first (slow: asks every '
+        'worker), e.g. after a worker was killed.'
+    ),
+)
+def list(watch, interval, sync):
+    """Lists and displays information about all running simulations(tasks)."""
+    if sync:
+        sync_registry()
+    if not watch:
+        task_list = get_task_list()
+        if task_list:
+            click.echo(f'\n{print_result_list(task_list)}\n')
+        else:
+            click.echo(colored(f'\n[ ! ] THERE ARE NO TASKS CURRENTLY RUNNING.\n', 'yellow'))
+        return
+
+    try:
+        while True:
+            table = print_result_list(get_task_list())
+            click.clear()
+            click.echo(f'\n{table}\n')
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        click.echo()
 
 
 @cli.command(name='simulate-revoke')
@@ -150,7 +628,17 @@ def list():
 @click.option(
     '-a', '--all', is_flag=True, help='Revoke all running simulations.'
 )
-def revoke(id_tasks, all):
+@click.option(
+    '-g',
+    '--graceful',
+    is_flag=True,
+    help=(
+        'Let simulations run with --slice stop at the end of their current '
+        'slice instead of killing their worker processes. Other running '
+        'simulations are not stopped, and stay listed until they end.'
+    ),
+)
+def revoke(id_tasks, all, graceful):
     """Revokes one or more simulations by id(tasks)."""
     if not id_tasks and not all:
         message_without_tasks_revoke = colored(
@@ -161,28 +649,32 @@ def revoke(id_tasks, all):
         return
 
     if all:
-        active_tasks = app.control.inspect().active()
-        if active_tasks and any(active_tasks.values()):
-            id_tasks = []
-            for tasks in active_tasks.values():
-                if tasks:
-                    for task in tasks:
-                        id_tasks.append(task['id'])
-        else:
+        id_tasks = get_ids_tasks_in_progress()
+        if not id_tasks:
             message_no_active_tasks = colored(
                 '[ ! ] NO ACTIVE TASKS TO REVOKE.', 'yellow'
             )
             click.echo(f'\n{message_no_active_tasks}\n')
             return
 
+    revoked = set(revoke_tasks(id_tasks, terminate=not graceful))
     for id_task in id_tasks:
-        result = revoke_task(id_task)
+        result = id_task if id_task in revoked else revoke_group(
+            id_task, terminate=not graceful
+        )
         if not result:
             message_erro_revoke_tasks = colored(
                 f'[ ✗ ] TASK ID "{id_task}" NOT FOUND OR ALREADY REVOKED.',
                 'red',
             )
             click.echo(f'\n{message_erro_revoke_tasks}\n')
+        elif graceful:
+            message_revoked_tasks = colored(
+                f'[ ✓ ] TASK ID: {result} - REVOKE REQUESTED: STOPS AT THE '
+                'END OF ITS SLICE (--slice), OR RUNS TO ITS END WITHOUT IT',
+                'yellow',
+            )
+            click.echo(f'\n{message_revoked_tasks}\n')
         else:
             message_revoked_tasks = colored(
                 f'[ ✓ ] TASK ID: {result} - REVOKE', 'green'
@@ -190,5 +682,409 @@ def revoke(id_tasks, all):
             click.echo(f'\n{message_revoked_tasks}\n')
 
 
+@cli.command(name='simulate-export')
+@click.argument(
+    'models',
+    type=click.Choice(
+        ['driver', 'vehicle', 'client', 'location', 'product', 'delivery'],
+        case_sensitive=False,
+    ),
+    nargs=-1,
+    required=True,
+)
+@click.option(
+    '-q',
+    '--quantity',
+    required=True,
+    type=click.IntRange(min=1),
+    help='Number of records to export per model.',
+)
+@click.option(
+    '-o',
+    '--output-dir',
+    default='export',
+    show_default=True,
+    type=click.Path(file_okay=False),
+    help='Directory of the exported files.',
+)
+@click.option(
+    '-f',
+    '--format',
+    'file_format',
+    default='jsonl',
+    show_default=True,
+    type=click.Choice(FORMATS, case_sensitive=False),
+    help='jsonl (for mongoimport) or bson (for mongorestore).',
+)
+@click.option(
+    '-s',
+    '--shard-size',
+    default=DEFAULT_SHARD_SIZE,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help='Maximum number of records per file.',
+)
+@click.option(
+    '--seed',
+    default=None,
+    type=int,
+    help='Seed of the dataset, to export the same records again.',
+)
+@click.option(
+    '-j',
+    '--processes',
+    default=None,
+    type=click.IntRange(min=1),
+    help='Number of worker processes. Defaults to the number of CPUs.',
+)
+@click.option(
+    '--compress/--no-compress',
+    default=True,
+    show_default=True,
+    help='Gzip the exported files.',
+)
+def export(
+    models,
+    quantity,
+    output_dir,
+    file_format,
+    shard_size,
+    seed,
+    processes,
+    compress,
+):
+    """
+    Export synthetic records to compressed JSONL or BSON files, without
+    MongoDB or RabbitMQ.
+    """
+    for model in models:
+        summary = export_dataset(
+            model.lower(),
+            quantity,
+            output_dir,
+            shard_size=shard_size,
+            file_format=file_format.lower(),
+            seed=seed,
+            processes=processes,
+            compress=compress,
+        )
+        click.echo(f'\n{print_result_export(summary)}\n')
+
+
+@cli.command(name='simulate-seed')
+@click.argument(
+    'models',
+    type=click.Choice(
+        ['driver', 'vehicle', 'client', 'location', 'product', 'delivery'],
+        case_sensitive=False,
+    ),
+    nargs=-1,
+    required=True,
+)
+@click.option(
+    '-q',
+    '--quantity',
+    required=True,
+    type=click.IntRange(min=1),
+    help='Number of documents to load per model.',
+)
+@click.option(
+    '-a',
+    '--db-address',
+    envvar='MONGODB_ADDRESS',
+    default='mongodb://mongodb:27017/',
+    help='Database connection address.',
+)
+@click.option(
+    '-n',
+    '--db-name',
+    envvar='DB_NAME',
+    default='montogre',
+    help=('Name of the database.'),
+)
+@click.option(
+    '-b',
+    '--batch-size',
+    default=DEFAULT_SEED_BATCH_SIZE,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help='Number of documents per insert_many.',
+)
+@click.option(
+    '-j',
+    '--processes',
+    default=None,
+    type=click.IntRange(min=1),
+    help='Number of worker processes. Defaults to the number of CPUs.',
+)
+@click.option(
+    '--seed',
+    default=None,
+    type=int,
+    help='Seed of the documents, to load the same documents again.',
+)
+@click.option(
+    '--drop',
+    is_flag=True,
+    help='Drop the collections before loading them.',
+)
+def seed(
+    models, quantity, db_address, db_name, batch_size, processes, seed, drop
+):
+    """
+    Load documents into the collections of the models with parallel
+    unordered insert_many, before running simulations on them.
+    """
+    for model in models:
+        summary = seed_database(
+            model.lower(),
+            quantity,
+            db_address,
+            db_name,
+            batch_size=batch_size,
+            seed=seed,
+            processes=processes,
+            drop=drop,
+        )
+        click.echo(f'\n{print_result_seed(summary)}\n')
+
+
+@cli.command(name='simulate-report')
+@click.argument('run_ids', type=int, nargs=-1)
+@click.option(
+    '-n',
+    '--limit',
+    default=20,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help='Number of runs listed.',
+)
+@click.option(
+    '-l', '--label', default=None, help='List only the runs with this label.'
+)
+@click.option(
+    '-t',
+    '--task',
+    'task_name',
+    default=None,
+    help='List only the runs of the tasks whose name contains this text.',
+)
+@click.option(
+    '--threshold',
+    default=DEFAULT_THRESHOLD,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help=(
+        'Relative change beyond which a lower throughput or a higher '
+        'latency or error rate is a regression (0.1 is 10%).'
+    ),
+)
+@click.option(
+    '--fail-on-regression',
+    is_flag=True,
+    help='Exit with status 1 when comparing two runs finds a regression.',
+)
+def report(run_ids, limit, label, task_name, threshold, fail_on_regression):
+    """
+    Lists the finished simulations of the results store, shows one run by
+    its id, or compares two runs (baseline first) and their options.
+    """
+    store = ResultsStore()
+    if not run_ids:
+        runs = store.runs(limit=limit, label=label, task_name=task_name)
+        click.echo(f'\n{print_result_runs(runs)}\n')
+        return
+    if len(run_ids) > 2:
+        raise click.BadParameter(
+            'give one run to show or two runs to compare',
+            param_hint='RUN_IDS',
+        )
+
+    runs = []
+    for run_id in run_ids:
+        run = store.get(run_id)
+        if run is None:
+            raise click.BadParameter(
+                f'no run {run_id} in the results store', param_hint='RUN_IDS'
+            )
+        runs.append(run)
+
+    if len(runs) == 1:
+        (run,) = runs
+        click.echo(f'\n{print_result_runs(runs)}')
+        click.echo(
+            f'\n{print_result_summary(run["task_name"], run["summary"])}\n'
+        )
+        return
+
+    baseline, candidate = runs
+    comparison = compare_runs(baseline, candidate, threshold)
+    changes = diff_configs(baseline, candidate)
+    click.echo(
+        f'\n{print_result_comparison(baseline, candidate, comparison, changes)}\n'
+    )
+    if fail_on_regression and any(row['regression'] for row in comparison):
+        raise SystemExit(1)
+
+
+@cli.command(name='simulate-benchmark')
+@click.argument(
+    'suites', type=click.Choice(SUITES, case_sensitive=False), nargs=-1
+)
+@click.option(
+    '-a',
+    '--db-address',
+    envvar='MONGODB_ADDRESS',
+    default='mongodb://mongodb:27017/',
+    help='Database connection address of the actions suite.',
+)
+@click.option(
+    '-n',
+    '--db-name',
+    default='montogre_benchmark',
+    show_default=True,
+    help='Database of the actions suite, whose collection is dropped.',
+)
+@click.option(
+    '--in-memory',
+    is_flag=True,
+    help=(
+        'Run the actions suite on an in-process mongomock database instead '
+        'of --db-address.'
+    ),
+)
+@click.option(
+    '-q',
+    '--quantities',
+    callback=parse_sizes,
+    help=(
+        'Records per generator call, e.g. 1,100,1000. Defaults to '
+        f'{",".join(map(str, GENERATOR_QUANTITIES))}.'
+    ),
+)
+@click.option(
+    '-b',
+    '--batch-sizes',
+    callback=parse_sizes,
+    help=(
+        'Operations per request of the writes. Defaults to '
+        f'{",".join(map(str, BATCH_SIZES))}.'
+    ),
+)
+@click.option(
+    '-c',
+    '--concurrency',
+    callback=parse_sizes,
+    help=(
+        'Threads sending the requests. Defaults to '
+        f'{",".join(map(str, CONCURRENCY_LEVELS))}.'
+    ),
+)
+@click.option(
+    '-o',
+    '--operations',
+    default=DEFAULT_OPERATIONS,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help='Operations of each measure of the actions suite.',
+)
+@click.option(
+    '-r',
+    '--repeat',
+    default=DEFAULT_REPEAT,
+    show_default=True,
+    type=click.IntRange(min=1),
+    help='Runs of each generator measure, of which the best is kept.',
+)
+@click.option(
+    '-d',
+    '--baseline-dir',
+    default=BENCHMARK_DIR,
+    show_default=True,
+    type=click.Path(file_okay=False),
+    help=(
+        'Directory of the baseline file of each suite, kept per backend for '
+        'the actions suite (e.g. actions-inmemory.json).'
+    ),
+)
+@click.option(
+    '--save-baseline',
+    'save',
+    is_flag=True,
+    help='Save the results as the baselines instead of comparing them.',
+)
+@click.option(
+    '-t',
+    '--tolerance',
+    default=DEFAULT_TOLERANCE,
+    show_default=True,
+    type=click.FloatRange(min=0),
+    help=(
+        'Relative change beyond which a lower throughput or a higher '
+        'latency than the baseline is a regression (0.2 is 20%).'
+    ),
+)
+def benchmark(
+    suites,
+    db_address,
+    db_name,
+    in_memory,
+    quantities,
+    batch_sizes,
+    concurrency,
+    operations,
+    repeat,
+    baseline_dir,
+    save,
+    tolerance,
+):
+    """
+    Benchmarks the data generators (records/s) and the MongoDB actions
+    (ops/s and latency) against baseline files, exiting with status 1 on a
+    regression beyond the tolerance.
+    """
+    regression = False
+    for suite in suites or SUITES:
+        suite = suite.lower()
+        if suite == 'generators':
+            results = run_generator_suite(
+                quantities or GENERATOR_QUANTITIES, repeat
+            )
+        else:
+            try:
+                with open_actions(db_address, db_name, in_memory) as actions:
+                    results = run_action_suite(
+                        actions,
+                        batch_sizes or BATCH_SIZES,
+                        concurrency or CONCURRENCY_LEVELS,
+                        operations,
+                    )
+            except ValueError as error:
+                raise click.BadParameter(str(error), param_hint='--in-memory')
+
+        target = benchmark_target(suite, in_memory)
+        path = baseline_path(suite, baseline_dir, target)
+        try:
+            baseline = None if save else load_baseline(path, target)
+        except ValueError as error:
+            raise click.BadParameter(str(error), param_hint='--baseline-dir')
+        comparison = None
+        if baseline is not None:
+            comparison = compare_to_baseline(results, baseline, tolerance)
+            regression |= any(row['regression'] for row in comparison)
+        click.echo(
+            f'\n{print_result_benchmark(suite, results, comparison)}\n'
+        )
+
+        if baseline is None:
+            save_baseline(suite, results, path, target)
+            click.echo(
+                colored(f'[ ✓ ] BASELINE SAVED TO "{path}".\n', 'green')
+            )
+
+    if regression:
+        raise SystemExit(1)
+
+
 if __name__ == '__main__':
     cli()
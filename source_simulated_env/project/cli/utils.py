@@ -52,6 +52,165 @@ def print_result_run(task_name: str, task_id: str) -> str:
     return colored(f'[ ✓ ] TASK: "{task_name}" ID: "{task_id}" ', 'green')
 
 
+def print_result_fanout(
+    task_name: str, group_id: str, result_id: str, parallel: int
+) -> str:
+    """
+    Format and return a success message for a simulation split into
+    parallel subtasks.
+
+    Args:
+        - ``task_name`` (str): The name of the task.
+        - ``group_id`` (str): The ID of the group of subtasks.
+        - ``result_id`` (str): The ID of the aggregation task.
+        - ``parallel`` (int): The number of subtasks.
+
+    Returns:
+        - ``str``: A formatted message indicating the success of the task.
+    """
+    return colored(
+        f'[ ✓ ] TASK: "{task_name}" x{parallel} GROUP ID: "{group_id}" '
+        f'RESULT ID: "{result_id}" ',
+        'green',
+    )
+
+
+def print_result_summary(task_name: str, summary: dict) -> str:
+    """
+    Format the summary returned by a finished simulation.
+
+    Args:
+        - ``task_name`` (str): The name of the task.
+        - ``summary`` (dict): The simulation summary (operations, actions,
+        errors, wall time, operations per second, latency by action and
+        the report of a saturation search).
+
+    Returns:
+        - ``str``: A table with the summary.
+    """
+    actions = ' '.join(
+        f'{action}={count}' for action, count in summary['actions'].items()
+    )
+    headers = ['TASK NAME', 'OPERATIONS', 'ACTIONS', 'ERRORS', 'TIME', 'OPS/S']
+    row = [
+        task_name,
+        summary['operations'],
+        actions,
+        summary['errors'],
+        f'{summary["wall_time"]:.1f}s',
+        f'{summary["ops_per_sec"]:.1f}',
+    ]
+    table = tabulate([row], headers, tablefmt='heavy_outline')
+
+    latency_rows = [
+        [
+            action,
+            latency['count'],
+            f'{latency["p50"]:.2f}',
+            f'{latency["p95"]:.2f}',
+            f'{latency["p99"]:.2f}',
+            f'{latency["max"]:.2f}',
+        ]
+        for action, latency in summary.get('latency', {}).items()
+    ]
+    if latency_rows:
+        latency_headers = [
+            'ACTION', 'REQUESTS', 'P50 MS', 'P95 MS', 'P99 MS', 'MAX MS'
+        ]
+        table += '\n' + tabulate(
+            latency_rows, latency_headers, tablefmt='heavy_outline'
+        )
+    if 'saturation' in summary:
+        table += '\n' + print_result_saturation(summary['saturation'])
+    return table
+
+
+def print_result_saturation(report: dict) -> str:
+    """
+    Format the latency curve and the maximum sustainable throughput found by
+    a saturation search (``--find-max``).
+
+    Args:
+        - ``report`` (dict): The report of the ``SaturationSearch``.
+
+    Returns:
+        - ``str``: A table of the steps of the search and its result.
+    """
+    rows = [
+        [
+            f'{step["rate"]:.1f}',
+            f'{step["throughput"]:.1f}',
+            f'{step["p50"]:.2f}',
+            f'{step["p95"]:.2f}',
+            f'{step["p99"]:.2f}',
+            (
+                colored('✓', 'green')
+                if step['sustained']
+                else colored('✗', 'red')
+            ),
+        ]
+        for step in report['steps']
+    ]
+    headers = ['RATE', 'OPS/S', 'P50 MS', 'P95 MS', 'P99 MS', 'SUSTAINED']
+    table = tabulate(rows, headers, tablefmt='heavy_outline')
+    result = colored(
+        f'[ ✓ ] MAX SUSTAINABLE THROUGHPUT: {report["max_throughput"]:.1f} '
+        f'OPS/S (P99 <= {report["target_p99"]:g} MS)',
+        'green',
+    )
+    return f'{table}\n{result}'
+
+
+def print_result_export(summary: dict) -> str:
+    """
+    Format the summary of a dataset export.
+
+    Args:
+        - ``summary`` (dict): The export summary (model, seed, files,
+        records, bytes, wall time and records per second).
+
+    Returns:
+        - ``str``: A table with the summary.
+    """
+    headers = ['MODEL', 'RECORDS', 'FILES', 'SIZE', 'SEED', 'TIME', 'REC/S']
+    row = [
+        summary['model'],
+        summary['records'],
+        len(summary['files']),
+        f'{summary["bytes"] / 1024 ** 2:.1f} MiB',
+        summary['seed'],
+        f'{summary["wall_time"]:.1f}s',
+        f'{summary["records_per_sec"]:.0f}',
+    ]
+    return tabulate([row], headers, tablefmt='heavy_outline')
+
+
+def print_result_seed(summary: dict) -> str:
+    """
+    Format the summary of a database seeding.
+
+    Args:
+        - ``summary`` (dict): The seeding summary (model, collection, seed,
+        inserted documents, errors, wall time and documents per second).
+
+    Returns:
+        - ``str``: A table with the summary.
+    """
+    headers = [
+        'MODEL', 'COLLECTION', 'INSERTED', 'ERRORS', 'SEED', 'TIME', 'DOCS/S'
+    ]
+    row = [
+        summary['model'],
+        summary['collection'],
+        summary['inserted'],
+        summary['errors'],
+        summary['seed'],
+        f'{summary["wall_time"]:.1f}s',
+        f'{summary["documents_per_sec"]:.0f}',
+    ]
+    return tabulate([row], headers, tablefmt='heavy_outline')
+
+
 def print_running_actions(custom_actions: list) -> str:
     """
     Format and print the running actions of a task.
@@ -67,6 +226,10 @@ def print_running_actions(custom_actions: list) -> str:
         'create': ('C', 'green'),
         'update': ('U', 'yellow'),
         'delete': ('D', 'red'),
+        'read': ('R', 'blue'),
+        'lookup': ('L', 'cyan'),
+        'range': ('S', 'magenta'),
+        'aggregate': ('A', 'white'),
     }
 
     formatted_actions = []
@@ -91,6 +254,35 @@ def print_running_actions(custom_actions: list) -> str:
 
 
 
+def format_task_progress(progress: dict | None) -> list:
+    """
+    Format the progress published by a running simulation.
+
+    Args:
+        - ``progress`` (dict): The progress of the task (operations done,
+        operations per second, errors and latency percentiles), or ``None``
+        if it has not published any yet.
+
+    Returns:
+        - ``list``: The OPS DONE, OPS/S, ERRORS and P50/P95/P99 columns.
+    """
+    if not progress:
+        return ['-', '-', '-', '-']
+
+    operations = str(progress['operations'])
+    if progress.get('quantity'):
+        percent = progress['operations'] / progress['quantity'] * 100
+        operations += f' ({percent:.0f}%)'
+
+    errors = progress['errors']
+    return [
+        operations,
+        f'{progress["ops_per_sec"]:.1f}',
+        colored(str(errors), 'red') if errors else errors,
+        f'{progress["p50"]:.1f}/{progress["p95"]:.1f}/{progress["p99"]:.1f}',
+    ]
+
+
 def print_result_list(tasks_info: list) -> str:
     """
     Get the table of active tasks or a message when there are no tasks.
@@ -108,8 +300,162 @@ def print_result_list(tasks_info: list) -> str:
             'TIME AGO',
             'INTERACTIONS',
             'ACTIONS ON',
+            'OPS DONE',
+            'OPS/S',
+            'ERRORS',
+            'P50/P95/P99 MS',
         ]
         table = tabulate(tasks_info, headers, tablefmt='heavy_outline')
         return table
 
     return colored(f'[ ! ] THERE ARE NO TASKS CURRENTLY RUNNING.', 'yellow')
+
+
+def print_result_runs(runs: list) -> str:
+    """
+    Format the runs saved to the results store.
+
+    Args:
+        - ``runs`` (list): The runs (see ``ResultsStore.runs``).
+
+    Returns:
+        - ``str``: A table of the runs, or a message when there are none.
+    """
+    if not runs:
+        return colored('[ ! ] NO RUNS IN THE RESULTS STORE.', 'yellow')
+
+    rows = [
+        [
+            run['id'],
+            run['finished_at'],
+            run['task_name'],
+            run['label'] or '-',
+            run['operations'],
+            run['errors'],
+            f'{run["wall_time"]:.1f}s',
+            f'{run["ops_per_sec"]:.1f}',
+            f'{run["p50"]:.2f}/{run["p95"]:.2f}/{run["p99"]:.2f}',
+        ]
+        for run in runs
+    ]
+    headers = [
+        'RUN',
+        'FINISHED AT',
+        'TASK NAME',
+        'LABEL',
+        'OPERATIONS',
+        'ERRORS',
+        'TIME',
+        'OPS/S',
+        'P50/P95/P99 MS',
+    ]
+    return tabulate(rows, headers, tablefmt='heavy_outline')
+
+
+def format_comparison(comparison: list, headers: list) -> str:
+    """
+    Format compared metrics (see ``compare_metric``), with their
+    regressions in red, and the verdict.
+
+    Args:
+        - ``comparison`` (list): The compared metrics.
+        - ``headers`` (list): The headers of the metric, of its two values
+        and of the change.
+
+    Returns:
+        - ``str``: A table of the metrics and the verdict.
+    """
+    rows = []
+    for row in comparison:
+        change = (
+            f'{row["change"]:+.1%}' if row['change'] is not None else 'n/a'
+        )
+        if row['regression']:
+            change = colored(f'{change} REGRESSION', 'red')
+        rows.append(
+            [
+                row['metric'],
+                f'{row["baseline"]:.2f}',
+                f'{row["candidate"]:.2f}',
+                change,
+            ]
+        )
+    table = tabulate(rows, headers, tablefmt='heavy_outline')
+
+    regressions = [row['metric'] for row in comparison if row['regression']]
+    if regressions:
+        verdict = colored(
+            f'[ ✗ ] REGRESSIONS: {", ".join(regressions)}', 'red'
+        )
+    else:
+        verdict = colored('[ ✓ ] NO REGRESSIONS.', 'green')
+    return f'{table}\n{verdict}'
+
+
+def print_result_comparison(
+    baseline: dict, candidate: dict, comparison: list, changes: list
+) -> str:
+    """
+    Format the comparison of two runs, with their regressions in red.
+
+    Args:
+        - ``baseline`` (dict): The reference run.
+        - ``candidate`` (dict): The run compared to it.
+        - ``comparison`` (list): The metrics compared by ``compare_runs``.
+        - ``changes`` (list): The options that differ (see
+        ``diff_configs``).
+
+    Returns:
+        - ``str``: Tables of the metrics and options, and the verdict.
+    """
+    baseline_header = f'RUN {baseline["id"]}'
+    candidate_header = f'RUN {candidate["id"]}'
+    result = format_comparison(
+        comparison, ['METRIC', baseline_header, candidate_header, 'CHANGE']
+    )
+    if not changes:
+        return result
+
+    table = tabulate(
+        [[key, before, after] for key, before, after in changes],
+        ['OPTION', baseline_header, candidate_header],
+        tablefmt='heavy_outline',
+    )
+    return f'{table}\n{result}'
+
+
+def print_result_benchmark(
+    suite: str, results: dict, comparison: list | None = None
+) -> str:
+    """
+    Format the results of a benchmark suite and their comparison to its
+    baseline.
+
+    Args:
+        - ``suite`` (str): The name of the suite.
+        - ``results`` (dict): The metrics of each case of the suite.
+        - ``comparison`` (list, optional): The metrics compared by
+        ``compare_to_baseline``.
+
+    Returns:
+        - ``str``: A table of the results and of their comparison.
+    """
+    metrics = []
+    for case_metrics in results.values():
+        for metric in case_metrics:
+            if metric not in metrics:
+                metrics.append(metric)
+    rows = [
+        [case, *(f'{values.get(metric, 0):,.2f}' for metric in metrics)]
+        for case, values in results.items()
+    ]
+    headers = [suite.upper(), *(metric.upper() for metric in metrics)]
+    table = tabulate(
+        rows, headers, tablefmt='heavy_outline', disable_numparse=True
+    )
+    if comparison is None:
+        return table
+    comparison_table = format_comparison(
+        comparison, ['METRIC', 'BASELINE', 'CURRENT', 'CHANGE']
+    )
+    return f'{table}\n{comparison_table}'
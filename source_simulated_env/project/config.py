@@ -1,26 +1,158 @@
+import atexit
+import itertools
+import json
 import logging
 import os
-from logging.handlers import TimedRotatingFileHandler
+import queue
+from datetime import datetime
+from logging.handlers import (QueueHandler, QueueListener,
+                              TimedRotatingFileHandler)
 
 LOG_DIR = os.getenv('LOG_DIR', '/app/log')
 LOG_FILE = 'simulate_logs.log'
 LOG_PATH = os.path.join(LOG_DIR, LOG_FILE)
+LOG_SAMPLE_RATE = int(os.getenv('LOG_SAMPLE_RATE', '1'))
+LOG_JSON = os.getenv('LOG_JSON', '').lower() in ('1', 'true', 'yes')
+LOG_QUEUE_SIZE = 10_000
+METRICS_DIR = os.getenv('METRICS_DIR', '/app/var/metrics')
+RESULTS_DB = os.getenv('RESULTS_DB', '/app/var/results/runs.sqlite3')
+BENCHMARK_DIR = os.getenv('BENCHMARK_DIR', '/app/var/benchmarks')
 
+_LOG_HANDLER = None
+_LOG_LISTENER = None
+_LOG_PID = None
 
-def setup_custom_logger():
-    logger = logging.getLogger('SIMULATOR')
-    logger.setLevel(logging.DEBUG)
 
-    formatter = logging.Formatter(
+class SamplingFilter(logging.Filter):
+    """
+    Keep one record out of ``rate`` below the WARNING level; warnings and
+    errors are always kept.
+    """
+
+    def __init__(self, rate: int = 1):
+        super().__init__()
+        self.rate = max(rate, 1)
+        self.counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate == 1 or record.levelno >= logging.WARNING:
+            return True
+        return next(self.counter) % self.rate == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as compact JSON lines."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = {
+            'time': datetime.fromtimestamp(record.created).isoformat(
+                timespec='milliseconds'
+            ),
+            'logger': record.name,
+            'level': record.levelname,
+            'message': record.getMessage(),
+        }
+        return json.dumps(line, separators=(',', ':'), default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    A ``QueueHandler`` that leaves the formatting of records to the
+    listener thread and drops records instead of blocking when the queue
+    is full.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def build_formatter(json_lines: bool) -> logging.Formatter:
+    if json_lines:
+        return JsonFormatter()
+    return logging.Formatter(
         '%(name)s | [%(asctime)s]: %(message)s', datefmt='%Y-%m-%d %H:%M:%S'
     )
 
-    file_handler = TimedRotatingFileHandler(
-        LOG_PATH, when='midnight', interval=1, backupCount=7
-    )
 
-    file_handler.setFormatter(formatter)
+def setup_custom_logger(
+    sample_rate: int | None = None, json_lines: bool | None = None
+):
+    """
+    Return the simulator logger, configuring it on the first call of each
+    process.
 
-    logger.addHandler(file_handler)
+    Records are put on a bounded queue and written to ``LOG_PATH`` by a
+    background thread, so logging never waits for the disk. Later calls
+    only change the sampling and the format, without adding handlers.
+
+    Args:
+        - ``sample_rate (int, optional):`` Keep one INFO record out of
+        ``sample_rate``. Defaults to ``LOG_SAMPLE_RATE``.
+        - ``json_lines (bool, optional):`` Write compact JSON lines instead
+        of text. Defaults to ``LOG_JSON``.
+
+    Returns:
+        ``Logger:`` The simulator logger.
+    """
+    global _LOG_HANDLER, _LOG_LISTENER, _LOG_PID
+
+    logger = logging.getLogger('SIMULATOR')
+    logger.setLevel(logging.DEBUG)
+
+    if sample_rate is None:
+        sample_rate = LOG_SAMPLE_RATE
+    if json_lines is None:
+        json_lines = LOG_JSON
+
+    if _LOG_HANDLER is None or _LOG_PID != os.getpid():
+        # The listener thread does not survive a fork, so a forked worker
+        # process starts its own pipeline.
+        if _LOG_HANDLER is not None:
+            logger.removeHandler(_LOG_HANDLER)
+
+        file_handler = TimedRotatingFileHandler(
+            LOG_PATH, when='midnight', interval=1, backupCount=7
+        )
+        log_queue = queue.Queue(LOG_QUEUE_SIZE)
+        _LOG_HANDLER = DeferredQueueHandler(log_queue)
+        _LOG_HANDLER.addFilter(SamplingFilter(sample_rate))
+        _LOG_LISTENER = QueueListener(log_queue, file_handler)
+        _LOG_LISTENER.start()
+        _LOG_PID = os.getpid()
+        logger.addHandler(_LOG_HANDLER)
+
+    _LOG_HANDLER.filters[0].rate = max(sample_rate, 1)
+    for handler in _LOG_LISTENER.handlers:
+        handler.setFormatter(build_formatter(json_lines))
 
     return logger
+
+
+def shutdown_logger():
+    """
+    Write the records still queued and stop the logging thread of this
+    process.
+    """
+    global _LOG_HANDLER, _LOG_LISTENER
+
+    if _LOG_LISTENER is None or _LOG_PID != os.getpid():
+        return
+    logging.getLogger('SIMULATOR').removeHandler(_LOG_HANDLER)
+    _LOG_LISTENER.stop()
+    for handler in _LOG_LISTENER.handlers:
+        handler.close()
+    _LOG_HANDLER = None
+    _LOG_LISTENER = None
+
+
+atexit.register(shutdown_logger)
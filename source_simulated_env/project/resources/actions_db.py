@@ -1,155 +1,606 @@
+import os
 import random
+from datetime import datetime, timedelta
 
 import pymongo
 from bson.objectid import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+READ_ACTIONS = ('read', 'lookup', 'range', 'aggregate')
+# Secondary keys of the models, in the order they are looked for in a
+# document: a delivery only has the nested ``client.cnpj``.
+LOOKUP_KEYS = (
+    'cnpj',
+    'vehicle_plate',
+    'city_id',
+    'cnh_number',
+    'product_id',
+    'client.cnpj',
+)
+DELIVERY_DATE_PATH = 'data_delivery.data_start'
+LOOKUP_LIMIT = 10
+RANGE_LIMIT = 100
+RANGE_WINDOW = timedelta(hours=1)
+AGGREGATE_WINDOW = timedelta(days=1)
+AGGREGATE_SCAN = 1000
+
+_CLIENTS: dict[tuple, pymongo.MongoClient] = {}
+_CLIENTS_PID: int | None = None
+
+
+def get_client(
+    uri: str,
+    max_pool_size: int = 100,
+    min_pool_size: int = 0,
+    max_idle_time: float | None = None,
+) -> pymongo.MongoClient:
+    """
+    Return the ``MongoClient`` shared by the current process for the given
+    address and pool options, creating it on first use.
+
+    Clients are never shared across a ``fork``: when called from a new
+    process (e.g. a freshly spawned Celery worker) the inherited clients are
+    discarded and new ones are created.
+
+    Args:
+        - ``uri (str):`` The MongoDB connection URI.
+        - ``max_pool_size (int, optional):`` Maximum number of connections
+        kept by the pool. Default is 100.
+        - ``min_pool_size (int, optional):`` Minimum number of connections
+        kept open by the pool. Default is 0.
+        - ``max_idle_time (float, optional):`` Seconds an idle connection may
+        remain in the pool before being closed. Default is no limit.
+
+    Returns:
+        ``MongoClient:`` The pooled client.
+    """
+    global _CLIENTS_PID
+
+    if _CLIENTS_PID != os.getpid():
+        _CLIENTS.clear()
+        _CLIENTS_PID = os.getpid()
+
+    key = (uri, max_pool_size, min_pool_size, max_idle_time)
+    client = _CLIENTS.get(key)
+
+    if client is None:
+        client = pymongo.MongoClient(
+            uri,
+            maxPoolSize=max_pool_size,
+            minPoolSize=min_pool_size,
+            maxIdleTimeMS=(
+                int(max_idle_time * 1000) if max_idle_time is not None else None
+            ),
+        )
+        _CLIENTS[key] = client
+
+    return client
+
+
+def document_paths(document: dict, prefix: str = '') -> list[str]:
+    """
+    List the dotted paths of the leaf fields of a document, e.g.
+    ``['name', 'dimensions.length', 'dimensions.width']``. Lists are leaves.
+    """
+    paths = []
+    for key, value in document.items():
+        if key == '_id':
+            continue
+        path = f'{prefix}{key}'
+        if isinstance(value, dict) and value:
+            paths.extend(document_paths(value, f'{path}.'))
+        else:
+            paths.append(path)
+    return paths
+
+
+def get_path(document: dict, path: str):
+    """Return the value of a dotted path (e.g. ``'dimensions.length'``)."""
+    value = document
+    for key in path.split('.'):
+        value = value[key]
+    return value
+
+
+def find_lookup_key(document: dict) -> str | None:
+    """Return the first of ``LOOKUP_KEYS`` found in a document, if any."""
+    for path in LOOKUP_KEYS:
+        try:
+            get_path(document, path)
+        except (KeyError, TypeError):
+            continue
+        return path
+    return None
+
+
+def date_window(document: dict, window: timedelta) -> tuple[str, str] | None:
+    """
+    Return the ISO bounds of ``window`` starting at the delivery date of a
+    document, or None if it has no delivery date.
+    """
+    try:
+        start = get_path(document, DELIVERY_DATE_PATH)
+    except (KeyError, TypeError):
+        return None
+    end = datetime.fromisoformat(start) + window
+    return start, end.isoformat()
+
+
+def select_keys_to_update(
+    document_keys: list | tuple,
+    percent_to_update: int = 10,
+    default_quantity: int | None = None,
+) -> list:
+    """
+    Randomly select the keys that an update action will modify.
+
+    Args:
+        - ``document_keys (list):`` The candidate keys.
+        - ``percent_to_update (int, optional):`` Percentage of keys to select.
+        Default is 10 (at least one key is always selected).
+        - ``default_quantity (int, optional):`` Number of keys to select,
+        overriding ``percent_to_update``.
+
+    Returns:
+        ``list:`` The selected keys.
+    """
+    if default_quantity is None:
+        num_keys_to_update = len(document_keys) * percent_to_update // 100
+        num_keys_to_update = max(num_keys_to_update, 1)
+    else:
+        num_keys_to_update = min(default_quantity, len(document_keys))
+
+    return random.sample(document_keys, num_keys_to_update)
+
+
+def close_clients():
+    """Close every pooled client created by the current process."""
+    if _CLIENTS_PID == os.getpid():
+        for client in _CLIENTS.values():
+            client.close()
+    _CLIENTS.clear()
 
 
 class MongoDBActions:
     """
     A class to perform actions in a MongoDB database, such as creating,
-    updating, and deleting documents in a specific collection.
+    updating, and deleting documents in its collections.
+
+    The instance holds a pooled ``MongoClient`` (see ``get_client``) for the
+    whole simulation run, so every action reuses an open connection; the
+    collection and document are given on each call.
 
     Arguments and Attributes:
         - ``uri (str):`` The MongoDB connection URI.
         - ``database_name (str):`` The name of the database.
-        - ``collection_name (str):`` The name of the collection where actions
-        will be performed.
-        - ``document (dict):`` The initial data to be used for creating or editing
-        documents.
+        - ``max_pool_size (int, optional):`` Maximum number of pooled
+        connections. Default is 100.
+        - ``min_pool_size (int, optional):`` Minimum number of pooled
+        connections. Default is 0.
+        - ``max_idle_time (float, optional):`` Seconds an idle pooled
+        connection is kept open. Default is no limit.
+        - ``keep_alive (bool, optional):`` Keep the pooled client open for the
+        next runs of the same process when ``close`` is called. Default is
+        True.
     """
 
     def __init__(
         self,
         uri: str,
         database_name: str,
-        collection_name: str,
-        document: dict,
+        max_pool_size: int = 100,
+        min_pool_size: int = 0,
+        max_idle_time: float | None = None,
+        keep_alive: bool = True,
     ):
         self.uri = uri
         self.database_name = database_name
-        self.collection_name = collection_name
-        self.document = document
-        self.client = pymongo.MongoClient(self.uri)
+        self.keep_alive = keep_alive
+        self.pool_options = (max_pool_size, min_pool_size, max_idle_time)
+        self.client = get_client(self.uri, *self.pool_options)
+        self.db = self.client[self.database_name]
+        self.update_paths: dict[str, tuple[str, ...]] = {}
+        self.indexed: set[str] = set()
 
-    def get_random_document(self) -> ObjectId | None:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Ends the run of this instance. The pooled client is only closed when
+        ``keep_alive`` is False.
+        """
+        if not self.keep_alive:
+            _CLIENTS.pop((self.uri, *self.pool_options), None)
+            self.client.close()
+
+    def get_random_document(self, collection_name: str) -> ObjectId | None:
         """
         Attempts to retrieve a document in the provided collection and returns
         its ObjectId. If no document is returned, the value None is returned.
 
+        Args:
+            - ``collection_name (str):`` The collection to search.
+
         Returns:
             - ``ObjectId`` or ``None``: The ObjectId of the retrieved document,
             or None if no document is found.
         """
-        db = self.client[self.database_name]
-        collection = db[self.collection_name]
+        collection = self.db[collection_name]
         random_document = collection.find_one({}, {'_id': 1})
-        self.client.close()
         if random_document:
             return random_document['_id']
         return None
 
-    def create_document(self) -> ObjectId:
+    def sample_ids(self, collection_name: str, size: int) -> list[ObjectId]:
+        """
+        Retrieve the ObjectIds of up to ``size`` documents chosen uniformly at
+        random by the server (``$sample``).
+
+        Args:
+            - ``collection_name (str):`` The collection to sample.
+            - ``size (int):`` The maximum number of ObjectIds to return.
+
+        Returns:
+            - ``list``: The sampled ObjectIds.
+        """
+        collection = self.db[collection_name]
+        pipeline = [{'$sample': {'size': size}}, {'$project': {'_id': 1}}]
+        return [document['_id'] for document in collection.aggregate(pipeline)]
+
+    def create_document(self, collection_name: str, document: dict) -> ObjectId:
         """
         Creates a new document in the provided collection using the specified data.
 
-        Inserts a new document into the collection using the data supplied during
-        object initialization.
+        Args:
+            - ``collection_name (str):`` The collection to insert into.
+            - ``document (dict):`` The data of the new document.
 
         Returns:
         - ``ObjectId``: The ObjectId of the created document.
         """
-        db = self.client[self.database_name]
-        collection = db[self.collection_name]
-        data = self.document
-        id = collection.insert_one(data)
-        self.client.close()
+        collection = self.db[collection_name]
+        id = collection.insert_one(document)
         return id.inserted_id
 
+    def get_update_paths(
+        self, collection_name: str, document: dict
+    ) -> tuple[str, ...]:
+        """
+        Return the updatable fields of a collection as dotted paths (e.g.
+        ``'dimensions.length'``), taken once from the shape of a generated
+        document and cached for the following updates.
+
+        Args:
+            - ``collection_name (str):`` The collection.
+            - ``document (dict):`` A generated document of the collection.
+
+        Returns:
+            ``tuple:`` The dotted paths of the leaf fields.
+        """
+        paths = self.update_paths.get(collection_name)
+        if paths is None:
+            paths = tuple(document_paths(document))
+            self.update_paths[collection_name] = paths
+        return paths
+
+    def build_update_data(
+        self,
+        collection_name: str,
+        document: dict,
+        percent_to_update: int = 10,
+        default_quantity: int | None = None,
+    ) -> dict:
+        """
+        Build the ``$set`` of an update action: a random selection of the
+        updatable fields of the collection with their values in ``document``.
+        """
+        paths_to_update = select_keys_to_update(
+            self.get_update_paths(collection_name, document),
+            percent_to_update,
+            default_quantity,
+        )
+        return {path: get_path(document, path) for path in paths_to_update}
+
     def update_document(
-        self, percent_to_update: int = 10, default_quantity: int | None = None
-    ) -> ObjectId:
+        self,
+        collection_name: str,
+        document: dict,
+        percent_to_update: int = 10,
+        default_quantity: int | None = None,
+        target_id: ObjectId | None = None,
+    ) -> ObjectId | None:
         """
         Update a random document in the provided collection with new data.
 
         Args:
+            - ``collection_name (str):`` The collection to update.
+
+            - ``document (dict):`` The data used as the source of the new
+            values.
+
             - ``percent_to_update (int, optional):`` Percentage of keys to update
             in the document. Default is 10.
 
             - ``default_quantity (int, optional):`` Number of keys to update in the
             document.
 
+            - ``target_id (ObjectId, optional):`` The document to update. By
+            default a document is retrieved with ``get_random_document``.
+
         This method attempts to update a random document in the collection with new data
         while keeping the ObjectId unchanged. The update process involves modifying a
-        specified percentage of the keys in the document (controlled by the `percent_to_update`)
-        or a specific number of keys (controlled by `default_quantity`).
+        specified percentage of the fields in the document (controlled by the `percent_to_update`)
+        or a specific number of fields (controlled by `default_quantity`). Nested
+        fields are updated individually by dotted path (see ``get_update_paths``),
+        so with ``target_id`` the update is a single ``update_one``.
 
-        If a random document is not found in the collection, the function does not perform any updates.
+        If a random document is not found in the collection, ``document`` is
+        inserted instead.
 
         Returns:
-        - ``ObjectId``: The ObjectId of the manipulated document.
+        - ``ObjectId`` or ``None``: The ObjectId of the manipulated document,
+        or None if ``target_id`` no longer exists.
         """
-        db = self.client[self.database_name]
-        collection = db[self.collection_name]
+        collection = self.db[collection_name]
 
-        random_id = self.get_random_document()
+        random_id = target_id or self.get_random_document(collection_name)
 
         if not random_id:
-            random_id = self.create_document()
+            return self.create_document(collection_name, document)
 
-        if random_id:
-            random_document = collection.find_one({'_id': random_id})
-
-            if random_document:
-                document_keys = list(random_document.keys())
-                document_keys.remove('_id')
-
-                if default_quantity is None:
-                    num_keys_to_update = (
-                        len(document_keys) * percent_to_update // 100
-                    )
-                    num_keys_to_update = max(num_keys_to_update, 1)
-                else:
-                    num_keys_to_update = min(
-                        default_quantity, len(document_keys)
-                    )
-
-                keys_to_update = random.sample(
-                    document_keys, num_keys_to_update
-                )
+        update_data = self.build_update_data(
+            collection_name, document, percent_to_update, default_quantity
+        )
+        result = collection.update_one(
+            {'_id': random_id}, {'$set': update_data}
+        )
 
-                update_data = {}
-
-                for key in keys_to_update:
-                    value_to_update = self.document.get(key)
-                    update_data[key] = value_to_update
-
-                collection.update_one(
-                    {'_id': random_id}, {'$set': update_data}
-                )
-
-        self.client.close()
+        if not result.matched_count:
+            return None
         return random_id
 
-    def delete_document(self)-> ObjectId:
+    def delete_document(
+        self,
+        collection_name: str,
+        document: dict | None = None,
+        target_id: ObjectId | None = None,
+    ) -> ObjectId | None:
         """
         Deletes a random document from the provided collection.
 
+        Args:
+            - ``collection_name (str):`` The collection to delete from.
+            - ``document (dict, optional):`` Inserted instead when the
+            collection is empty, so the action always touches a document.
+            - ``target_id (ObjectId, optional):`` The document to delete. By
+            default a document is retrieved with ``get_random_document``.
+
         Attempts to delete a random document from the collection based on its ObjectId.
         If no random document is found, the function does not perform any deletion.
 
         Returns:
         - ``ObjectId``: The ObjectId of the manipulated document.
         """
-        db = self.client[self.database_name]
-        collection = db[self.collection_name]
+        collection = self.db[collection_name]
 
-        random_id = self.get_random_document()
+        random_id = target_id or self.get_random_document(collection_name)
 
-        if not random_id:
-            random_id = self.create_document()
+        if not random_id and document is not None:
+            random_id = self.create_document(collection_name, document)
 
         if random_id:
             collection.delete_one({'_id': random_id})
 
-        self.client.close()
         return random_id
+
+    def build_update(
+        self,
+        collection_name: str,
+        document: dict,
+        target_id: ObjectId,
+        percent_to_update: int = 10,
+        default_quantity: int | None = None,
+    ) -> UpdateOne:
+        """
+        Build the ``UpdateOne`` operation of an update action for use with
+        ``bulk_write`` (see ``update_document``).
+
+        Args:
+            - ``collection_name (str):`` The collection to update.
+            - ``document (dict):`` The data used as the source of the new
+            values.
+            - ``target_id (ObjectId):`` The document to update.
+            - ``percent_to_update (int, optional):`` Percentage of keys to
+            update. Default is 10.
+            - ``default_quantity (int, optional):`` Number of keys to update.
+
+        Returns:
+            ``UpdateOne:`` The write operation.
+        """
+        update_data = self.build_update_data(
+            collection_name, document, percent_to_update, default_quantity
+        )
+        return UpdateOne({'_id': target_id}, {'$set': update_data})
+
+    def bulk_write(
+        self, collection_name: str, operations: list
+    ) -> dict:
+        """
+        Send a list of write operations to the collection in a single
+        unordered ``bulk_write``.
+
+        A failing operation does not stop the others; its error is reported
+        in the returned summary instead of being raised.
+
+        Args:
+            - ``collection_name (str):`` The collection to write to.
+            - ``operations (list):`` ``InsertOne``, ``UpdateOne`` and
+            ``DeleteOne`` operations.
+
+        Returns:
+            ``dict:`` The server summary of the batch (``nInserted``,
+            ``nMatched``, ``nModified``, ``nRemoved``, ``writeErrors``...).
+        """
+        collection = self.db[collection_name]
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            return result.bulk_api_result
+        except BulkWriteError as error:
+            return error.details
+
+    def insert_documents(
+        self, collection_name: str, documents: list[dict]
+    ) -> dict:
+        """
+        Insert documents with a single unordered ``insert_many``, e.g. to
+        seed a collection. A failing document does not stop the others.
+
+        Args:
+            - ``collection_name (str):`` The collection to insert into.
+            - ``documents (list):`` The documents to insert.
+
+        Returns:
+            ``dict:`` The number of documents ``inserted`` and of
+            ``errors``.
+        """
+        collection = self.db[collection_name]
+        try:
+            result = collection.insert_many(documents, ordered=False)
+            return {'inserted': len(result.inserted_ids), 'errors': 0}
+        except BulkWriteError as error:
+            return {
+                'inserted': error.details['nInserted'],
+                'errors': len(error.details['writeErrors']),
+            }
+
+    def ensure_read_indexes(self, collection_name: str, document: dict):
+        """
+        Create, once per collection, the indexes used by the read actions:
+        its secondary key and, for deliveries, the delivery date.
+
+        Args:
+            - ``collection_name (str):`` The collection.
+            - ``document (dict):`` A generated document of the collection.
+        """
+        if collection_name in self.indexed:
+            return
+        paths = [find_lookup_key(document)]
+        if date_window(document, RANGE_WINDOW) is not None:
+            paths.append(DELIVERY_DATE_PATH)
+
+        collection = self.db[collection_name]
+        for path in paths:
+            if path is not None:
+                collection.create_index(path)
+        self.indexed.add(collection_name)
+
+    def read_document(self, collection_name: str, target_id: ObjectId) -> int:
+        """
+        Find a document by its ``_id``.
+
+        Returns:
+            ``int:`` 1 if the document was found, otherwise 0.
+        """
+        collection = self.db[collection_name]
+        return int(collection.find_one({'_id': target_id}) is not None)
+
+    def lookup_documents(self, collection_name: str, document: dict) -> int:
+        """
+        Find up to ``LOOKUP_LIMIT`` documents with the same secondary key
+        (``cnpj``, ``vehicle_plate``, ``city_id``...) as a generated
+        document.
+
+        Returns:
+            ``int:`` The number of documents found.
+        """
+        path = find_lookup_key(document)
+        if path is None:
+            return 0
+        collection = self.db[collection_name]
+        cursor = collection.find({path: get_path(document, path)})
+        return len(list(cursor.limit(LOOKUP_LIMIT)))
+
+    def range_documents(
+        self,
+        collection_name: str,
+        document: dict,
+        target_id: ObjectId | None = None,
+    ) -> int:
+        """
+        Scan up to ``RANGE_LIMIT`` documents in a range: deliveries starting
+        within ``RANGE_WINDOW`` of the date of a generated delivery, or for
+        the other models the ``_id``s following ``target_id``.
+
+        Returns:
+            ``int:`` The number of documents found.
+        """
+        collection = self.db[collection_name]
+        window = date_window(document, RANGE_WINDOW)
+        if window is not None:
+            start, end = window
+            query = {DELIVERY_DATE_PATH: {'$gte': start, '$lt': end}}
+            sort = DELIVERY_DATE_PATH
+        elif target_id is not None:
+            query = {'_id': {'$gte': target_id}}
+            sort = '_id'
+        else:
+            return 0
+        cursor = collection.find(query).sort(sort).limit(RANGE_LIMIT)
+        return len(list(cursor))
+
+    def aggregate_documents(
+        self,
+        collection_name: str,
+        document: dict,
+        target_id: ObjectId | None = None,
+    ) -> int:
+        """
+        Run a reporting aggregation: for deliveries, the number of
+        deliveries and the value of their products by origin city over
+        ``AGGREGATE_WINDOW`` from the date of a generated delivery; for the
+        other models, the count by secondary key of ``AGGREGATE_SCAN``
+        documents from ``target_id``.
+
+        Returns:
+            ``int:`` The number of groups returned.
+        """
+        window = date_window(document, AGGREGATE_WINDOW)
+        if window is not None:
+            pipeline = [
+                {
+                    '$match': {
+                        DELIVERY_DATE_PATH: {
+                            '$gte': window[0],
+                            '$lt': window[1],
+                        }
+                    }
+                },
+                {
+                    '$group': {
+                        '_id': '$data_delivery.origin.city_id',
+                        'deliveries': {'$sum': 1},
+                        'value': {
+                            '$sum': {'$sum': '$data_delivery.products.price'}
+                        },
+                    }
+                },
+                {'$sort': {'deliveries': -1}},
+                {'$limit': 10},
+            ]
+        else:
+            path = find_lookup_key(document) or '_id'
+            match = {'_id': {'$gte': target_id}} if target_id else {}
+            pipeline = [
+                {'$match': match},
+                {'$limit': AGGREGATE_SCAN},
+                {'$group': {'_id': f'${path}', 'count': {'$sum': 1}}},
+                {'$sort': {'count': -1}},
+                {'$limit': 10},
+            ]
+        collection = self.db[collection_name]
+        return len(list(collection.aggregate(pipeline)))
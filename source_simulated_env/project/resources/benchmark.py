@@ -0,0 +1,380 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+from actions_db import MongoDBActions
+from metrics import LatencyHistogram
+from pymongo import DeleteOne, InsertOne
+from results import compare_metric
+from termcolor import colored
+from workload import GENERATORS
+
+from project.config import BENCHMARK_DIR
+
+SUITES = ('generators', 'actions')
+GENERATOR_QUANTITIES = (1, 100, 1000)
+BENCHMARK_ACTIONS = (
+    'create',
+    'update',
+    'delete',
+    'read',
+    'lookup',
+    'range',
+    'aggregate',
+)
+BATCHED_ACTIONS = ('create', 'update', 'delete')
+BATCH_SIZES = (1, 50)
+CONCURRENCY_LEVELS = (1, 4)
+DEFAULT_OPERATIONS = 1000
+DEFAULT_REPEAT = 3
+MIN_RUN_SECONDS = 0.2
+DEFAULT_TOLERANCE = 0.2
+BENCHMARK_MODEL = 'delivery'
+IN_MEMORY_HOST = 'localhost'
+IN_MEMORY_PORT = 27017
+IN_MEMORY_TARGET = 'inmemory'
+MONGODB_TARGET = 'mongodb'
+# Metrics of which a higher value is better; the others are latencies.
+HIGHER_IS_BETTER = ('records_per_sec', 'ops_per_sec')
+
+
+def benchmark_generator(
+    name: str, quantity: int, repeat: int = DEFAULT_REPEAT
+) -> dict:
+    """
+    Measure the records generated per second by a ``generator_*_data``
+    function, keeping the best of ``repeat`` runs. A run calls the
+    generator for at least ``MIN_RUN_SECONDS``, so small quantities are
+    not measured from a single call.
+
+    Args:
+        - ``name (str):`` The model of the generator (see ``GENERATORS``).
+        - ``quantity (int):`` The number of records of each call.
+        - ``repeat (int, optional):`` The number of runs. Default is 3.
+
+    Returns:
+        ``dict:`` The ``records_per_sec`` of the generator.
+    """
+    generator_func = GENERATORS[name]
+    best = 0.0
+    for _ in range(repeat):
+        records = 0
+        started = time.perf_counter()
+        while True:
+            generator_func(quantity=quantity)
+            records += quantity
+            elapsed = time.perf_counter() - started
+            if elapsed >= MIN_RUN_SECONDS:
+                break
+        best = max(best, records / elapsed)
+    return {'records_per_sec': best}
+
+
+def run_generator_suite(
+    quantities: tuple = GENERATOR_QUANTITIES, repeat: int = DEFAULT_REPEAT
+) -> dict:
+    """Benchmark every generator at each of ``quantities``."""
+    return {
+        f'{name}/quantity={quantity}': benchmark_generator(
+            name, quantity, repeat
+        )
+        for name in GENERATORS
+        for quantity in quantities
+    }
+
+
+class ActionBenchmark:
+    """
+    Measures the throughput and latency of a ``MongoDBActions`` action on a
+    collection seeded before each measure, so every update, delete and read
+    finds its target.
+
+    Documents are generated before the clock starts: only the requests to
+    the database are measured. With a ``batch_size`` above 1, the writes are
+    sent as unordered ``bulk_write``s of ``batch_size`` operations; reads are
+    always single requests. The requests are split among ``concurrency``
+    threads sharing the pooled client.
+
+    Arguments and Attributes:
+        - ``actions (MongoDBActions):`` The actions on the benchmarked
+        database.
+        - ``model (str, optional):`` The model of the documents. Default is
+        ``BENCHMARK_MODEL``.
+        - ``operations (int, optional):`` Number of operations of each
+        measure. Default is 1000.
+    """
+
+    def __init__(
+        self,
+        actions: MongoDBActions,
+        model: str = BENCHMARK_MODEL,
+        operations: int = DEFAULT_OPERATIONS,
+    ):
+        if operations < 1:
+            message_error = colored(
+                f'✗ THE "operations" PARAMETER MUST BE A POSITIVE INTEGER.[** "{operations}":INVALID **]',
+                'red',
+            )
+            raise ValueError(message_error)
+
+        self.actions = actions
+        self.operations = operations
+        data = GENERATORS[model](quantity=operations)
+        self.collection_name, self.documents = next(iter(data.items()))
+        self.target_ids = []
+
+    def seed(self):
+        """Replace the collection with the generated documents."""
+        collection = self.actions.db[self.collection_name]
+        collection.drop()
+        self.actions.indexed.discard(self.collection_name)
+        self.actions.insert_documents(
+            self.collection_name,
+            [dict(document) for document in self.documents],
+        )
+        self.actions.ensure_read_indexes(
+            self.collection_name, self.documents[0]
+        )
+        self.target_ids = [
+            document['_id'] for document in collection.find({}, {'_id': 1})
+        ]
+
+    def request(self, action: str, indexes: range):
+        """Send the request of ``action`` on the documents of ``indexes``."""
+        name = self.collection_name
+        documents = [self.documents[index] for index in indexes]
+        target_ids = [self.target_ids[index] for index in indexes]
+        if len(documents) > 1:
+            if action == 'create':
+                operations = [
+                    InsertOne(dict(document)) for document in documents
+                ]
+            elif action == 'update':
+                operations = [
+                    self.actions.build_update(name, document, target_id)
+                    for document, target_id in zip(documents, target_ids)
+                ]
+            else:
+                operations = [
+                    DeleteOne({'_id': target_id}) for target_id in target_ids
+                ]
+            self.actions.bulk_write(name, operations)
+            return
+
+        document, target_id = documents[0], target_ids[0]
+        if action == 'create':
+            self.actions.create_document(name, dict(document))
+        elif action == 'update':
+            self.actions.update_document(name, document, target_id=target_id)
+        elif action == 'delete':
+            self.actions.delete_document(name, target_id=target_id)
+        elif action == 'read':
+            self.actions.read_document(name, target_id)
+        elif action == 'lookup':
+            self.actions.lookup_documents(name, document)
+        elif action == 'range':
+            self.actions.range_documents(name, document, target_id)
+        else:
+            self.actions.aggregate_documents(name, document, target_id)
+
+    def measure(
+        self, action: str, batch_size: int = 1, concurrency: int = 1
+    ) -> dict:
+        """
+        Measure an action.
+
+        Args:
+            - ``action (str):`` One of ``BENCHMARK_ACTIONS``.
+            - ``batch_size (int, optional):`` Operations per request of the
+            writes. Default is 1.
+            - ``concurrency (int, optional):`` Number of threads sending the
+            requests. Default is 1.
+
+        Returns:
+            ``dict:`` The ``ops_per_sec`` and the ``p50``/``p95``/``p99``
+            latencies of the requests in milliseconds.
+        """
+        self.seed()
+        requests = [
+            range(start, min(start + batch_size, self.operations))
+            for start in range(0, self.operations, batch_size)
+        ]
+
+        def send(share: list) -> LatencyHistogram:
+            histogram = LatencyHistogram()
+            for indexes in share:
+                started = time.perf_counter()
+                self.request(action, indexes)
+                histogram.record(time.perf_counter() - started)
+            return histogram
+
+        started = time.perf_counter()
+        shares = [requests[index::concurrency] for index in range(concurrency)]
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            histograms = list(executor.map(send, shares))
+        wall_time = time.perf_counter() - started
+
+        latency = LatencyHistogram()
+        for histogram in histograms:
+            latency.merge(histogram)
+        snapshot = latency.snapshot()
+        return {
+            'ops_per_sec': self.operations / wall_time if wall_time else 0.0,
+            'p50': snapshot['p50'],
+            'p95': snapshot['p95'],
+            'p99': snapshot['p99'],
+        }
+
+
+@contextmanager
+def open_actions(db_address: str, db_name: str, in_memory: bool = False):
+    """
+    Open the ``MongoDBActions`` of a benchmark, on ``db_address`` or, with
+    ``in_memory``, on an in-process ``mongomock`` database (a development
+    dependency), e.g. without a local ``mongod``.
+    """
+    if not in_memory:
+        with MongoDBActions(db_address, db_name, keep_alive=False) as actions:
+            yield actions
+        return
+
+    try:
+        import mongomock
+    except ImportError:
+        raise ValueError(
+            colored(
+                '✗ THE IN-MEMORY BENCHMARK NEEDS THE "mongomock" PACKAGE OF THE DEV DEPENDENCIES.',
+                'red',
+            )
+        )
+    with mongomock.patch(servers=((IN_MEMORY_HOST, IN_MEMORY_PORT),)):
+        with MongoDBActions(
+            f'mongodb://{IN_MEMORY_HOST}:{IN_MEMORY_PORT}/',
+            db_name,
+            keep_alive=False,
+        ) as actions:
+            yield actions
+
+
+def run_action_suite(
+    actions: MongoDBActions,
+    batch_sizes: tuple = BATCH_SIZES,
+    concurrency_levels: tuple = CONCURRENCY_LEVELS,
+    operations: int = DEFAULT_OPERATIONS,
+    model: str = BENCHMARK_MODEL,
+) -> dict:
+    """
+    Benchmark every action at each concurrency level, and the writes at
+    each batch size (see ``ActionBenchmark``). The benchmarked collection is
+    dropped at the end.
+    """
+    benchmark = ActionBenchmark(actions, model, operations)
+    results = {}
+    try:
+        for action in BENCHMARK_ACTIONS:
+            sizes = batch_sizes if action in BATCHED_ACTIONS else (1,)
+            for batch_size in sizes:
+                for concurrency in concurrency_levels:
+                    key = (
+                        f'{action}/batch={batch_size}/'
+                        f'concurrency={concurrency}'
+                    )
+                    results[key] = benchmark.measure(
+                        action, batch_size, concurrency
+                    )
+    finally:
+        actions.db[benchmark.collection_name].drop()
+    return results
+
+
+def benchmark_target(suite: str, in_memory: bool = False) -> str | None:
+    """
+    Return the backend measured by a suite: ``IN_MEMORY_TARGET`` or
+    ``MONGODB_TARGET`` for the actions, None for the generators, which do
+    not touch a database.
+    """
+    if suite != 'actions':
+        return None
+    return IN_MEMORY_TARGET if in_memory else MONGODB_TARGET
+
+
+def baseline_path(
+    suite: str, directory: str = BENCHMARK_DIR, target: str | None = None
+) -> str:
+    """
+    Return the baseline file of a suite, keyed by its ``target`` backend
+    (see ``benchmark_target``), e.g. ``actions-inmemory.json``.
+    """
+    name = f'{suite}-{target}' if target else suite
+    return os.path.join(directory, f'{name}.json')
+
+
+def save_baseline(
+    suite: str, results: dict, path: str, target: str | None = None
+):
+    """Save the results of a suite on its ``target`` as its baseline."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    baseline = {
+        'suite': suite,
+        'target': target,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as baseline_file:
+        json.dump(baseline, baseline_file, indent=2)
+
+
+def load_baseline(path: str, target: str | None = None) -> dict | None:
+    """
+    Return the results of a baseline file, or None if there is none. A
+    baseline measured on another ``target`` backend is not comparable and
+    raises a ``ValueError``.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as baseline_file:
+        baseline = json.load(baseline_file)
+    baseline_target = baseline.get('target')
+    if baseline_target != target:
+        message_error = colored(
+            f'✗ THE BASELINE "{path}" WAS MEASURED ON ANOTHER BACKEND.[** "{baseline_target}":INVALID **]',
+            'red',
+        )
+        raise ValueError(message_error)
+    return baseline['results']
+
+
+def compare_to_baseline(
+    results: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE
+) -> list[dict]:
+    """
+    Compare the results of a suite to its baseline. Cases missing from the
+    baseline are skipped.
+
+    Args:
+        - ``results (dict):`` The metrics of each case of the suite.
+        - ``baseline (dict):`` The metrics of the baseline.
+        - ``tolerance (float, optional):`` The relative change beyond which
+        a worse metric is a regression. Default is 0.2 (20%).
+
+    Returns:
+        ``list:`` The comparison of each metric (see ``compare_metric``).
+    """
+    return [
+        compare_metric(
+            f'{case} {metric}',
+            baseline[case][metric],
+            value,
+            metric in HIGHER_IS_BETTER,
+            tolerance,
+        )
+        for case, metrics in results.items()
+        if case in baseline
+        for metric, value in metrics.items()
+        if metric in baseline[case]
+    ]
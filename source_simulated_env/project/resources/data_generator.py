@@ -2,11 +2,368 @@ import csv
 import json
 import os
 import random
+import threading
+from collections.abc import Callable, Iterator
+from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import accumulate
+from types import MappingProxyType
+from typing import NamedTuple
 
 from faker import Faker
 from termcolor import colored
 
 LANGUAGE = 'pt_BR'
+SEED_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'seed'
+)
+# Values of the descriptive Faker fields (names, addresses, phones, e-mails)
+# are drawn from pools of this size, so they repeat across larger datasets.
+FAKER_POOL_SIZE = int(os.getenv('FAKER_POOL_SIZE', 10_000))
+# Faker providers of the business keys (CNH, plate, CNPJ): they are
+# generated for every record instead of being drawn from a pool, so lookups
+# and ``$group``s on them see realistic cardinalities.
+KEY_PROVIDERS = ('ssn', 'license_plate', 'cnpj')
+# The key Faker instances of each thread (see ``get_key_faker``).
+_KEY_FAKERS = threading.local()
+VEHICLE_TYPES = ('Truck', 'Báu', 'Van', 'Mini-Cargo')
+DIMENSION_VALUES = tuple(round(step * 0.1, 1) for step in range(51))
+DIMENSION_CUM_WEIGHTS = tuple(step + 0.5 for step in range(50)) + (50,)
+DEFAULT_CHUNK_SIZE = 1000
+
+
+class MunicipalityTable(NamedTuple):
+    """
+    Column-oriented, read-only view of ``seed/municipios.csv``: row ``i`` of
+    the seed is ``city_ids[i]``, ``city_names[i]``, ``latitudes[i]`` and
+    ``longitudes[i]``, kept as the strings of the seed.
+    """
+
+    city_ids: tuple[str, ...]
+    city_names: tuple[str, ...]
+    latitudes: tuple[str, ...]
+    longitudes: tuple[str, ...]
+
+
+@lru_cache(maxsize=None)
+def load_municipalities() -> MunicipalityTable:
+    """
+    Load the municipality seed once per process into a ``MunicipalityTable``.
+    """
+    file_path = os.path.join(SEED_DIR, 'municipios.csv')
+    with open(file_path, newline='', encoding='utf-8') as csvfile:
+        read = csv.reader(csvfile, delimiter=',')
+        next(read)
+        rows = [row[:4] for row in read]
+
+    city_ids, city_names, latitudes, longitudes = zip(*rows)
+    return MunicipalityTable(city_ids, city_names, latitudes, longitudes)
+
+
+def sample_locations(quantity: int) -> list[dict]:
+    """
+    Draw ``quantity`` random municipalities (with replacement) from the seed
+    in a single draw and return them as location records.
+    """
+    table = load_municipalities()
+    indexes = random.choices(range(len(table.city_names)), k=quantity)
+    return locations_from_indexes(indexes)
+
+
+def sample_location_pairs(quantity: int) -> tuple[list[dict], list[dict]]:
+    """
+    Draw ``quantity`` pairs of distinct municipalities, e.g. the origin and
+    destination of deliveries.
+
+    Returns:
+        ``tuple:`` The list of first locations and the list of second
+        locations of each pair.
+    """
+    table = load_municipalities()
+    size = len(table.city_names)
+    first = random.choices(range(size), k=quantity)
+    offsets = random.choices(range(1, size), k=quantity)
+    second = [
+        (index + offset) % size for index, offset in zip(first, offsets)
+    ]
+    return locations_from_indexes(first), locations_from_indexes(second)
+
+
+def locations_from_indexes(indexes: list[int]) -> list[dict]:
+    """
+    Build the location records of the given municipality seed rows, with
+    the seed's string values as ``city_id`` and coordinates.
+    """
+    table = load_municipalities()
+    return [
+        {
+            'city_id': table.city_ids[index],
+            'city_name': table.city_names[index],
+            'coordinates': {
+                'latitude': table.latitudes[index],
+                'longitude': table.longitudes[index],
+            },
+        }
+        for index in indexes
+    ]
+
+
+def freeze_template(value):
+    """
+    Return a read-only copy of a JSON value: dicts become
+    ``MappingProxyType`` and lists become tuples.
+    """
+    if isinstance(value, dict):
+        return MappingProxyType(
+            {key: freeze_template(item) for key, item in value.items()}
+        )
+    if isinstance(value, list):
+        return tuple(freeze_template(item) for item in value)
+    return value
+
+
+def thaw_template(value):
+    """Return a new mutable copy of a value frozen by ``freeze_template``."""
+    if isinstance(value, MappingProxyType):
+        return {key: thaw_template(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw_template(item) for item in value]
+    return value
+
+
+@lru_cache(maxsize=None)
+def load_product_catalog() -> tuple[MappingProxyType, ...]:
+    """
+    Load ``seed/products.json`` once per process as an immutable catalog of
+    product templates.
+    """
+    file_path = os.path.join(SEED_DIR, 'products.json')
+    with open(file_path, 'r', encoding='utf-8') as json_file:
+        return freeze_template(json.load(json_file))
+
+
+def sample_products(quantity: int) -> list[dict]:
+    """
+    Draw ``quantity`` random products (with replacement) from the catalog in
+    a single draw. Each product is a new ``dict``, so callers may change it
+    (e.g. ``insert_one`` adding ``_id``) without touching the catalog.
+    """
+    return [
+        thaw_template(product)
+        for product in random.choices(load_product_catalog(), k=quantity)
+    ]
+
+
+@lru_cache(maxsize=None)
+def get_faker(language: str = LANGUAGE) -> Faker:
+    """Return the ``Faker`` instance shared by the process for a language."""
+    return Faker(language)
+
+
+@lru_cache(maxsize=None)
+def faker_pool(language: str, provider: str) -> tuple:
+    """
+    Build once per process a pool of ``FAKER_POOL_SIZE`` values of a Faker
+    provider (e.g. ``'name'``, ``'cnpj'``) in the given language.
+
+    Generating a value with Faker costs tens of microseconds, so generators
+    sample the descriptive fields from these pools instead; their values
+    therefore repeat across records once more than ``FAKER_POOL_SIZE``
+    records are generated. The business keys are not pooled (see
+    ``generate_keys``).
+    """
+    generate = getattr(get_faker(language), provider)
+    return tuple(generate() for _ in range(FAKER_POOL_SIZE))
+
+
+def get_key_faker(language: str = LANGUAGE) -> Faker:
+    """
+    Return the ``Faker`` instance generating the business keys of a
+    language in the current thread, whose random state is its own (see
+    ``generate_keys``). Each thread has its own instance, e.g. the
+    ``PrefetchBuffer`` producers of a mixed-model run.
+    """
+    fakers = getattr(_KEY_FAKERS, 'fakers', None)
+    if fakers is None:
+        fakers = _KEY_FAKERS.fakers = {}
+    faker = fakers.get(language)
+    if faker is None:
+        faker = fakers[language] = Faker(language)
+    return faker
+
+
+def generate_keys(language: str, provider: str, quantity: int) -> list:
+    """
+    Generate ``quantity`` new values of a business key provider (one of
+    ``KEY_PROVIDERS``), so keys do not repeat as pooled values do.
+
+    The Faker instance is reseeded from ``random`` first, so the keys are
+    reproducible along with the other draws (see ``seed_generators``).
+    """
+    faker = get_key_faker(language)
+    faker.seed_instance(random.getrandbits(64))
+    generate = getattr(faker, provider)
+    return [generate() for _ in range(quantity)]
+
+
+def seed_generators(seed: int | str):
+    """
+    Seed the random draws and rebuild the Faker pools of the process from
+    ``seed``, so the records generated next are reproducible.
+    """
+    random.seed(seed)
+    Faker.seed(seed)
+    faker_pool.cache_clear()
+
+
+def sample_faker(language: str, provider: str, quantity: int) -> list:
+    """Draw ``quantity`` values from the pool of a Faker provider."""
+    return random.choices(faker_pool(language, provider), k=quantity)
+
+
+def sample_dimensions(quantity: int) -> list[float]:
+    """
+    Draw ``quantity`` values of ``round(random.uniform(0.0, 5.0), 1)`` in a
+    single draw.
+    """
+    return random.choices(
+        DIMENSION_VALUES, cum_weights=DIMENSION_CUM_WEIGHTS, k=quantity
+    )
+
+
+def sample_dates_this_month(quantity: int) -> list[str]:
+    """
+    Draw ``quantity`` ISO datetimes between now and the end of the current
+    month, as ``Faker.date_time_this_month(before_now=False,
+    after_now=True)``.
+    """
+    now = datetime.now().replace(microsecond=0)
+    next_month = (now.replace(day=28) + timedelta(days=4)).replace(
+        day=1, hour=0, minute=0, second=0
+    )
+    span = max(int((next_month - now).total_seconds()), 1)
+    return [
+        (now + timedelta(seconds=seconds)).isoformat()
+        for seconds in random.choices(range(span), k=quantity)
+    ]
+
+
+def assemble_records(columns: dict[str, list]) -> list[dict]:
+    """
+    Build the records of a batch from its columns: record ``i`` maps each
+    key of ``columns`` to the ``i``-th value of that column.
+    """
+    keys = tuple(columns)
+    return [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+
+def driver_records(language: str, quantity: int) -> list[dict]:
+    """Generate ``quantity`` driver records column by column."""
+    return assemble_records(
+        {
+            'name': sample_faker(language, 'name', quantity),
+            'cnh_number': generate_keys(language, 'ssn', quantity),
+            'address': sample_faker(language, 'address', quantity),
+            'phone_number': sample_faker(language, 'phone_number', quantity),
+            'e-mail': sample_faker(language, 'ascii_free_email', quantity),
+        }
+    )
+
+
+def vehicle_records(language: str, quantity: int) -> list[dict]:
+    """Generate ``quantity`` vehicle records column by column."""
+    dimensions = sample_dimensions(3 * quantity)
+    return assemble_records(
+        {
+            'name': random.choices(VEHICLE_TYPES, k=quantity),
+            'vehicle_plate': generate_keys(
+                language, 'license_plate', quantity
+            ),
+            'dimensions': assemble_records(
+                {
+                    'length': dimensions[0::3],
+                    'width': dimensions[1::3],
+                    'height': dimensions[2::3],
+                }
+            ),
+        }
+    )
+
+
+def client_records(language: str, quantity: int) -> list[dict]:
+    """Generate ``quantity`` client records column by column."""
+    companies = sample_faker(language, 'company', quantity)
+    suffixes = sample_faker(language, 'company_suffix', quantity)
+    return assemble_records(
+        {
+            'name': [
+                f'{company} {suffix}'
+                for company, suffix in zip(companies, suffixes)
+            ],
+            'cnpj': generate_keys(language, 'cnpj', quantity),
+            'address': sample_faker(language, 'address', quantity),
+            'phone_number': sample_faker(language, 'phone_number', quantity),
+            'e-mail': sample_faker(language, 'ascii_free_email', quantity),
+        }
+    )
+
+
+def location_records(language: str, quantity: int) -> list[dict]:
+    """Generate ``quantity`` location records from the municipality seed."""
+    return sample_locations(quantity)
+
+
+def product_records(language: str, quantity: int) -> list[dict]:
+    """Generate ``quantity`` product records from the product catalog."""
+    return sample_products(quantity)
+
+
+def delivery_records(language: str, quantity: int) -> list[dict]:
+    """
+    Generate ``quantity`` delivery records, drawing each of their parts
+    (drivers, vehicles, clients, locations, products) as one batch.
+    """
+    origins, destinations = sample_location_pairs(quantity)
+    product_counts = random.choices(range(1, 6), k=quantity)
+    products = sample_products(sum(product_counts))
+    ends = list(accumulate(product_counts))
+    starts = [0] + ends[:-1]
+
+    return assemble_records(
+        {
+            'driver': driver_records(language, quantity),
+            'vehicle': vehicle_records(language, quantity),
+            'client': client_records(language, quantity),
+            'data_delivery': assemble_records(
+                {
+                    'data_start': sample_dates_this_month(quantity),
+                    'origin': origins,
+                    'destination': destinations,
+                    'products': [
+                        products[start:end]
+                        for start, end in zip(starts, ends)
+                    ],
+                }
+            ),
+        }
+    )
+
+
+class Model(NamedTuple):
+    """The default collection and the batch function of a model."""
+
+    collection_name: str
+    records: Callable[[str, int], list[dict]]
+
+
+MODELS = {
+    'driver': Model('DriverCollection', driver_records),
+    'vehicle': Model('VehicleCollection', vehicle_records),
+    'client': Model('ClientCollection', client_records),
+    'location': Model('LocationCollection', location_records),
+    'product': Model('ProductCollection', product_records),
+    'delivery': Model('DeliveryCollection', delivery_records),
+}
 
 
 def validate_quantity(quantity) -> int:
@@ -23,6 +380,15 @@ def validate_quantity(quantity) -> int:
     return quantity
 
 
+def split_quantity(total: int, parts: int) -> list[int]:
+    """
+    Split ``total`` into ``parts`` integers as equal as possible, e.g.
+    ``split_quantity(10, 3) == [4, 3, 3]``.
+    """
+    quotient, remainder = divmod(total, parts)
+    return [quotient + (index < remainder) for index in range(parts)]
+
+
 def generator_driver_data(
     language: str = LANGUAGE,
     collection_name: str = 'DriverCollection',
@@ -46,18 +412,7 @@ def generator_driver_data(
         lists of driver records in the specified language.
     """
     quantity = validate_quantity(quantity)
-    fake = Faker(language)
-    drivers = []
-
-    for _ in range(quantity):
-        driver = {
-            'name': fake.name(),
-            'cnh_number': fake.ssn(),
-            'address': fake.address(),
-            'phone_number': fake.phone_number(),
-            'e-mail': fake.ascii_free_email(),
-        }
-        drivers.append(driver)
+    drivers = driver_records(language, quantity)
     return {collection_name: drivers}
 
 
@@ -84,20 +439,7 @@ def generator_vehicle_data(
         lists of driver records in the specified language.
     """
     quantity = validate_quantity(quantity)
-    fake = Faker(language)
-    vehicles = []
-
-    for _ in range(quantity):
-        vehicle = {
-            'name': random.choice(['Truck', 'Báu', 'Van', 'Mini-Cargo']),
-            'vehicle_plate': fake.license_plate(),
-            'dimensions': {
-                'length': round(random.uniform(0.0, 5.0), 1),
-                'width': round(random.uniform(0.0, 5.0), 1),
-                'height': round(random.uniform(0.0, 5.0), 1),
-            },
-        }
-        vehicles.append(vehicle)
+    vehicles = vehicle_records(language, quantity)
     return {collection_name: vehicles}
 
 
@@ -124,18 +466,7 @@ def generator_client_data(
         lists of driver records in the specified language.
     """
     quantity = validate_quantity(quantity)
-    fake = Faker(language)
-    clients = []
-
-    for _ in range(quantity):
-        client = {
-            'name': f'{fake.company()} {fake.company_suffix()}',
-            'cnpj': fake.cnpj(),
-            'address': fake.address(),
-            'phone_number': fake.phone_number(),
-            'e-mail': fake.ascii_free_email(),
-        }
-        clients.append(client)
+    clients = client_records(language, quantity)
     return {collection_name: clients}
 
 
@@ -164,33 +495,13 @@ def generator_location_data(
     This function generates location data based on a local CSV file that contains
     municipality information. It randomly selects rows from the CSV file to create
     location records with city IDs, names, and coordinates (latitude and longitude).
+    The CSV file is only read once per process (see ``load_municipalities``).
 
     The `language` parameter allows you to specify the language for generating
     fake data.
     """
     quantity = validate_quantity(quantity)
-    fake = Faker(language)
-    locations = []
-
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(script_dir, '..', 'seed', 'municipios.csv')
-
-    for _ in range(quantity):
-        with open(file_path, newline='', encoding='utf-8') as csvfile:
-            read = csv.reader(csvfile, delimiter=',')
-            next(read)
-            data = list(read)
-            row = fake.random_element(data)
-            city_id = row[0]
-            city_name = row[1]
-            latitude = row[2]
-            longitude = row[3]
-            location = {
-                'city_id': city_id,
-                'city_name': city_name,
-                'coordinates': {'latitude': latitude, 'longitude': longitude},
-            }
-            locations.append(location)
+    locations = location_records(language, quantity)
     return {collection_name: locations}
 
 
@@ -220,22 +531,15 @@ def generator_product_data(
     product information. It randomly selects products from the JSON file to create
     product records with details such as name, price, and description.
 
+    The JSON file is only parsed once per process (see
+    ``load_product_catalog``) and every returned product is a new copy of the
+    catalog entry.
+
     The `language` parameter allows you to specify the language for generating
     fake data
     """
     quantity = validate_quantity(quantity)
-    fake = Faker(language)
-    products = []
-
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    file_path = os.path.join(script_dir, '..', 'seed', 'products.json')
-
-    with open(file_path, 'r', encoding='utf-8') as json_file:
-        data = json.load(json_file)
-
-        for _ in range(quantity):
-            product = fake.random_element(data)
-            products.append(product)
+    products = product_records(language, quantity)
     return {collection_name: products}
 
 
@@ -263,47 +567,125 @@ def generator_delivery_data(
 
     This function generates delivery data by combining various other functions
     to create a complete delivery record. It includes a driver, a vehicle, a client,
-    origin and destination locations, and a product for each delivery.
+    distinct origin and destination locations, and one to five products for
+    each delivery.
 
     The `language` parameter allows you to specify the language for generating
     fake data.
     """
     quantity = validate_quantity(quantity)
-    fake = Faker(language)
-    deliveries: list[dict] = []
-    products: list[dict] = []
-
-    for _ in range(quantity):
-        driver = generator_driver_data()['DriverCollection'][0]
-        vehicle = generator_vehicle_data()['VehicleCollection'][0]
-        client = generator_client_data()['ClientCollection'][0]
-        location_origin = generator_location_data()['LocationCollection'][0]
-        location_destination = None
-
-        while (
-            location_destination is None
-            or location_destination == location_origin
-        ):
-            location_destination = generator_location_data()[
-                'LocationCollection'
-            ][0]
-
-        for _ in range(random.randint(1, 5)):
-            product = generator_product_data()['ProductCollection'][0]
-            products.append(product)
-
-        delivery = {
-            'driver': driver,
-            'vehicle': vehicle,
-            'client': client,
-            'data_delivery': {
-                'data_start': fake.date_time_this_month(
-                    before_now=False, after_now=True
-                ).isoformat(),
-                'origin': location_origin,
-                'destination': location_destination,
-                'products': products,
-            },
-        }
-        deliveries.append(delivery)
+    deliveries = delivery_records(language, quantity)
     return {collection_name: deliveries}
+
+
+def stream_records(
+    records_func: Callable[[str, int], list[dict]],
+    language: str = LANGUAGE,
+    quantity: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[list[dict]]:
+    """
+    Generate records in chunks, so only one chunk is held in memory at a
+    time.
+
+    Args:
+        - ``records_func (Callable):`` The batch function of the model (e.g.
+        ``driver_records``).
+        - ``language (str, optional):`` The language to use for generating
+        fake data. Default is 'LANGUAGE='pt_BR' (Brazilian Portuguese).
+        - ``quantity (int, optional):`` The total number of records to
+        generate. Default is None (endless stream).
+        - ``chunk_size (int, optional):`` The number of records of each chunk
+        (the last one may be smaller). Default is 1000.
+
+    Returns:
+        ``Iterator:`` An iterator of lists of records, ready for
+        ``insert_many``/``bulk_write`` or to be written to a file.
+    """
+    chunk_size = validate_quantity(chunk_size)
+    if quantity is not None:
+        quantity = validate_quantity(quantity)
+    return _iter_chunks(records_func, language, quantity, chunk_size)
+
+
+def _iter_chunks(records_func, language, quantity, chunk_size):
+    """Yield the chunks of ``stream_records`` once it is validated."""
+    generated = 0
+    while quantity is None or generated < quantity:
+        size = chunk_size
+        if quantity is not None:
+            size = min(size, quantity - generated)
+        yield records_func(language, size)
+        generated += size
+
+
+def stream_driver_data(
+    language: str = LANGUAGE,
+    quantity: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[list[dict]]:
+    """
+    Generate driver records in chunks of ``chunk_size`` (see
+    ``stream_records``).
+    """
+    return stream_records(driver_records, language, quantity, chunk_size)
+
+
+def stream_vehicle_data(
+    language: str = LANGUAGE,
+    quantity: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[list[dict]]:
+    """
+    Generate vehicle records in chunks of ``chunk_size`` (see
+    ``stream_records``).
+    """
+    return stream_records(vehicle_records, language, quantity, chunk_size)
+
+
+def stream_client_data(
+    language: str = LANGUAGE,
+    quantity: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[list[dict]]:
+    """
+    Generate client records in chunks of ``chunk_size`` (see
+    ``stream_records``).
+    """
+    return stream_records(client_records, language, quantity, chunk_size)
+
+
+def stream_location_data(
+    language: str = LANGUAGE,
+    quantity: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[list[dict]]:
+    """
+    Generate location records in chunks of ``chunk_size`` (see
+    ``stream_records``).
+    """
+    return stream_records(location_records, language, quantity, chunk_size)
+
+
+def stream_product_data(
+    language: str = LANGUAGE,
+    quantity: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[list[dict]]:
+    """
+    Generate product records in chunks of ``chunk_size`` (see
+    ``stream_records``).
+    """
+    return stream_records(product_records, language, quantity, chunk_size)
+
+
+def stream_delivery_data(
+    language: str = LANGUAGE,
+    quantity: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[list[dict]]:
+    """
+    Generate delivery records in chunks of ``chunk_size`` (see
+    ``stream_records``).
+    """
+    return stream_records(delivery_records, language, quantity, chunk_size)
@@ -0,0 +1,340 @@
+import gzip
+import json
+import multiprocessing
+import os
+import random
+import time
+from typing import NamedTuple
+
+import bson
+from actions_db import MongoDBActions
+from bson import json_util
+from data_generator import (DEFAULT_CHUNK_SIZE, LANGUAGE, MODELS,
+                            seed_generators, split_quantity, stream_records)
+from termcolor import colored
+
+FORMATS = ('jsonl', 'bson')
+DEFAULT_SHARD_SIZE = 1_000_000
+DEFAULT_SEED_BATCH_SIZE = 10_000
+SEED_SHARD_BATCHES = 10
+COMPRESS_LEVEL = 1
+
+
+class Shard(NamedTuple):
+    """
+    A share of the records of a dataset, generated by one worker, and the
+    file it is exported to (empty when seeding a database).
+    """
+
+    model: str
+    index: int
+    quantity: int
+    path: str
+
+
+def encode_jsonl(documents: list[dict]) -> bytes:
+    """Encode documents as MongoDB Extended JSON lines (``mongoimport``)."""
+    return ''.join(
+        json.dumps(document, ensure_ascii=False, default=json_util.default)
+        + '\n'
+        for document in documents
+    ).encode('utf-8')
+
+
+def encode_bson(documents: list[dict]) -> bytes:
+    """Encode documents as concatenated BSON (``mongorestore``)."""
+    return b''.join(bson.encode(document) for document in documents)
+
+
+ENCODERS = {'jsonl': encode_jsonl, 'bson': encode_bson}
+
+
+def shard_seed(seed: int, shard: Shard) -> str:
+    """Return the seed of the random draws of a shard."""
+    return f'{seed}:{shard.model}:{shard.index}'
+
+
+def split_shards(quantity: int, shard_size: int) -> list[int]:
+    """
+    Split ``quantity`` records into as few shards of at most ``shard_size``
+    records as possible, of equal sizes.
+    """
+    return split_quantity(quantity, -(-quantity // shard_size))
+
+
+def plan_shards(
+    model: str,
+    quantity: int,
+    output_dir: str,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    file_format: str = 'jsonl',
+    compress: bool = True,
+) -> list[Shard]:
+    """
+    Split ``quantity`` records of a model into files of at most
+    ``shard_size`` records, named ``<model>-<index>.<format>[.gz]``.
+    """
+    if file_format not in FORMATS:
+        message_error = colored(
+            f'✗ THE "file_format" PARAMETER MUST BE ONE OF {FORMATS}.[** "{file_format}":INVALID **]',
+            'red',
+        )
+        raise ValueError(message_error)
+
+    extension = f'.{file_format}.gz' if compress else f'.{file_format}'
+    return [
+        Shard(
+            model,
+            index,
+            shard_quantity,
+            os.path.join(output_dir, f'{model}-{index:05d}{extension}'),
+        )
+        for index, shard_quantity in enumerate(
+            split_shards(quantity, shard_size)
+        )
+    ]
+
+
+def export_shard(
+    shard: Shard,
+    seed: int,
+    file_format: str = 'jsonl',
+    compress: bool = True,
+    language: str = LANGUAGE,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Generate the records of a shard chunk by chunk and write them to its
+    file. The records only depend on ``seed`` and on the shard, not on the
+    process writing it (except delivery dates, drawn from the current
+    month).
+
+    Returns:
+        ``int:`` The size of the file in bytes.
+    """
+    random.seed(shard_seed(seed, shard))
+    encode = ENCODERS[file_format]
+    records_func = MODELS[shard.model].records
+
+    temporary_path = f'{shard.path}.tmp'
+    if compress:
+        output = gzip.GzipFile(
+            temporary_path, 'wb', compresslevel=COMPRESS_LEVEL, mtime=0
+        )
+    else:
+        output = open(temporary_path, 'wb')
+    with output:
+        for documents in stream_records(
+            records_func, language, shard.quantity, chunk_size
+        ):
+            output.write(encode(documents))
+    os.replace(temporary_path, shard.path)
+    return os.path.getsize(shard.path)
+
+
+def _export_shard(arguments: tuple) -> tuple[Shard, int]:
+    shard, *options = arguments
+    return shard, export_shard(shard, *options)
+
+
+def export_dataset(
+    model: str,
+    quantity: int,
+    output_dir: str,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+    file_format: str = 'jsonl',
+    seed: int | None = None,
+    processes: int | None = None,
+    compress: bool = True,
+    language: str = LANGUAGE,
+    on_shard=None,
+) -> dict:
+    """
+    Write ``quantity`` records of a model to shard files, generated in
+    parallel by ``processes`` worker processes, without any database.
+
+    Args:
+        - ``model (str):`` The model to export (a key of ``MODELS``).
+        - ``quantity (int):`` The number of records.
+        - ``output_dir (str):`` The directory of the files.
+        - ``shard_size (int, optional):`` Maximum number of records per
+        file. Default is 1000000.
+        - ``file_format (str, optional):`` ``'jsonl'`` (for ``mongoimport``)
+        or ``'bson'`` (for ``mongorestore``). Default is 'jsonl'.
+        - ``seed (int, optional):`` Makes the dataset reproducible. Default
+        is a random seed, returned in the summary.
+        - ``processes (int, optional):`` The number of worker processes.
+        Default is the number of CPUs.
+        - ``compress (bool, optional):`` Gzip the files. Default is True.
+        - ``language (str, optional):`` The Faker language.
+        - ``on_shard (Callable, optional):`` Called with each written
+        ``Shard`` and its size in bytes.
+
+    Returns:
+        ``dict:`` The seed, files, records, bytes, wall time (seconds) and
+        records per second of the export.
+    """
+    if seed is None:
+        seed = random.randrange(2**32)
+    os.makedirs(output_dir, exist_ok=True)
+    shards = plan_shards(
+        model, quantity, output_dir, shard_size, file_format, compress
+    )
+    processes = min(processes or os.cpu_count() or 1, len(shards))
+
+    started = time.monotonic()
+    written = 0
+    with multiprocessing.Pool(
+        processes, initializer=seed_generators, initargs=(seed,)
+    ) as pool:
+        for shard, size in pool.imap_unordered(
+            _export_shard,
+            [
+                (shard, seed, file_format, compress, language)
+                for shard in shards
+            ],
+        ):
+            written += size
+            if on_shard is not None:
+                on_shard(shard, size)
+    wall_time = time.monotonic() - started
+
+    return {
+        'model': model,
+        'seed': seed,
+        'files': [shard.path for shard in shards],
+        'records': quantity,
+        'bytes': written,
+        'wall_time': wall_time,
+        'records_per_sec': quantity / wall_time if wall_time else 0.0,
+    }
+
+
+def seed_shard(
+    shard: Shard,
+    seed: int,
+    db_address: str,
+    db_name: str,
+    collection_name: str,
+    batch_size: int = DEFAULT_SEED_BATCH_SIZE,
+    language: str = LANGUAGE,
+) -> dict:
+    """
+    Generate the records of a shard in batches of ``batch_size`` and insert
+    each batch with one unordered ``insert_many``.
+
+    Returns:
+        ``dict:`` The number of documents ``inserted`` and of ``errors``.
+    """
+    random.seed(shard_seed(seed, shard))
+    records_func = MODELS[shard.model].records
+    totals = {'inserted': 0, 'errors': 0}
+
+    with MongoDBActions(db_address, db_name, max_pool_size=1) as actions:
+        for documents in stream_records(
+            records_func, language, shard.quantity, batch_size
+        ):
+            result = actions.insert_documents(collection_name, documents)
+            totals['inserted'] += result['inserted']
+            totals['errors'] += result['errors']
+
+    return totals
+
+
+def _seed_shard(arguments: tuple) -> dict:
+    return seed_shard(*arguments)
+
+
+def seed_database(
+    model: str,
+    quantity: int,
+    db_address: str,
+    db_name: str,
+    collection_name: str | None = None,
+    batch_size: int = DEFAULT_SEED_BATCH_SIZE,
+    seed: int | None = None,
+    processes: int | None = None,
+    drop: bool = False,
+    language: str = LANGUAGE,
+) -> dict:
+    """
+    Load ``quantity`` documents of a model into its collection, generated
+    and inserted in parallel by ``processes`` worker processes, so a
+    simulation can start against a collection of realistic size.
+
+    The work is split into shards of ``SEED_SHARD_BATCHES`` batches handed
+    out to the workers as they finish, each of them inserting its batches
+    with unordered ``insert_many``.
+
+    Args:
+        - ``model (str):`` The model to load (a key of ``MODELS``).
+        - ``quantity (int):`` The number of documents.
+        - ``db_address (str):`` The MongoDB connection URI.
+        - ``db_name (str):`` The name of the database.
+        - ``collection_name (str, optional):`` Defaults to the collection of
+        the model used by the simulations.
+        - ``batch_size (int, optional):`` Number of documents per
+        ``insert_many``. Default is 10000.
+        - ``seed (int, optional):`` Makes the documents reproducible. Default
+        is a random seed, returned in the summary.
+        - ``processes (int, optional):`` The number of worker processes.
+        Default is the number of CPUs.
+        - ``drop (bool, optional):`` Drop the collection first. Default is
+        False.
+        - ``language (str, optional):`` The Faker language.
+
+    Returns:
+        ``dict:`` The model, collection, seed, inserted documents, errors,
+        wall time (seconds) and documents per second of the load.
+    """
+    if seed is None:
+        seed = random.randrange(2**32)
+    collection_name = collection_name or MODELS[model].collection_name
+
+    if drop:
+        with MongoDBActions(db_address, db_name) as actions:
+            actions.db.drop_collection(collection_name)
+
+    shards = [
+        Shard(model, index, shard_quantity, '')
+        for index, shard_quantity in enumerate(
+            split_shards(quantity, batch_size * SEED_SHARD_BATCHES)
+        )
+    ]
+    processes = min(processes or os.cpu_count() or 1, len(shards))
+
+    started = time.monotonic()
+    totals = {'inserted': 0, 'errors': 0}
+    with multiprocessing.Pool(
+        processes, initializer=seed_generators, initargs=(seed,)
+    ) as pool:
+        for result in pool.imap_unordered(
+            _seed_shard,
+            [
+                (
+                    shard,
+                    seed,
+                    db_address,
+                    db_name,
+                    collection_name,
+                    batch_size,
+                    language,
+                )
+                for shard in shards
+            ],
+        ):
+            totals['inserted'] += result['inserted']
+            totals['errors'] += result['errors']
+    wall_time = time.monotonic() - started
+
+    return {
+        'model': model,
+        'collection': collection_name,
+        'seed': seed,
+        'inserted': totals['inserted'],
+        'errors': totals['errors'],
+        'wall_time': wall_time,
+        'documents_per_sec': (
+            totals['inserted'] / wall_time if wall_time else 0.0
+        ),
+    }
@@ -0,0 +1,401 @@
+import os
+import time
+from collections import Counter, deque
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+SUB_BUCKET_HALF = SUB_BUCKET_COUNT // 2
+MAX_LATENCY_US = 1 << 36
+QUANTILES = (0.5, 0.95, 0.99)
+THROUGHPUT_WINDOW = 10
+
+
+class LatencyHistogram:
+    """
+    An HDR-style histogram of latencies in microseconds, with a constant
+    number of log-linear buckets and a relative error below 2%.
+
+    Values below ``SUB_BUCKET_COUNT`` microseconds have their own bucket;
+    above, each power of two is split into ``SUB_BUCKET_HALF`` buckets.
+    Recording is O(1) and the histogram never grows, so it can record every
+    operation of a run.
+    """
+
+    def __init__(self):
+        size = self.bucket_index(MAX_LATENCY_US) + 1
+        self.counts = [0] * size
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    @staticmethod
+    def bucket_index(value: int) -> int:
+        """Return the bucket of a value in microseconds."""
+        if value < SUB_BUCKET_COUNT:
+            return value
+        exponent = value.bit_length() - SUB_BUCKET_BITS
+        return exponent * SUB_BUCKET_HALF + (value >> exponent)
+
+    @staticmethod
+    def bucket_value(index: int) -> int:
+        """Return the highest value in microseconds of a bucket."""
+        if index < SUB_BUCKET_COUNT:
+            return index
+        exponent = index // SUB_BUCKET_HALF - 1
+        sub_bucket = index - exponent * SUB_BUCKET_HALF
+        return ((sub_bucket + 1) << exponent) - 1
+
+    def record(self, seconds: float):
+        """Record a latency given in seconds."""
+        value = min(int(seconds * 1_000_000), MAX_LATENCY_US)
+        self.counts[self.bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, quantile: float) -> float:
+        """
+        Return the latency in seconds below which ``quantile`` (0 to 1) of
+        the recorded values fall.
+        """
+        if not self.count:
+            return 0.0
+        rank = max(int(quantile * self.count + 0.5), 1)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(self.bucket_value(index), self.max) / 1_000_000
+        return self.max / 1_000_000
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Add the values recorded by another histogram."""
+        for index, count in enumerate(other.counts):
+            if count:
+                self.counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def since(self, earlier: 'LatencyHistogram') -> 'LatencyHistogram':
+        """
+        Return the values recorded since ``earlier``, an older copy of this
+        histogram (e.g. from ``SimulationMetrics.latency_overall``). Their
+        max is the highest value of their highest bucket.
+        """
+        histogram = LatencyHistogram()
+        for index, (count, earlier_count) in enumerate(
+            zip(self.counts, earlier.counts)
+        ):
+            if count != earlier_count:
+                histogram.counts[index] = count - earlier_count
+                histogram.max = min(self.bucket_value(index), self.max)
+        histogram.count = self.count - earlier.count
+        histogram.total = self.total - earlier.total
+        return histogram
+
+    def snapshot(self) -> dict:
+        """
+        Return the count and the p50/p95/p99/max/mean latencies in
+        milliseconds.
+        """
+        snapshot = {'count': self.count}
+        for quantile in QUANTILES:
+            key = f'p{int(quantile * 100)}'
+            snapshot[key] = self.percentile(quantile) * 1000
+        snapshot['max'] = self.max / 1000
+        snapshot['mean'] = self.total / self.count / 1000 if self.count else 0
+        return snapshot
+
+    def to_dict(self) -> dict:
+        """Return the histogram as a compact JSON-serializable object."""
+        return {
+            'buckets': {
+                str(index): count
+                for index, count in enumerate(self.counts)
+                if count
+            },
+            'total': self.total,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LatencyHistogram':
+        """Rebuild a histogram saved with ``to_dict``."""
+        histogram = cls()
+        for index, count in data['buckets'].items():
+            histogram.counts[int(index)] = count
+            histogram.count += count
+        histogram.total = data['total']
+        histogram.max = data['max']
+        return histogram
+
+
+class SimulationMetrics:
+    """
+    Operation counters and latency histograms of a simulation, by collection
+    and by action (``create``, ``update``, ``delete``... or ``bulk_write`` for
+    the latency of batches).
+    """
+
+    def __init__(self):
+        self.histograms: dict[tuple[str, str], LatencyHistogram] = {}
+        self.operations = Counter()
+        self.errors = Counter()
+        self.underruns = 0
+        self.underrun_seconds = 0.0
+
+    def record(
+        self,
+        collection_name: str,
+        action: str,
+        seconds: float,
+        operations: int = 1,
+        errors: int = 0,
+    ):
+        """
+        Record the latency of one request, its number of operations (0 when
+        they are counted under their own actions with ``count``) and errors.
+        """
+        key = (collection_name, action)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        histogram.record(seconds)
+        if operations:
+            self.operations[key] += operations
+        if errors:
+            self.errors[key] += errors
+
+    def count(self, collection_name: str, action: str, operations: int = 1):
+        """Count operations whose latency is recorded under another action."""
+        self.operations[(collection_name, action)] += operations
+
+    def record_underrun(self, seconds: float):
+        """
+        Record that the prefetch buffer ran dry and the write loop waited
+        ``seconds`` for documents.
+        """
+        self.underruns += 1
+        self.underrun_seconds += seconds
+
+    def merge(self, other: 'SimulationMetrics'):
+        """Add the counters and histograms of ``other`` to these metrics."""
+        for key, histogram in other.histograms.items():
+            self.histograms.setdefault(key, LatencyHistogram()).merge(
+                histogram
+            )
+        self.operations.update(other.operations)
+        self.errors.update(other.errors)
+        self.underruns += other.underruns
+        self.underrun_seconds += other.underrun_seconds
+
+    def to_dict(self) -> dict:
+        """Return the metrics as a JSON-serializable object."""
+        keys = set(self.histograms) | set(self.operations) | set(self.errors)
+        series = []
+        for collection_name, action in sorted(keys):
+            key = (collection_name, action)
+            histogram = self.histograms.get(key)
+            series.append(
+                {
+                    'collection': collection_name,
+                    'action': action,
+                    'operations': self.operations[key],
+                    'errors': self.errors[key],
+                    'histogram': histogram and histogram.to_dict(),
+                }
+            )
+        return {
+            'series': series,
+            'underruns': self.underruns,
+            'underrun_seconds': self.underrun_seconds,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'SimulationMetrics':
+        """Rebuild metrics saved with ``to_dict``."""
+        metrics = cls()
+        for entry in data['series']:
+            key = (entry['collection'], entry['action'])
+            if entry['histogram']:
+                metrics.histograms[key] = LatencyHistogram.from_dict(
+                    entry['histogram']
+                )
+            if entry['operations']:
+                metrics.operations[key] = entry['operations']
+            if entry['errors']:
+                metrics.errors[key] = entry['errors']
+        metrics.underruns = data['underruns']
+        metrics.underrun_seconds = data['underrun_seconds']
+        return metrics
+
+    def latency_overall(self) -> LatencyHistogram:
+        """Merge the histograms of every collection and action."""
+        merged = LatencyHistogram()
+        for histogram in self.histograms.values():
+            merged.merge(histogram)
+        return merged
+
+    def latency_by_action(self) -> dict[str, LatencyHistogram]:
+        """Merge the histograms of every collection by action."""
+        merged = {}
+        for (_, action), histogram in self.histograms.items():
+            merged.setdefault(action, LatencyHistogram()).merge(histogram)
+        return merged
+
+    def to_prometheus(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = [
+            '# HELP simulator_operations_total Operations sent.',
+            '# TYPE simulator_operations_total counter',
+        ]
+        for key, count in sorted(self.operations.items()):
+            lines.append(
+                f'simulator_operations_total{{{prometheus_labels(key)}}} '
+                f'{count}'
+            )
+
+        lines += [
+            '# HELP simulator_errors_total Operations that failed.',
+            '# TYPE simulator_errors_total counter',
+        ]
+        for key, count in sorted(self.errors.items()):
+            lines.append(
+                f'simulator_errors_total{{{prometheus_labels(key)}}} {count}'
+            )
+
+        lines += [
+            '# HELP simulator_latency_seconds Latency of simulator requests.',
+            '# TYPE simulator_latency_seconds summary',
+        ]
+        for key, histogram in sorted(self.histograms.items()):
+            labels = prometheus_labels(key)
+            for quantile in QUANTILES:
+                lines.append(
+                    f'simulator_latency_seconds'
+                    f'{{{labels},quantile="{quantile}"}} '
+                    f'{histogram.percentile(quantile):.6f}'
+                )
+            lines.append(
+                f'simulator_latency_seconds_sum{{{labels}}} '
+                f'{histogram.total / 1_000_000:.6f}'
+            )
+            lines.append(
+                f'simulator_latency_seconds_count{{{labels}}} '
+                f'{histogram.count}'
+            )
+
+        lines += [
+            '# HELP simulator_latency_max_seconds Highest request latency.',
+            '# TYPE simulator_latency_max_seconds gauge',
+        ]
+        for key, histogram in sorted(self.histograms.items()):
+            lines.append(
+                f'simulator_latency_max_seconds{{{prometheus_labels(key)}}} '
+                f'{histogram.max / 1_000_000:.6f}'
+            )
+
+        lines += [
+            '# HELP simulator_prefetch_underruns_total Times the prefetch '
+            'buffer ran dry.',
+            '# TYPE simulator_prefetch_underruns_total counter',
+            f'simulator_prefetch_underruns_total {self.underruns}',
+            '# HELP simulator_prefetch_wait_seconds_total Time spent waiting '
+            'for documents.',
+            '# TYPE simulator_prefetch_wait_seconds_total counter',
+            f'simulator_prefetch_wait_seconds_total '
+            f'{self.underrun_seconds:.6f}',
+        ]
+
+        return '\n'.join(lines) + '\n'
+
+
+def prometheus_labels(key: tuple[str, str]) -> str:
+    """Return the Prometheus labels of a (collection, action) key."""
+    return f'collection="{key[0]}",action="{key[1]}"'
+
+
+class ThroughputWindow:
+    """
+    The throughput over the last ``window`` seconds, computed from samples
+    of a growing operation count.
+
+    Arguments and Attributes:
+        - ``window (float, optional):`` Length of the window in seconds.
+        Default is 10.
+    """
+
+    def __init__(
+        self, window: float = THROUGHPUT_WINDOW, clock=time.monotonic
+    ):
+        self.window = window
+        self.clock = clock
+        self.samples = deque()
+
+    def add(self, operations: int):
+        """Record the total number of operations done so far."""
+        now = self.clock()
+        self.samples.append((now, operations))
+        # Keep the newest sample older than the window as its start.
+        while (
+            len(self.samples) > 2
+            and now - self.samples[1][0] >= self.window
+        ):
+            self.samples.popleft()
+
+    def rate(self) -> float:
+        """Return the operations per second over the window."""
+        if len(self.samples) < 2:
+            return 0.0
+        (first_time, first_count), (last_time, last_count) = (
+            self.samples[0],
+            self.samples[-1],
+        )
+        if last_time <= first_time:
+            return 0.0
+        return (last_count - first_count) / (last_time - first_time)
+
+
+class MetricsExporter:
+    """
+    Periodically write ``SimulationMetrics`` to a file in the Prometheus text
+    format (e.g. for the node_exporter textfile collector). The file is
+    replaced atomically, so readers never see a partial snapshot.
+
+    Arguments and Attributes:
+        - ``metrics (SimulationMetrics):`` The metrics to export.
+        - ``path (str):`` The metrics file.
+        - ``interval (float, optional):`` Minimum number of seconds between
+        two exports. Default is 10.
+    """
+
+    def __init__(
+        self, metrics: SimulationMetrics, path: str, interval: float = 10
+    ):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.exported = time.monotonic()
+
+    def maybe_export(self):
+        """Export the metrics if the last export is older than ``interval``."""
+        if time.monotonic() - self.exported >= self.interval:
+            self.export()
+
+    def export(self):
+        """Write the current metrics to the file."""
+        self.exported = time.monotonic()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temporary_path = f'{self.path}.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as metrics_file:
+            metrics_file.write(self.metrics.to_prometheus())
+        os.replace(temporary_path, self.path)
+
+    def remove(self):
+        """Remove the file, e.g. once the run is over."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,143 @@
+import math
+import queue
+import threading
+import time
+from collections.abc import Callable
+
+from termcolor import colored
+
+PREFETCH_DEPTH = 1000
+PREFETCH_CHUNK_SIZE = 100
+PUT_TIMEOUT = 0.1
+
+
+class PrefetchBuffer:
+    """
+    A bounded buffer of documents pre-generated by a background thread, so
+    the write loop takes ready documents instead of waiting for Faker.
+
+    The producer thread calls ``data_generator_func`` for chunks of
+    ``chunk_size`` documents and blocks while ``depth`` documents are
+    waiting. When the write loop finds the buffer empty (an underrun), it
+    waits for the next chunk and the wait is recorded in ``metrics``.
+
+    Arguments and Attributes:
+        - ``data_generator_func (Callable):`` The ``generator_*_data``
+        function of the simulated model.
+        - ``depth (int, optional):`` Maximum number of documents generated
+        ahead. Default is 1000.
+        - ``chunk_size (int, optional):`` Number of documents generated at
+        once. Default is 100, at most ``depth``.
+        - ``metrics (SimulationMetrics, optional):`` Where underruns are
+        recorded.
+    """
+
+    def __init__(
+        self,
+        data_generator_func: Callable,
+        depth: int = PREFETCH_DEPTH,
+        chunk_size: int = PREFETCH_CHUNK_SIZE,
+        metrics=None,
+    ):
+        if depth < 1:
+            message_error = colored(
+                f'✗ THE "depth" PARAMETER MUST BE A POSITIVE INTEGER.[** "{depth}":INVALID **]',
+                'red',
+            )
+            raise ValueError(message_error)
+
+        self.data_generator_func = data_generator_func
+        self.chunk_size = min(chunk_size, depth)
+        self.depth = depth
+        self.metrics = metrics
+        self.collection_name = None
+        self.underruns = 0
+        self.chunks = queue.Queue(math.ceil(depth / self.chunk_size))
+        self.current = []
+        self.position = 0
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Start the producer thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._produce, name='prefetch', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """Stop the producer thread and drop the documents left."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        while not self.chunks.empty():
+            self.chunks.get_nowait()
+
+    def _produce(self):
+        while not self._stop.is_set():
+            try:
+                chunk = self.data_generator_func(quantity=self.chunk_size)
+            except Exception as error:
+                chunk = error
+
+            while not self._stop.is_set():
+                try:
+                    self.chunks.put(chunk, timeout=PUT_TIMEOUT)
+                    break
+                except queue.Full:
+                    continue
+
+            if isinstance(chunk, Exception):
+                return
+
+    def _next_chunk(self) -> list[dict]:
+        if self._thread is None:
+            self.start()
+
+        try:
+            chunk = self.chunks.get_nowait()
+        except queue.Empty:
+            self.underruns += 1
+            started = time.perf_counter()
+            chunk = self.chunks.get()
+            if self.metrics is not None:
+                self.metrics.record_underrun(time.perf_counter() - started)
+
+        if isinstance(chunk, Exception):
+            self._thread = None
+            raise chunk
+
+        self.collection_name, documents = next(iter(chunk.items()))
+        return documents
+
+    def __call__(self, quantity: int = 1) -> dict[str, list[dict]]:
+        """
+        Take ``quantity`` pre-generated documents, in the format of
+        ``data_generator_func``.
+
+        Returns:
+            ``dict:`` The collection name and its list of documents.
+        """
+        documents = []
+        while len(documents) < quantity:
+            if self.position >= len(self.current):
+                self.current = self._next_chunk()
+                self.position = 0
+            end = self.position + quantity - len(documents)
+            documents += self.current[self.position : end]
+            self.position = end
+
+        return {self.collection_name: documents}
@@ -0,0 +1,215 @@
+import json
+import threading
+import time
+
+from termcolor import colored
+
+DEFAULT_BURST_SECONDS = 0.1
+MAX_WAIT = 0.1
+
+
+class RateSchedule:
+    """
+    A target throughput that changes over time, described as a list of
+    phases run one after the other. Each phase lasts ``duration`` seconds and
+    either keeps a constant ``rate`` (plateaus, spikes) or goes linearly from
+    ``start_rate`` to ``end_rate`` (ramps), in operations per second::
+
+        [
+            {"duration": 60, "start_rate": 0, "end_rate": 2000},
+            {"duration": 300, "rate": 2000},
+            {"duration": 10, "rate": 8000},
+            {"duration": 120, "rate": 2000}
+        ]
+
+    Arguments and Attributes:
+        - ``phases (list):`` The phases of the schedule.
+        - ``repeat (bool, optional):`` Start over after the last phase instead
+        of ending. Default is False.
+    """
+
+    def __init__(self, phases: list[dict], repeat: bool = False):
+        self.phases = [self.validate_phase(phase) for phase in phases]
+        if not self.phases:
+            raise ValueError(
+                colored('✗ THE RATE SCHEDULE HAS NO PHASES.', 'red')
+            )
+        self.repeat = repeat
+        self.duration = sum(phase['duration'] for phase in self.phases)
+
+    @staticmethod
+    def validate_phase(phase: dict) -> dict:
+        """
+        Check a phase and return it in its ramp form (``duration``,
+        ``start_rate``, ``end_rate``).
+        """
+        try:
+            duration = float(phase['duration'])
+            if 'rate' in phase:
+                start_rate = end_rate = float(phase['rate'])
+            else:
+                start_rate = float(phase['start_rate'])
+                end_rate = float(phase['end_rate'])
+        except (KeyError, TypeError, ValueError):
+            message_error = colored(
+                f'✗ A RATE SCHEDULE PHASE NEEDS "duration" AND "rate" OR "start_rate"/"end_rate".[** {phase}:INVALID **]',
+                'red',
+            )
+            raise ValueError(message_error)
+
+        if duration <= 0 or start_rate < 0 or end_rate < 0:
+            message_error = colored(
+                f'✗ RATE SCHEDULE DURATIONS MUST BE POSITIVE AND RATES NOT NEGATIVE.[** {phase}:INVALID **]',
+                'red',
+            )
+            raise ValueError(message_error)
+
+        return {
+            'duration': duration,
+            'start_rate': start_rate,
+            'end_rate': end_rate,
+        }
+
+    @classmethod
+    def from_file(cls, path: str) -> 'RateSchedule':
+        """
+        Load a schedule from a JSON file holding either the list of phases or
+        an object with ``phases`` and ``repeat``.
+        """
+        with open(path, 'r', encoding='utf-8') as schedule_file:
+            return cls.from_config(json.load(schedule_file))
+
+    @classmethod
+    def from_config(cls, config: list | dict) -> 'RateSchedule':
+        """Build a schedule from a list of phases or a ``phases`` object."""
+        if isinstance(config, dict):
+            return cls(config.get('phases', []), config.get('repeat', False))
+        return cls(config)
+
+    def scaled(self, factor: float) -> 'RateSchedule':
+        """
+        Return the same schedule with every rate multiplied by ``factor``,
+        e.g. the share of each of several simulations run in parallel.
+        """
+        phases = [
+            {
+                'duration': phase['duration'],
+                'start_rate': phase['start_rate'] * factor,
+                'end_rate': phase['end_rate'] * factor,
+            }
+            for phase in self.phases
+        ]
+        return RateSchedule(phases, self.repeat)
+
+    def to_config(self) -> dict:
+        """Return the schedule as a JSON-serializable object."""
+        return {'phases': self.phases, 'repeat': self.repeat}
+
+    def rate_at(self, elapsed: float) -> float | None:
+        """
+        Return the target rate ``elapsed`` seconds after the start, or None
+        once a non-repeating schedule is over.
+        """
+        if elapsed >= self.duration:
+            if not self.repeat:
+                return None
+            elapsed %= self.duration
+
+        for phase in self.phases:
+            if elapsed < phase['duration']:
+                progress = elapsed / phase['duration']
+                return phase['start_rate'] + progress * (
+                    phase['end_rate'] - phase['start_rate']
+                )
+            elapsed -= phase['duration']
+        return None
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket that paces operations to a target throughput,
+    constant (``rate``) or following a ``RateSchedule``.
+
+    Tokens accumulate at the target rate up to ``burst_seconds`` worth of
+    operations, so short stalls are caught up without exceeding the rate over
+    time.
+
+    Arguments and Attributes:
+        - ``rate (float, optional):`` Target throughput in operations per
+        second.
+        - ``schedule (RateSchedule, optional):`` Target throughput over time,
+        used instead of ``rate``.
+        - ``burst_seconds (float, optional):`` Size of the bucket in seconds of
+        operations. Default is 0.1.
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        schedule: RateSchedule | None = None,
+        burst_seconds: float = DEFAULT_BURST_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.schedule = schedule
+        self.burst_seconds = burst_seconds
+        self.clock = clock
+        self.started = clock()
+        self.updated = self.started
+        self.finished = False
+        self.rate = rate or 0.0
+        if schedule is not None:
+            self.rate = schedule.rate_at(0)
+        self.tokens = self.capacity
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> float:
+        return max(self.rate * self.burst_seconds, 1.0)
+
+    def set_rate(self, rate: float):
+        """Change the target throughput."""
+        with self._lock:
+            self._refill(self.clock())
+            self.rate = rate
+
+    def _refill(self, now: float):
+        self.tokens = min(
+            self.tokens + (now - self.updated) * self.rate, self.capacity
+        )
+        self.updated = now
+
+    def try_acquire(self, tokens: int = 1) -> float:
+        """
+        Take ``tokens`` from the bucket if available.
+
+        Batches larger than the bucket are let through when it is full, and
+        then paid back before the next operations.
+
+        Returns:
+            ``float:`` 0 if the tokens were taken, otherwise the number of
+            seconds to wait before trying again.
+        """
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+
+            if self.schedule is not None:
+                rate = self.schedule.rate_at(now - self.started)
+                if rate is None:
+                    self.finished = True
+                    return 0.0
+                self.rate = rate
+
+            needed = min(tokens, self.capacity)
+            if self.tokens >= needed:
+                self.tokens -= tokens
+                return 0.0
+
+            if self.rate <= 0:
+                return MAX_WAIT
+            return min((needed - self.tokens) / self.rate, MAX_WAIT)
+
+    def acquire(self, tokens: int = 1):
+        """Wait until ``tokens`` can be taken from the bucket."""
+        while delay := self.try_acquire(tokens):
+            time.sleep(delay)
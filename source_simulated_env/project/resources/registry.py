@@ -0,0 +1,103 @@
+import json
+import time
+
+REGISTRY_KEY = 'montogre:tasks'
+
+
+class TaskRegistry:
+    """
+    The running simulations, kept in a Redis hash of JSON entries by task
+    ID. Workers add a task when it starts and remove it when it ends or is
+    revoked, so listing the simulations is one ``HGETALL`` instead of a
+    broadcast to every worker that waits for their replies.
+
+    An entry has the fields of ``inspect().active()`` used by the CLI:
+    ``id``, ``name``, ``args``, ``hostname`` and ``time_start`` (a UNIX
+    timestamp).
+
+    Arguments and Attributes:
+        - ``client (Redis):`` The Redis client, e.g. the one of the result
+        backend.
+        - ``key (str, optional):`` The key of the hash. Default is
+        ``REGISTRY_KEY``.
+    """
+
+    def __init__(self, client, key: str = REGISTRY_KEY):
+        self.client = client
+        self.key = key
+
+    @staticmethod
+    def entry(
+        task_id: str,
+        name: str,
+        args: list | tuple,
+        hostname: str | None = None,
+        time_start: float | None = None,
+    ) -> dict:
+        """Return the registry entry of a task."""
+        return {
+            'id': task_id,
+            'name': name,
+            'args': list(args),
+            'hostname': hostname,
+            'time_start': time_start or time.time(),
+        }
+
+    def add(self, entry: dict):
+        """
+        Add the entry of a running task, unless it is already registered
+        (e.g. by a previous slice of the same simulation).
+        """
+        self.client.hsetnx(
+            self.key, entry['id'], json.dumps(entry, default=str)
+        )
+
+    def remove(self, *task_ids: str) -> int:
+        """
+        Remove the entries of finished tasks.
+
+        Returns:
+            ``int:`` The number of entries removed.
+        """
+        if not task_ids:
+            return 0
+        return self.client.hdel(self.key, *task_ids)
+
+    def tasks(self) -> list[dict]:
+        """Return the entries of the running tasks, oldest first."""
+        values = self.client.hgetall(self.key).values()
+        entries = [json.loads(value) for value in values]
+        return sorted(entries, key=lambda entry: entry['time_start'])
+
+    def task_ids(self) -> list[str]:
+        """Return the IDs of the running tasks."""
+        return [
+            task_id.decode() if isinstance(task_id, bytes) else task_id
+            for task_id in self.client.hkeys(self.key)
+        ]
+
+    def remove_worker(self, hostname: str) -> int:
+        """
+        Remove the entries of a worker, e.g. left by a previous run of a
+        worker that did not shut down cleanly.
+
+        Returns:
+            ``int:`` The number of entries removed.
+        """
+        return self.remove(
+            *(
+                entry['id']
+                for entry in self.tasks()
+                if entry['hostname'] == hostname
+            )
+        )
+
+    def replace(self, entries: list[dict]):
+        """Replace all the entries, e.g. with those of ``inspect()``."""
+        pipeline = self.client.pipeline()
+        pipeline.delete(self.key)
+        for entry in entries:
+            pipeline.hset(
+                self.key, entry['id'], json.dumps(entry, default=str)
+            )
+        pipeline.execute()
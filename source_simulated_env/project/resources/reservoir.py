@@ -0,0 +1,171 @@
+import math
+import random
+
+from termcolor import colored
+
+DISTRIBUTIONS = ('uniform', 'zipf', 'hotset')
+DEFAULT_ZIPF_EXPONENT = 1.0
+DEFAULT_HOT_PROBABILITY = 0.8
+HOT_SET_FRACTION = 0.2
+# The slot of a removed id, until the slots are compacted.
+_REMOVED = object()
+
+
+class IdReservoir:
+    """
+    A bounded set of known document ``_id``s of one collection, from which
+    the targets of updates and deletes are picked locally in O(1).
+
+    Ids are kept in insertion order, the most recent ones being the "hottest"
+    for skewed distributions. Once ``capacity`` is reached, a new id evicts a
+    random one with the probability of reservoir sampling, so the reservoir
+    stays a uniform sample of every id offered to it; the new id is still
+    appended as the most recent one. Removed ids leave a tombstone in their
+    slot, so the order of the others never changes, and the slots are
+    compacted once half of them are tombstones.
+
+    Arguments and Attributes:
+        - ``capacity (int, optional):`` Maximum number of ids kept. Default is
+        100000.
+        - ``distribution (str, optional):`` How targets are picked:
+        ``'uniform'``, ``'zipf'`` (the k-th most recent id is picked with a
+        probability proportional to ``1 / k ** skew``) or ``'hotset'`` (the
+        most recent ``HOT_SET_FRACTION`` of the ids receive a ``skew`` share
+        of the picks). Default is 'uniform'.
+        - ``skew (float, optional):`` The Zipf exponent or the hot set
+        probability. Defaults to ``DEFAULT_ZIPF_EXPONENT`` and
+        ``DEFAULT_HOT_PROBABILITY``.
+        - ``rng (Random, optional):`` The random generator to use.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        distribution: str = 'uniform',
+        skew: float | None = None,
+        rng: random.Random | None = None,
+    ):
+        if distribution not in DISTRIBUTIONS:
+            message_error = colored(
+                f'✗ THE "distribution" PARAMETER MUST BE ONE OF {DISTRIBUTIONS}.[** "{distribution}":INVALID **]',
+                'red',
+            )
+            raise ValueError(message_error)
+
+        if skew is None:
+            skew = (
+                DEFAULT_HOT_PROBABILITY
+                if distribution == 'hotset'
+                else DEFAULT_ZIPF_EXPONENT
+            )
+
+        self.capacity = capacity
+        self.distribution = distribution
+        self.skew = skew
+        self.rng = rng or random.Random()
+        self.seen = 0
+        self._ids = []
+        self._positions = {}
+        self._removed = 0
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, document_id) -> bool:
+        return document_id in self._positions
+
+    def __iter__(self):
+        """Iterate over the ids, from the oldest to the most recent."""
+        return (
+            document_id
+            for document_id in self._ids
+            if document_id is not _REMOVED
+        )
+
+    def add(self, document_id):
+        """Offer a known id (e.g. of an inserted document) to the reservoir."""
+        if document_id is None or document_id in self._positions:
+            return
+
+        self.seen += 1
+        if len(self._positions) >= self.capacity:
+            if self.rng.randrange(self.seen) >= self.capacity:
+                return
+            self._remove(self._random_position())
+
+        self._positions[document_id] = len(self._ids)
+        self._ids.append(document_id)
+
+    def extend(self, document_ids):
+        """Offer several known ids to the reservoir."""
+        for document_id in document_ids:
+            self.add(document_id)
+
+    def discard(self, document_id):
+        """Forget an id, e.g. of a deleted document."""
+        position = self._positions.get(document_id)
+        if position is not None:
+            self._remove(position)
+
+    def _remove(self, position: int):
+        del self._positions[self._ids[position]]
+        self._ids[position] = _REMOVED
+        self._removed += 1
+        if self._removed * 2 > len(self._ids):
+            self._compact()
+
+    def _compact(self):
+        self._ids = [
+            document_id
+            for document_id in self._ids
+            if document_id is not _REMOVED
+        ]
+        self._positions = {
+            document_id: position
+            for position, document_id in enumerate(self._ids)
+        }
+        self._removed = 0
+
+    def _random_position(self) -> int:
+        # At most half of the slots are tombstones: two draws on average.
+        while True:
+            position = self.rng.randrange(len(self._ids))
+            if self._ids[position] is not _REMOVED:
+                return position
+
+    def choose(self):
+        """
+        Pick an id according to the distribution of the reservoir.
+
+        Returns:
+            The picked id, or ``None`` if the reservoir is empty.
+        """
+        if not self._positions:
+            return None
+        size = len(self._ids)
+        while True:
+            document_id = self._ids[size - 1 - self._rank(size)]
+            if document_id is not _REMOVED:
+                return document_id
+
+    def _rank(self, size: int) -> int:
+        if self.distribution == 'uniform':
+            return self.rng.randrange(size)
+
+        if self.distribution == 'hotset':
+            hot_size = max(math.ceil(size * HOT_SET_FRACTION), 1)
+            if self.rng.random() < self.skew:
+                return self.rng.randrange(hot_size)
+            return self.rng.randrange(size)
+
+        # Inverse CDF of the continuous power law on [1, size + 1), an O(1)
+        # approximation of the Zipf distribution over ``size`` ranks.
+        uniform = self.rng.random()
+        if self.skew == 1:
+            rank = (size + 1) ** uniform
+        else:
+            exponent = 1 - self.skew
+            rank = (
+                ((size + 1) ** exponent - 1) * uniform + 1
+            ) ** (1 / exponent)
+        return min(int(rank) - 1, size - 1)
@@ -0,0 +1,268 @@
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+from metrics import LatencyHistogram
+
+from project.config import RESULTS_DB
+
+DEFAULT_THRESHOLD = 0.1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id TEXT,
+    task_name TEXT NOT NULL,
+    label TEXT,
+    finished_at TEXT NOT NULL,
+    config TEXT NOT NULL,
+    operations INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    wall_time REAL NOT NULL,
+    ops_per_sec REAL NOT NULL,
+    p50 REAL,
+    p95 REAL,
+    p99 REAL,
+    summary TEXT NOT NULL
+)
+"""
+# Compared metrics, and whether a higher value is better.
+COMPARED_METRICS = (
+    ('ops_per_sec', True),
+    ('p50', False),
+    ('p95', False),
+    ('p99', False),
+    ('error_rate', False),
+)
+
+
+def overall_latency(summary: dict) -> dict:
+    """
+    Return the p50/p95/p99 latencies (milliseconds) of every request of a
+    run, from the histograms of its summary.
+    """
+    merged = LatencyHistogram()
+    for data in summary.get('histograms', {}).values():
+        merged.merge(LatencyHistogram.from_dict(data))
+    snapshot = merged.snapshot()
+    return {key: snapshot[key] for key in ('p50', 'p95', 'p99')}
+
+
+class ResultsStore:
+    """
+    A SQLite database of the outcome of every finished simulation: its
+    configuration, throughput, latency percentiles and errors, with its full
+    summary, so runs can be compared across days (see ``compare_runs``).
+
+    Arguments and Attributes:
+        - ``path (str, optional):`` The database file. Default is
+        ``RESULTS_DB``.
+    """
+
+    def __init__(self, path: str = RESULTS_DB):
+        self.path = path
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the database, creating it on first use."""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute(SCHEMA)
+        return connection
+
+    def save(
+        self,
+        task_name: str,
+        config: dict,
+        summary: dict,
+        task_id: str | None = None,
+        label: str | None = None,
+    ) -> int:
+        """
+        Save the summary of a finished run.
+
+        Args:
+            - ``task_name (str):`` The simulation task.
+            - ``config (dict):`` The arguments of the run.
+            - ``summary (dict):`` Its ``Simulation.summary``.
+            - ``task_id (str, optional):`` The ID of its task.
+            - ``label (str, optional):`` A tag of the run, e.g. the MongoDB
+            configuration under test.
+
+        Returns:
+            ``int:`` The ID of the run in the store.
+        """
+        latency = overall_latency(summary)
+        connection = self.connect()
+        try:
+            with connection:
+                cursor = connection.execute(
+                    'INSERT INTO runs (task_id, task_name, label, finished_at, '
+                    'config, operations, errors, wall_time, ops_per_sec, p50, '
+                    'p95, p99, summary) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (
+                        task_id,
+                        task_name,
+                        label,
+                        datetime.now().isoformat(timespec='seconds'),
+                        json.dumps(config, default=str),
+                        summary['operations'],
+                        summary['errors'],
+                        summary['wall_time'],
+                        summary['ops_per_sec'],
+                        latency['p50'],
+                        latency['p95'],
+                        latency['p99'],
+                        json.dumps(summary, default=str),
+                    ),
+                )
+            return cursor.lastrowid
+        finally:
+            connection.close()
+
+    @staticmethod
+    def to_run(row: sqlite3.Row) -> dict:
+        run = dict(row)
+        run['config'] = json.loads(run['config'])
+        run['summary'] = json.loads(run['summary'])
+        return run
+
+    def runs(
+        self,
+        limit: int = 20,
+        label: str | None = None,
+        task_name: str | None = None,
+    ) -> list[dict]:
+        """Return the latest runs, newest first, optionally filtered."""
+        query = 'SELECT * FROM runs'
+        conditions = []
+        parameters = []
+        if label is not None:
+            conditions.append('label = ?')
+            parameters.append(label)
+        if task_name is not None:
+            conditions.append('task_name LIKE ?')
+            parameters.append(f'%{task_name}%')
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY id DESC LIMIT ?'
+        parameters.append(limit)
+
+        connection = self.connect()
+        try:
+            rows = connection.execute(query, parameters).fetchall()
+        finally:
+            connection.close()
+        return [self.to_run(row) for row in rows]
+
+    def get(self, run_id: int) -> dict | None:
+        """Return a run by its ID in the store, or None."""
+        connection = self.connect()
+        try:
+            row = connection.execute(
+                'SELECT * FROM runs WHERE id = ?', (run_id,)
+            ).fetchone()
+        finally:
+            connection.close()
+        return self.to_run(row) if row else None
+
+
+def run_metrics(run: dict) -> dict:
+    """Return the compared metrics of a run (see ``COMPARED_METRICS``)."""
+    return {
+        'ops_per_sec': run['ops_per_sec'],
+        'p50': run['p50'],
+        'p95': run['p95'],
+        'p99': run['p99'],
+        'error_rate': run['errors'] / run['operations']
+        if run['operations']
+        else 0.0,
+    }
+
+
+def compare_metric(
+    metric: str,
+    before: float | None,
+    after: float | None,
+    higher_is_better: bool,
+    threshold: float,
+) -> dict:
+    """Return the comparison of a metric between two runs."""
+    before = before or 0.0
+    after = after or 0.0
+    change = (after - before) / before if before else None
+    worse = after < before if higher_is_better else after > before
+    return {
+        'metric': metric,
+        'baseline': before,
+        'candidate': after,
+        'change': change,
+        'regression': worse and (change is None or abs(change) > threshold),
+    }
+
+
+def compare_runs(
+    baseline: dict, candidate: dict, threshold: float = DEFAULT_THRESHOLD
+) -> list[dict]:
+    """
+    Compare the throughput, latency percentiles, error rate and p99 latency
+    of each action of two runs.
+
+    Args:
+        - ``baseline (dict):`` The reference run.
+        - ``candidate (dict):`` The run compared to it.
+        - ``threshold (float, optional):`` The relative change beyond which
+        a worse metric is a regression. Default is 0.1 (10%).
+
+    Returns:
+        ``list:`` For each metric, its values, its relative ``change`` (None
+        from a zero baseline) and whether it is a ``regression``.
+    """
+    baseline_metrics = run_metrics(baseline)
+    candidate_metrics = run_metrics(candidate)
+    rows = [
+        compare_metric(
+            metric,
+            baseline_metrics[metric],
+            candidate_metrics[metric],
+            higher_is_better,
+            threshold,
+        )
+        for metric, higher_is_better in COMPARED_METRICS
+    ]
+
+    baseline_latency = baseline['summary'].get('latency', {})
+    candidate_latency = candidate['summary'].get('latency', {})
+    for action in baseline_latency:
+        if action in candidate_latency:
+            rows.append(
+                compare_metric(
+                    f'{action} p99',
+                    baseline_latency[action]['p99'],
+                    candidate_latency[action]['p99'],
+                    False,
+                    threshold,
+                )
+            )
+    return rows
+
+
+def diff_configs(baseline: dict, candidate: dict) -> list[tuple]:
+    """
+    Return the configuration options that differ between two runs, with
+    their values in each, along with their labels.
+    """
+    options = {'label': (baseline['label'], candidate['label'])}
+    for key in sorted(set(baseline['config']) | set(candidate['config'])):
+        options[key] = (
+            baseline['config'].get(key),
+            candidate['config'].get(key),
+        )
+    return [
+        (key, before, after)
+        for key, (before, after) in options.items()
+        if before != after
+    ]
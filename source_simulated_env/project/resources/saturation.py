@@ -0,0 +1,162 @@
+import time
+
+from metrics import LatencyHistogram, SimulationMetrics
+from termcolor import colored
+
+DEFAULT_TARGET_P99 = 50.0
+DEFAULT_START_RATE = 100.0
+DEFAULT_INCREASE = 100.0
+DEFAULT_INTERVAL = 5.0
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFFS = 5
+# Below this share of the target rate, the simulation cannot keep up with
+# it: the database (or the client) is saturated whatever the latency.
+SUSTAINED_THROUGHPUT = 0.9
+
+
+class SaturationSearch:
+    """
+    An additive-increase/multiplicative-decrease (AIMD) search of the
+    highest throughput the database sustains under a p99 latency target.
+
+    The run is paced at ``rate``. Every ``interval`` seconds, the p99
+    latency and the throughput of the interval are measured: while the p99
+    stays under ``target_p99`` and the throughput keeps up with the rate,
+    the rate grows by ``increase``; otherwise it is multiplied by
+    ``backoff``. The search is over after ``max_backoffs`` backoffs. The
+    first interval warms the run up and is not measured.
+
+    Arguments and Attributes:
+        - ``target_p99 (float, optional):`` The p99 latency target in
+        milliseconds. Default is 50.
+        - ``start_rate (float, optional):`` The first rate, in operations per
+        second. Default is 100.
+        - ``increase (float, optional):`` The additive increase of the rate.
+        Default is 100.
+        - ``interval (float, optional):`` Seconds of each step. Default is 5.
+        - ``backoff (float, optional):`` The multiplicative decrease of the
+        rate, between 0 and 1. Default is 0.5.
+        - ``max_backoffs (int, optional):`` Number of backoffs ending the
+        search. Default is 5.
+    """
+
+    def __init__(
+        self,
+        target_p99: float = DEFAULT_TARGET_P99,
+        start_rate: float = DEFAULT_START_RATE,
+        increase: float = DEFAULT_INCREASE,
+        interval: float = DEFAULT_INTERVAL,
+        backoff: float = DEFAULT_BACKOFF,
+        max_backoffs: int = DEFAULT_MAX_BACKOFFS,
+        clock=time.monotonic,
+    ):
+        for name, value in (
+            ('target_p99', target_p99),
+            ('start_rate', start_rate),
+            ('increase', increase),
+            ('interval', interval),
+            ('max_backoffs', max_backoffs),
+        ):
+            if value <= 0:
+                message_error = colored(
+                    f'✗ THE "{name}" PARAMETER MUST BE POSITIVE.[** "{value}":INVALID **]',
+                    'red',
+                )
+                raise ValueError(message_error)
+        if not 0 < backoff < 1:
+            message_error = colored(
+                f'✗ THE "backoff" PARAMETER MUST BE BETWEEN 0 AND 1.[** "{backoff}":INVALID **]',
+                'red',
+            )
+            raise ValueError(message_error)
+
+        self.target_p99 = target_p99
+        self.rate = start_rate
+        self.increase = increase
+        self.interval = interval
+        self.backoff = backoff
+        self.max_backoffs = max_backoffs
+        self.clock = clock
+        self.backoffs = 0
+        self.finished = False
+        self.warmed_up = False
+        self.steps = []
+        self.step_started = None
+        self.step_latency = LatencyHistogram()
+        self.step_operations = 0
+
+    def start(self, metrics: SimulationMetrics, operations: int):
+        """Start the first step of the search."""
+        self.step_started = self.clock()
+        self.step_latency = metrics.latency_overall()
+        self.step_operations = operations
+
+    def update(
+        self, metrics: SimulationMetrics, operations: int
+    ) -> float | None:
+        """
+        Measure the current step once it is over and adjust the rate.
+
+        Args:
+            - ``metrics (SimulationMetrics):`` The metrics of the run.
+            - ``operations (int):`` The number of operations of the run.
+
+        Returns:
+            ``float:`` The new rate, or None if the step is not over.
+        """
+        now = self.clock()
+        elapsed = now - self.step_started
+        if self.finished or elapsed < self.interval:
+            return None
+
+        latency = metrics.latency_overall()
+        step_latency = latency.since(self.step_latency)
+        throughput = (operations - self.step_operations) / elapsed
+        self.step_started = now
+        self.step_latency = latency
+        self.step_operations = operations
+        if not self.warmed_up:
+            self.warmed_up = True
+            return self.rate
+
+        snapshot = step_latency.snapshot()
+        sustained = (
+            step_latency.count > 0
+            and snapshot['p99'] <= self.target_p99
+            and throughput >= SUSTAINED_THROUGHPUT * self.rate
+        )
+        self.steps.append(
+            {
+                'rate': self.rate,
+                'throughput': throughput,
+                'p50': snapshot['p50'],
+                'p95': snapshot['p95'],
+                'p99': snapshot['p99'],
+                'sustained': sustained,
+            }
+        )
+
+        if sustained:
+            self.rate += self.increase
+        else:
+            self.rate *= self.backoff
+            self.backoffs += 1
+            self.finished = self.backoffs >= self.max_backoffs
+        return self.rate
+
+    def report(self) -> dict:
+        """
+        Return the outcome of the search: the highest throughput measured
+        in a step that met the latency target, the target and the latency
+        curve (rate, throughput and p50/p95/p99 of each step).
+        """
+        sustained = [step for step in self.steps if step['sustained']]
+        return {
+            'target_p99': self.target_p99,
+            'max_throughput': max(
+                (step['throughput'] for step in sustained), default=0.0
+            ),
+            'max_rate': max((step['rate'] for step in sustained), default=0.0),
+            'backoffs': self.backoffs,
+            'steps': self.steps,
+        }
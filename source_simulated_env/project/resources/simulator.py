@@ -1,57 +1,1195 @@
+import asyncio
+import os
 import random
 import time
+from collections import Counter
 from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+from itertools import accumulate
+from typing import NamedTuple
 
-from actions_db import MongoDBActions
+from actions_db import READ_ACTIONS, MongoDBActions
+from bson.objectid import ObjectId
+from metrics import (LatencyHistogram, MetricsExporter, SimulationMetrics,
+                     ThroughputWindow)
+from prefetch import PrefetchBuffer
+from pymongo import DeleteOne, InsertOne
+from pymongo.errors import PyMongoError
+from rate_limiter import RateLimiter, RateSchedule
+from reservoir import IdReservoir
+from saturation import SaturationSearch
+from templates import TemplatePool
+from termcolor import colored
 
-from project.config import setup_custom_logger
+from project.config import METRICS_DIR, setup_custom_logger
+
+RESERVOIR_SIZE = 100_000
+RESERVOIR_SAMPLE_SIZE = 1000
+RESERVOIR_REFRESH_INTERVAL = 10_000
+RESERVOIR_EMPTY_REFRESH_INTERVAL = 100
+PROGRESS_INTERVAL = 1
+# Threads sending the requests of a concurrent run, whatever its number of
+# virtual clients.
+MAX_WORKER_THREADS = 64
+WRITE_ACTIONS = ('create', 'update', 'delete')
+ACTIONS = WRITE_ACTIONS + READ_ACTIONS
 
 
 def simulate_data(
     db_address: str,
     db_name: str,
-    data_generator_func: Callable,
+    data_generator_func: Callable | None,
     time_action: float | None = None,
     custom_actions: list | None = None,
     editing_grade: int | None = None,
     quantity_interactions: int | None = None,
+    action_weights: dict | None = None,
+    pool_size: int = 100,
+    pool_idle_timeout: float | None = None,
+    keep_pool_alive: bool = True,
+    batch_size: int | None = None,
+    key_distribution: str = 'uniform',
+    key_skew: float | None = None,
+    reservoir_size: int = RESERVOIR_SIZE,
+    rate: float | None = None,
+    rate_schedule: list | dict | None = None,
+    concurrency: int = 1,
+    metrics_interval: float | None = None,
+    run_id: str | None = None,
+    progress: Callable | None = None,
+    log_sample: int | None = None,
+    log_json: bool | None = None,
+    prefetch_depth: int = 0,
+    template_pool_size: int = 0,
+    workloads: list[dict] | None = None,
+    duration: float | None = None,
+    slice_seconds: float | None = None,
+    slice_operations: int | None = None,
+    checkpoint: dict | None = None,
+    find_max: dict | None = None,
 ):
-    logger = setup_custom_logger()
+    """
+    Run a simulation, or the next slice of a sliced one, and return its
+    ``Simulation.summary``. When the slice ends before the simulation, the
+    summary holds the ``checkpoint`` to resume it from. With ``find_max``,
+    the keyword arguments of a ``SaturationSearch``, the rate is searched
+    for instead of being given. With ``metrics_interval``, the metrics are
+    exported to ``METRICS_DIR/simulate_<run_id>.prom``, by default named
+    after the process. A concurrent run has at least one pooled
+    connection per request thread (see ``Simulation.run_concurrently``).
+    """
+    logger = setup_custom_logger(log_sample, log_json)
+
+    limiter = None
+    saturation = None
+    if find_max is not None:
+        saturation = SaturationSearch(**find_max)
+        limiter = RateLimiter(saturation.rate)
+    elif rate_schedule:
+        limiter = RateLimiter(schedule=RateSchedule.from_config(rate_schedule))
+    elif rate:
+        limiter = RateLimiter(rate)
+
+    metrics_path = None
+    if metrics_interval:
+        metrics_path = os.path.join(
+            METRICS_DIR, f'simulate_{run_id or os.getpid()}.prom'
+        )
+
+    if concurrency > 1:
+        pool_size = max(pool_size, min(concurrency, MAX_WORKER_THREADS))
+
+    simulator = MongoDBActions(
+        db_address,
+        db_name,
+        max_pool_size=pool_size,
+        max_idle_time=pool_idle_timeout,
+        keep_alive=keep_pool_alive,
+    )
+
+    simulation = Simulation(
+        simulator,
+        logger,
+        data_generator_func,
+        custom_actions=custom_actions,
+        action_weights=action_weights,
+        editing_grade=editing_grade,
+        key_distribution=key_distribution,
+        key_skew=key_skew,
+        reservoir_size=reservoir_size,
+        batch_size=batch_size,
+        quantity_interactions=quantity_interactions,
+        time_action=time_action,
+        limiter=limiter,
+        metrics_path=metrics_path,
+        metrics_interval=metrics_interval,
+        progress=progress,
+        prefetch_depth=prefetch_depth,
+        template_pool_size=template_pool_size,
+        workloads=workloads,
+        duration=duration,
+        slice_seconds=slice_seconds,
+        slice_operations=slice_operations,
+        saturation=saturation,
+    )
+    if checkpoint:
+        simulation.restore(checkpoint)
+
+    with simulator:
+        if concurrency > 1:
+            asyncio.run(simulation.run_concurrently(concurrency))
+        else:
+            simulation.run()
+
+    summary = simulation.summary()
+    if simulation.paused:
+        summary['checkpoint'] = simulation.checkpoint()
+    return summary
+
+
+def build_action_mix(
+    custom_actions: list | None = None, action_weights: dict | None = None
+) -> tuple[tuple[str, ...], tuple[float, ...]]:
+    """
+    Return the actions of a run and their cumulative weights, for
+    ``random.choices``.
+
+    Args:
+        - ``custom_actions (list, optional):`` Actions drawn with equal
+        weights. Default is create, update and delete.
+        - ``action_weights (dict, optional):`` Weight of each action (e.g.
+        ``{'read': 70, 'update': 20, 'create': 10}``), used instead of
+        ``custom_actions``.
+    """
+    if not action_weights:
+        action_weights = {
+            action: 1 for action in custom_actions or WRITE_ACTIONS
+        }
+
+    for action, weight in action_weights.items():
+        if action not in ACTIONS or weight < 0:
+            message_error = colored(
+                f'✗ ACTIONS MUST BE ONE OF {ACTIONS} WITH NON-NEGATIVE WEIGHTS.[** "{action}={weight}":INVALID **]',
+                'red',
+            )
+            raise ValueError(message_error)
+
+    actions = tuple(action_weights)
+    cum_weights = tuple(accumulate(action_weights.values()))
+    if not cum_weights[-1]:
+        raise ValueError(
+            colored('✗ THE ACTION WEIGHTS ARE ALL ZERO.', 'red')
+        )
+    return actions, cum_weights
+
+
+def merge_summaries(summaries: list[dict]) -> dict:
+    """
+    Aggregate the summaries of simulations run in parallel (see
+    ``Simulation.summary``): operations, actions and errors are added up,
+    latency histograms are merged, and the wall time is the longest one.
+    """
+    actions = Counter()
+    histograms = {}
+    for summary in summaries:
+        actions.update(summary['actions'])
+        for action, data in summary.get('histograms', {}).items():
+            histograms.setdefault(action, LatencyHistogram()).merge(
+                LatencyHistogram.from_dict(data)
+            )
+
+    operations = sum(summary['operations'] for summary in summaries)
+    wall_time = max((summary['wall_time'] for summary in summaries), default=0)
+
+    return {
+        'operations': operations,
+        'actions': dict(actions),
+        'errors': sum(summary['errors'] for summary in summaries),
+        'wall_time': wall_time,
+        'ops_per_sec': operations / wall_time if wall_time else 0.0,
+        'prefetch_underruns': sum(
+            summary.get('prefetch_underruns', 0) for summary in summaries
+        ),
+        'latency': {
+            action: histogram.snapshot()
+            for action, histogram in histograms.items()
+        },
+        'histograms': {
+            action: histogram.to_dict()
+            for action, histogram in histograms.items()
+        },
+        'simulations': len(summaries),
+    }
+
+
+class Operation(NamedTuple):
+    """A single action ready to be sent to the database."""
+
+    action: str
+    collection_name: str
+    document: dict
+    target_id: ObjectId | None
+
+
+class Outcome(NamedTuple):
+    """The result of a request to the database and its latency in seconds."""
+
+    result: object
+    latency: float
+    error: str | None
+
+
+class Batch(NamedTuple):
+    """
+    The write operations of a ``bulk_write``, with the documents of its
+    inserts by operation index and the action of each operation, and the
+    read actions drawn with them, sent one by one.
+    """
+
+    collection_name: str
+    operations: list
+    inserted_documents: dict[int, dict]
+    actions: list[str]
+    reads: list[Operation]
+
+
+class BatchOutcome(NamedTuple):
+    """The outcome of the ``bulk_write`` of a batch and of its reads."""
+
+    write: Outcome | None
+    reads: list[Outcome]
+
+
+class Workload:
+    """
+    One model of a simulation: how its documents are generated and the mix
+    of actions run on its collection.
+
+    Arguments and Attributes:
+        - ``data_generator_func (Callable):`` The ``generator_*_data``
+        function of the model.
+        - ``custom_actions (list, optional):`` The actions to draw from.
+        Default is create, update and delete.
+        - ``action_weights (dict, optional):`` The weight of each action,
+        used instead of ``custom_actions`` (see ``build_action_mix``).
+        - ``weight (float, optional):`` The share of the steps of the
+        simulation run on this model, relative to the other workloads.
+        Default is 1.
+        - ``prefetch_depth (int, optional):`` Number of documents generated
+        ahead by a background thread (see ``PrefetchBuffer``). Default is 0.
+        - ``template_pool_size (int, optional):`` Number of pre-encoded
+        documents inserts are drawn from (see ``TemplatePool``). Default is
+        0.
+        - ``metrics (SimulationMetrics, optional):`` Where prefetch underruns
+        are recorded.
+    """
+
+    def __init__(
+        self,
+        data_generator_func: Callable,
+        custom_actions: list | None = None,
+        action_weights: dict | None = None,
+        weight: float = 1,
+        prefetch_depth: int = 0,
+        template_pool_size: int = 0,
+        metrics: SimulationMetrics | None = None,
+    ):
+        if weight < 0:
+            message_error = colored(
+                f'✗ THE "weight" PARAMETER MUST NOT BE NEGATIVE.[** "{weight}":INVALID **]',
+                'red',
+            )
+            raise ValueError(message_error)
+
+        self.data_generator_func = data_generator_func
+        self.actions, self.cum_weights = build_action_mix(
+            custom_actions, action_weights
+        )
+        self.reads = any(action in READ_ACTIONS for action in self.actions)
+        self.weight = weight
+        self.buffer = None
+        self.generate = data_generator_func
+        if prefetch_depth:
+            self.buffer = PrefetchBuffer(
+                data_generator_func, prefetch_depth, metrics=metrics
+            )
+            self.generate = self.buffer
+        self.templates = None
+        if template_pool_size:
+            self.templates = TemplatePool(
+                data_generator_func, template_pool_size
+            )
+
+    def draw_actions(self, quantity: int = 1) -> list[str]:
+        """Draw ``quantity`` actions according to the action mix."""
+        return random.choices(
+            self.actions, cum_weights=self.cum_weights, k=quantity
+        )
+
+    def draw_documents(self, actions: list[str]) -> tuple[str, list]:
+        """
+        Draw one document for each of ``actions``: a pre-encoded document of
+        the ``TemplatePool`` for inserts when templates are enabled,
+        otherwise a document from ``data_generator_func``.
+
+        Returns:
+            ``tuple:`` The name of the collection and the documents.
+        """
+        if self.templates is None:
+            data_generator = self.generate(quantity=len(actions))
+            name_collection = next(iter(data_generator))
+            return name_collection, data_generator[name_collection]
+
+        creates = actions.count('create')
+        raw_documents = iter(self.templates.take(creates))
+        name_collection = self.templates.collection_name
+
+        data_documents = iter(())
+        if creates < len(actions):
+            data_generator = self.generate(quantity=len(actions) - creates)
+            data_documents = iter(data_generator[name_collection])
+
+        documents = [
+            next(raw_documents if action == 'create' else data_documents)
+            for action in actions
+        ]
+        return name_collection, documents
+
+
+class Draw(NamedTuple):
+    """The workload of a step, its actions and their documents."""
+
+    workload: Workload
+    actions: list[str]
+    collection_name: str
+    documents: list
+
+
+class Simulation:
+    """
+    The state of a simulation run: the database actions, the action mix and,
+    for each collection, an ``IdReservoir`` of known ``_id``s from which the
+    targets of updates and deletes are picked without querying the database.
+
+    The reservoirs are filled with the ids of the documents inserted by the
+    run and refreshed with a server-side ``$sample`` every
+    ``RESERVOIR_REFRESH_INTERVAL`` picks, so documents inserted by other runs
+    are also targeted.
+
+    Arguments and Attributes:
+        - ``simulator (MongoDBActions):`` The database actions.
+        - ``logger (Logger):`` The simulator logger.
+        - ``data_generator_func (Callable):`` The ``generator_*_data``
+        function of the simulated model, unless ``workloads`` is given.
+        - ``custom_actions (list, optional):`` The actions to draw from:
+        create, update, delete and the reads of ``READ_ACTIONS``. Default is
+        create, update and delete.
+        - ``action_weights (dict, optional):`` The weight of each action,
+        used instead of ``custom_actions`` (see ``build_action_mix``).
+        - ``editing_grade (int, optional):`` Percentage of keys to update in
+        editing actions.
+        - ``key_distribution (str, optional):`` How update and delete targets
+        are picked (see ``IdReservoir``). Default is 'uniform'.
+        - ``key_skew (float, optional):`` The skew of ``key_distribution``.
+        - ``reservoir_size (int, optional):`` Maximum number of ids kept per
+        collection.
+        - ``batch_size (int, optional):`` Number of actions sent together in
+        one ``bulk_write``. By default actions are sent one by one.
+        - ``quantity_interactions (int, optional):`` Total number of actions
+        of the run. Default is no limit.
+        - ``time_action (float, optional):`` Maximum pause after each step, in
+        seconds.
+        - ``limiter (RateLimiter, optional):`` Paces the steps to a target
+        throughput.
+        - ``metrics_path (str, optional):`` File to which the ``metrics`` of
+        the run are exported in the Prometheus text format, until the run
+        ends. Default is no export.
+        - ``metrics_interval (float, optional):`` Seconds between two exports
+        of the metrics. Default is 10.
+        - ``progress (Callable, optional):`` Called about every
+        ``PROGRESS_INTERVAL`` seconds with the ``progress_snapshot`` of the
+        run, e.g. to publish it as the state of its Celery task.
+        - ``prefetch_depth (int, optional):`` Number of documents generated
+        ahead by a background thread (see ``PrefetchBuffer``). Default is 0,
+        documents are generated in the write loop.
+        - ``template_pool_size (int, optional):`` Number of pre-encoded
+        documents inserts are drawn from (see ``TemplatePool``). Default is
+        0, inserts are built and encoded one by one.
+        - ``workloads (list, optional):`` The keyword arguments of the
+        ``Workload`` of each model of a mixed-model run, whose steps are
+        spread over the models by weight. Default is the single workload of
+        ``data_generator_func``, ``custom_actions`` and ``action_weights``.
+        - ``duration (float, optional):`` Maximum duration of the run, in
+        seconds. Default is no limit.
+        - ``slice_seconds (float, optional):`` Pause the run after this many
+        seconds, to be resumed from its ``checkpoint``. Default is no
+        slicing.
+        - ``slice_operations (int, optional):`` Pause the run after this
+        many actions.
+        - ``saturation (SaturationSearch, optional):`` Adjusts the rate of
+        ``limiter`` to find the highest sustainable throughput; the run
+        ends with the search.
+    """
+
+    def __init__(
+        self,
+        simulator: MongoDBActions,
+        logger,
+        data_generator_func: Callable | None,
+        custom_actions: list | None = None,
+        action_weights: dict | None = None,
+        editing_grade: int | None = None,
+        key_distribution: str = 'uniform',
+        key_skew: float | None = None,
+        reservoir_size: int = RESERVOIR_SIZE,
+        batch_size: int | None = None,
+        quantity_interactions: int | None = None,
+        time_action: float | None = None,
+        limiter: RateLimiter | None = None,
+        metrics_path: str | None = None,
+        metrics_interval: float | None = 10,
+        progress: Callable | None = None,
+        prefetch_depth: int = 0,
+        template_pool_size: int = 0,
+        workloads: list[dict] | None = None,
+        duration: float | None = None,
+        slice_seconds: float | None = None,
+        slice_operations: int | None = None,
+        saturation: SaturationSearch | None = None,
+    ):
+        self.simulator = simulator
+        self.logger = logger
+        self.editing_grade = editing_grade
+        self.key_distribution = key_distribution
+        self.key_skew = key_skew
+        self.reservoir_size = reservoir_size
+        self.reservoirs: dict[str, IdReservoir] = {}
+        self.picks_since_refresh: dict[str, int] = {}
+        self.pending_refreshes: set[str] | None = None
+        self.batch_size = batch_size
+        self.quantity_interactions = quantity_interactions
+        self.time_action = time_action
+        self.limiter = limiter
+        self.claimed = 0
+        self.stopped = False
+        self.actions = Counter()
+        self.errors = 0
+        self.metrics = SimulationMetrics()
+        self.exporter = None
+        if metrics_path:
+            self.exporter = MetricsExporter(
+                self.metrics, metrics_path, metrics_interval or 10
+            )
+        self.progress = progress
+        if workloads is None:
+            workloads = [
+                {
+                    'data_generator_func': data_generator_func,
+                    'custom_actions': custom_actions,
+                    'action_weights': action_weights,
+                }
+            ]
+        self.workloads = [
+            Workload(
+                **workload,
+                prefetch_depth=prefetch_depth,
+                template_pool_size=template_pool_size,
+                metrics=self.metrics,
+            )
+            for workload in workloads
+        ]
+        self.workload_cum_weights = tuple(
+            accumulate(workload.weight for workload in self.workloads)
+        )
+        if not self.workload_cum_weights or not self.workload_cum_weights[-1]:
+            raise ValueError(
+                colored('✗ THE WORKLOAD WEIGHTS ARE ALL ZERO.', 'red')
+            )
+        self.reads = any(workload.reads for workload in self.workloads)
+        self.duration = duration
+        self.slice_seconds = slice_seconds
+        self.slice_operations = slice_operations
+        self.slice_started = None
+        self.slice_claimed = 0
+        self.slices = 0
+        self.paused = False
+        self.elapsed = 0.0
+        self.saturation = saturation
+        self.throughput = ThroughputWindow()
+        self.reported = 0.0
+        self.started = None
+        self.finished = None
+
+    def get_reservoir(self, collection_name: str) -> IdReservoir:
+        """Return the reservoir of a collection, creating it on first use."""
+        reservoir = self.reservoirs.get(collection_name)
+        if reservoir is None:
+            reservoir = IdReservoir(
+                self.reservoir_size, self.key_distribution, self.key_skew
+            )
+            self.reservoirs[collection_name] = reservoir
+            self.refresh_reservoir(collection_name)
+        return reservoir
+
+    def refresh_reservoir(self, collection_name: str):
+        """
+        Add a ``$sample`` of the collection ids to its reservoir. During
+        ``run_concurrently`` the refresh is only queued in
+        ``pending_refreshes``, to be sampled off the event loop.
+        """
+        if self.pending_refreshes is not None:
+            self.pending_refreshes.add(collection_name)
+        else:
+            self.reservoirs[collection_name].extend(
+                self.simulator.sample_ids(
+                    collection_name, RESERVOIR_SAMPLE_SIZE
+                )
+            )
+        self.picks_since_refresh[collection_name] = 0
+
+    def pick_target(self, collection_name: str) -> ObjectId | None:
+        """
+        Pick the target of an update or delete from the reservoir of the
+        collection, refreshing the reservoir when it is due.
+
+        Returns:
+            - ``ObjectId`` or ``None``: The picked id, or None if no document
+            of the collection is known.
+        """
+        reservoir = self.get_reservoir(collection_name)
+        picks = self.picks_since_refresh[collection_name] + 1
+        self.picks_since_refresh[collection_name] = picks
+
+        if picks >= RESERVOIR_REFRESH_INTERVAL or (
+            not reservoir and picks >= RESERVOIR_EMPTY_REFRESH_INTERVAL
+        ):
+            self.refresh_reservoir(collection_name)
+
+        return reservoir.choose()
+
+    def draw_workload(self) -> Workload:
+        """Draw the workload of the next step according to their weights."""
+        if len(self.workloads) == 1:
+            return self.workloads[0]
+        (workload,) = random.choices(
+            self.workloads, cum_weights=self.workload_cum_weights
+        )
+        return workload
+
+    def draw_documents(
+        self, workload: Workload, actions: list[str]
+    ) -> tuple[str, list]:
+        """
+        Draw the documents of ``actions`` from a workload, creating the
+        indexes of the read actions on first use of its collection.
 
-    loop_count = 0
-    while quantity_interactions is None or loop_count < quantity_interactions:
-        if not custom_actions:
-            custom_actions = ['create', 'update', 'delete']
+        Returns:
+            ``tuple:`` The name of the collection and the documents.
+        """
+        name_collection, documents = workload.draw_documents(actions)
+        if workload.reads:
+            self.simulator.ensure_read_indexes(name_collection, documents[0])
+        return name_collection, documents
 
-        action = random.choice(custom_actions)
+    def draw_step(self, size: int) -> Draw:
+        """
+        Draw a workload, ``size`` random actions of its action mix and their
+        documents. This is where documents are generated, and it may run in
+        another thread (see ``run_concurrently``).
+        """
+        workload = self.draw_workload()
+        actions = workload.draw_actions(size)
+        name_collection, documents = self.draw_documents(workload, actions)
+        return Draw(workload, actions, name_collection, documents)
 
-        data_generator = data_generator_func()
+    def prepare_operation(
+        self, action: str, name_collection: str, data_document: dict
+    ) -> Operation:
+        """
+        Pick the target of an action other than a create or a lookup. When
+        no document of the collection is known, updates and deletes become
+        inserts of the generated document; reads run without a target and
+        find nothing, and ranges and aggregations on deliveries, which
+        select by date, do not need one.
+        """
+        target_id = None
+        if action not in ('create', 'lookup'):
+            target_id = self.pick_target(name_collection)
+            if target_id is None and action in ('update', 'delete'):
+                action = 'create'
+        return Operation(action, name_collection, data_document, target_id)
 
-        name_collection = list(data_generator.keys())[0]
-        data_document = data_generator[name_collection][0]
+    def prepare_action(self, draw: Draw | None = None) -> Operation:
+        """
+        Draw a workload, one random action of its action mix and its
+        document, unless they are given as ``draw`` (see ``draw_step``),
+        and, for updates, deletes and reads, pick its target (see
+        ``prepare_operation``).
+        """
+        if draw is None:
+            draw = self.draw_step(1)
+        _, (action,), name_collection, (data_document,) = draw
+        self.get_reservoir(name_collection)
+        return self.prepare_operation(action, name_collection, data_document)
 
-        if action in ['create', 'update']:
-            simulator = MongoDBActions(
-                db_address, db_name, name_collection, data_document
+    def execute_action(self, operation: Operation) -> Outcome:
+        """
+        Send a prepared action to the database and time it. It may run in
+        another thread.
+
+        Returns:
+            ``Outcome:`` The result of the ``MongoDBActions`` method (an
+            ``ObjectId`` or ``None`` for writes, the number of documents
+            found for reads), its latency and its database error, if any.
+        """
+        action, name_collection, data_document, target_id = operation
+        started = time.perf_counter()
+
+        try:
+            if action == 'create':
+                id = self.simulator.create_document(
+                    name_collection, data_document
+                )
+            elif action == 'update':
+                id = self.simulator.update_document(
+                    name_collection,
+                    data_document,
+                    percent_to_update=self.editing_grade or 10,
+                    target_id=target_id,
+                )
+            elif action == 'delete':
+                id = self.simulator.delete_document(
+                    name_collection, target_id=target_id
+                )
+            elif action == 'read':
+                id = self.simulator.read_document(name_collection, target_id)
+            elif action == 'lookup':
+                id = self.simulator.lookup_documents(
+                    name_collection, data_document
+                )
+            elif action == 'range':
+                id = self.simulator.range_documents(
+                    name_collection, data_document, target_id
+                )
+            else:
+                id = self.simulator.aggregate_documents(
+                    name_collection, data_document, target_id
+                )
+        except PyMongoError as error:
+            return Outcome(None, time.perf_counter() - started, str(error))
+
+        return Outcome(id, time.perf_counter() - started, None)
+
+    def complete_action(self, operation: Operation, outcome: Outcome):
+        """
+        Record the result of an action in the reservoirs, the metrics and the
+        log.
+        """
+        action, name_collection, _, target_id = operation
+        id, latency, error = outcome
+        reservoir = self.reservoirs[name_collection]
+        self.actions[action] += 1
+        self.metrics.record(
+            name_collection, action, latency, errors=int(error is not None)
+        )
+
+        if error is not None:
+            self.errors += 1
+            self.logger.warning(
+                'ERROR %-12s[%s - %s]', action.upper(), name_collection, error
             )
+        elif action == 'create':
+            reservoir.add(id)
+            self.logger.info(
+                'ADD DOCUMENT      [%s - ObjectID: %s]', name_collection, id
+            )
+        elif action == 'update':
+            if id is None:
+                reservoir.discard(target_id)
+            if self.editing_grade:
+                self.logger.info(
+                    'UPDATE* DOCUMENT   [%s - ObjectID: %s]',
+                    name_collection,
+                    target_id,
+                )
+            else:
+                self.logger.info(
+                    'UPDATE DOCUMENT   [%s - ObjectID: %s]',
+                    name_collection,
+                    target_id,
+                )
+        elif action == 'delete':
+            reservoir.discard(id)
+            self.logger.info(
+                'DELETE DOCUMENT   [%s - ObjectID: %s]', name_collection, id
+            )
+        else:
+            if action == 'read' and not id:
+                reservoir.discard(target_id)
+            self.logger.info(
+                '%-18s[%s - Found: %s]',
+                f'{action.upper()} DOCUMENTS',
+                name_collection,
+                id,
+            )
+
+    def run_action(self):
+        """
+        Perform one random action of the action mix of a random workload.
+        """
+        operation = self.prepare_action()
+        self.complete_action(operation, self.execute_action(operation))
+
+    def prepare_batch(
+        self, batch_size: int, draw: Draw | None = None
+    ) -> Batch:
+        """
+        Draw a workload and ``batch_size`` random actions of its action mix,
+        unless they are given as ``draw`` (see ``draw_step``): the writes
+        become the operations of a single ``bulk_write``, the reads are kept
+        aside to be sent one by one (see ``prepare_action``).
+        """
+        if draw is None:
+            draw = self.draw_step(batch_size)
+        _, drawn_actions, name_collection, data_documents = draw
+        reservoir = self.get_reservoir(name_collection)
+
+        operations = []
+        inserted_documents = {}
+        actions = []
+        reads = []
+        for action, data_document in zip(drawn_actions, data_documents):
+            operation = self.prepare_operation(
+                action, name_collection, data_document
+            )
+            action, _, _, target_id = operation
+
+            if action in READ_ACTIONS:
+                reads.append(operation)
+                continue
+            actions.append(action)
+
             if action == 'create':
-                id = simulator.create_document()
-                logger.info(f'ADD DOCUMENT      [{name_collection} - ObjectID: {id}]')
+                inserted_documents[len(operations)] = data_document
+                operations.append(InsertOne(data_document))
+            elif action == 'update':
+                operations.append(
+                    self.simulator.build_update(
+                        name_collection,
+                        data_document,
+                        target_id,
+                        percent_to_update=self.editing_grade or 10,
+                    )
+                )
             else:
-                if editing_grade:
-                    id = simulator.update_document(percent_to_update=editing_grade)
-                    logger.info(f'UPDATE* DOCUMENT   [{name_collection} - ObjectID: {id}]')
-                else:
-                    id = simulator.update_document()
-                    logger.info(f'UPDATE DOCUMENT   [{name_collection} - ObjectID: {id}]')
+                reservoir.discard(target_id)
+                operations.append(DeleteOne({'_id': target_id}))
+
+        return Batch(
+            name_collection, operations, inserted_documents, actions, reads
+        )
+
+    def execute_batch(self, batch: Batch) -> BatchOutcome:
+        """
+        Send the writes of a prepared batch with one unordered
+        ``bulk_write``, then its reads, and time them. It may run in another
+        thread.
+
+        Returns:
+            ``BatchOutcome:`` The summary returned by ``bulk_write``, its
+            latency and its database error if the whole batch failed (or
+            None without writes), and the outcome of each read.
+        """
+        write = None
+        if batch.operations:
+            started = time.perf_counter()
+            try:
+                result = self.simulator.bulk_write(
+                    batch.collection_name, batch.operations
+                )
+                write = Outcome(result, time.perf_counter() - started, None)
+            except PyMongoError as error:
+                write = Outcome(
+                    None, time.perf_counter() - started, str(error)
+                )
+
+        reads = [self.execute_action(operation) for operation in batch.reads]
+        return BatchOutcome(write, reads)
+
+    def complete_batch(self, batch: Batch, outcome: BatchOutcome) -> int:
+        """
+        Record the result of a batch in the reservoirs, the metrics and the
+        log.
+
+        Returns:
+            ``int:`` The number of actions of the batch.
+        """
+        for operation, read_outcome in zip(batch.reads, outcome.reads):
+            self.complete_action(operation, read_outcome)
+        if outcome.write is None:
+            return len(batch.reads)
+
+        name_collection = batch.collection_name
+        result, latency, error = outcome.write
+        reservoir = self.reservoirs[name_collection]
+        self.actions.update(batch.actions)
+        for action, count in Counter(batch.actions).items():
+            self.metrics.count(name_collection, action, count)
+
+        if error is not None:
+            self.errors += len(batch.operations)
+            self.metrics.record(
+                name_collection,
+                'bulk_write',
+                latency,
+                operations=0,
+                errors=len(batch.operations),
+            )
+            self.logger.warning(
+                'ERROR BULK WRITE  [%s - %s]', name_collection, error
+            )
+            return len(batch.operations) + len(batch.reads)
+
+        self.errors += len(result['writeErrors'])
+        self.metrics.record(
+            name_collection,
+            'bulk_write',
+            latency,
+            operations=0,
+            errors=len(result['writeErrors']),
+        )
+
+        failed = {error['index'] for error in result['writeErrors']}
+        for index, data_document in batch.inserted_documents.items():
+            if index not in failed:
+                reservoir.add(data_document['_id'])
+
+        self.logger.info(
+            'BULK WRITE        [%s - Inserted: %s Updated: %s Deleted: %s '
+            'Errors: %s]',
+            name_collection,
+            result['nInserted'],
+            result['nModified'],
+            result['nRemoved'],
+            len(result['writeErrors']),
+        )
+        for error in result['writeErrors']:
+            self.logger.warning(
+                'BULK WRITE ERROR  [%s - Operation: %s - %s]',
+                name_collection,
+                error['index'],
+                error['errmsg'],
+            )
+
+        return len(batch.operations) + len(batch.reads)
+
+    def run_batch(self, batch_size: int) -> int:
+        """
+        Collect ``batch_size`` random actions and send their writes to the
+        database with a single unordered ``bulk_write``.
+
+        Returns:
+            ``int:`` The number of actions sent.
+        """
+        batch = self.prepare_batch(batch_size)
+        return self.complete_batch(batch, self.execute_batch(batch))
+
+    def claim(self) -> int:
+        """
+        Reserve the next step of the run: one action, or one batch of up to
+        ``batch_size`` actions, until ``quantity_interactions`` actions or
+        ``duration`` seconds are reached. The run is ``paused`` instead when
+        its slice is over.
+
+        Returns:
+            ``int:`` The number of actions of the step, 0 once the run is
+            over or paused.
+        """
+        size = self.batch_size or 1
+        now = time.monotonic()
+        if self.duration is not None and now - self.started >= self.duration:
+            self.stopped = True
+        if self.quantity_interactions is not None:
+            size = min(size, self.quantity_interactions - self.claimed)
+        if size <= 0 or self.stopped or self.paused:
+            return 0
+
+        if (
+            self.slice_seconds is not None
+            and now - self.slice_started >= self.slice_seconds
+        ) or (
+            self.slice_operations is not None
+            and self.claimed - self.slice_claimed >= self.slice_operations
+        ):
+            self.paused = True
+            return 0
+
+        self.claimed += size
+        return size
+
+    def begin(self):
+        """
+        Build the template pools of the workloads, then start the clocks of
+        the run, or of its next slice: the time elapsed in the previous
+        slices counts towards ``duration`` and the rate schedule. Building
+        the templates is not charged to the first steps.
+        """
+        for workload in self.workloads:
+            if workload.templates is not None:
+                workload.templates.prepare()
+        now = time.monotonic()
+        self.started = now - self.elapsed
+        self.slice_started = now
+        self.slice_claimed = self.claimed
+        self.slices += 1
+        if self.limiter is not None:
+            self.limiter.started = self.started
+        self.throughput.add(sum(self.actions.values()))
+        if self.saturation is not None:
+            self.saturation.start(self.metrics, sum(self.actions.values()))
+
+    def end(self):
+        """
+        Stop the clocks of the run. The metrics of a paused run are exported
+        for its next slice, while the metrics file of a finished run is
+        removed, so no stale series are left to scrape.
+        """
+        self.finished = time.monotonic()
+        self.elapsed = self.finished - self.started
+        if self.exporter is None:
+            return
+        if self.paused:
+            self.exporter.export()
         else:
-            simulator = MongoDBActions(
-                db_address, db_name, name_collection, data_document
+            self.exporter.remove()
+
+    def checkpoint(self) -> dict:
+        """
+        Return the state of a paused run, from which ``restore`` resumes it
+        in another process: counters, metrics, elapsed time and the state
+        of the ``random`` generator. The reservoirs are not saved, they are
+        refilled from the database.
+        """
+        version, internal_state, gauss_next = random.getstate()
+        return {
+            'claimed': self.claimed,
+            'actions': dict(self.actions),
+            'errors': self.errors,
+            'elapsed': self.elapsed,
+            'slices': self.slices,
+            'metrics': self.metrics.to_dict(),
+            'random_state': [version, list(internal_state), gauss_next],
+        }
+
+    def restore(self, checkpoint: dict):
+        """Resume a run from the ``checkpoint`` of its previous slice."""
+        self.claimed = checkpoint['claimed']
+        self.actions.update(checkpoint['actions'])
+        self.errors = checkpoint['errors']
+        self.elapsed = checkpoint['elapsed']
+        self.slices = checkpoint['slices']
+        self.metrics.merge(SimulationMetrics.from_dict(checkpoint['metrics']))
+        version, internal_state, gauss_next = checkpoint['random_state']
+        random.setstate((version, tuple(internal_state), gauss_next))
+
+    def summary(self) -> dict:
+        """
+        Return the outcome of the run: number of operations, operations by
+        action, errors, wall time (seconds), operations per second, prefetch
+        buffer underruns, the latency percentiles (milliseconds) and
+        histograms by action, and the report of a saturation search.
+        """
+        operations = sum(self.actions.values())
+        wall_time = 0.0
+        if self.started is not None:
+            wall_time = (self.finished or time.monotonic()) - self.started
+
+        latency = self.metrics.latency_by_action()
+
+        summary = {
+            'operations': operations,
+            'actions': dict(self.actions),
+            'errors': self.errors,
+            'wall_time': wall_time,
+            'ops_per_sec': operations / wall_time if wall_time else 0.0,
+            'prefetch_underruns': self.metrics.underruns,
+            'latency': {
+                action: histogram.snapshot()
+                for action, histogram in latency.items()
+            },
+            'histograms': {
+                action: histogram.to_dict()
+                for action, histogram in latency.items()
+            },
+        }
+        if self.saturation is not None:
+            summary['saturation'] = self.saturation.report()
+        return summary
+
+    def progress_snapshot(self) -> dict:
+        """
+        Return the progress of the run: operations done, operations per
+        second over the last ``THROUGHPUT_WINDOW`` seconds, errors, elapsed
+        time (seconds) and latency percentiles of every request
+        (milliseconds).
+        """
+        latency = self.metrics.latency_overall().snapshot()
+        elapsed = 0.0
+        if self.started is not None:
+            elapsed = (self.finished or time.monotonic()) - self.started
+
+        return {
+            'operations': sum(self.actions.values()),
+            'ops_per_sec': self.throughput.rate(),
+            'errors': self.errors,
+            'elapsed': elapsed,
+            'quantity': self.quantity_interactions,
+            'prefetch_underruns': self.metrics.underruns,
+            'p50': latency['p50'],
+            'p95': latency['p95'],
+            'p99': latency['p99'],
+        }
+
+    def publish(self):
+        """
+        Export the metrics, adjust the rate of a saturation search and report
+        the progress of the run when they are due. Called after every step.
+        """
+        if self.exporter is not None:
+            self.exporter.maybe_export()
+
+        if self.saturation is not None:
+            rate = self.saturation.update(
+                self.metrics, sum(self.actions.values())
             )
-            id = simulator.delete_document()
-            logger.info(f'DELETE DOCUMENT   [{name_collection} - ObjectID: {id}]')
+            if rate is not None:
+                self.limiter.set_rate(rate)
+                self.logger.info('FIND MAX          [Rate: %.1f ops/s]', rate)
+            if self.saturation.finished:
+                self.stopped = True
+
+        if self.progress is None:
+            return
+        now = time.monotonic()
+        if now - self.reported >= PROGRESS_INTERVAL:
+            self.reported = now
+            self.throughput.add(sum(self.actions.values()))
+            self.progress(self.progress_snapshot())
+
+    def prefetching(self) -> ExitStack:
+        """Return a context running the prefetch buffers of the workloads."""
+        stack = ExitStack()
+        for workload in self.workloads:
+            if workload.buffer is not None:
+                stack.enter_context(workload.buffer)
+        return stack
+
+    def run(self):
+        """Run the simulation, one step after the other."""
+        self.begin()
+        with self.prefetching():
+            while size := self.claim():
+                if self.limiter is not None:
+                    self.limiter.acquire(size)
+                    if self.limiter.finished:
+                        self.stopped = True
+                        break
+
+                if self.batch_size:
+                    self.run_batch(size)
+                else:
+                    self.run_action()
+
+                self.publish()
+
+                if self.time_action is not None:
+                    time.sleep(random.uniform(0, self.time_action))
+
+        self.end()
+
+    async def run_concurrently(self, concurrency: int):
+        """
+        Run the simulation as ``concurrency`` virtual clients sharing this
+        simulation (action mix, reservoirs, rate limiter and quantity).
+
+        Each virtual client is a coroutine; database calls run in a pool of
+        at most ``MAX_WORKER_THREADS`` threads over the shared
+        ``MongoClient`` pool, so that many operations are in flight at once
+        and the other clients wait for a free thread. Documents are
+        generated in one more thread, the only one using the generators, so
+        Faker and prefetch underruns do not stall the event loop. The
+        ``$sample``s refreshing the reservoirs are queued (see
+        ``refresh_reservoir``) and sent in the request threads in the
+        background; a client only waits for the refresh of an empty
+        reservoir it picks from. Everything else runs in the event loop
+        thread, so the simulation state needs no locks.
+        """
+        loop = asyncio.get_running_loop()
+        refreshes = {}
+
+        async def refresh_reservoir(collection_name: str):
+            document_ids = await loop.run_in_executor(
+                executor,
+                self.simulator.sample_ids,
+                collection_name,
+                RESERVOIR_SAMPLE_SIZE,
+            )
+            self.reservoirs[collection_name].extend(document_ids)
+
+        async def refresh_reservoirs(collection_name: str):
+            while self.pending_refreshes:
+                name = self.pending_refreshes.pop()
+                refreshes[name] = asyncio.create_task(refresh_reservoir(name))
+            refresh = refreshes.get(collection_name)
+            if refresh is not None and not self.reservoirs[collection_name]:
+                await refresh
+
+        async def virtual_client():
+            while size := self.claim():
+                if self.limiter is not None:
+                    while delay := self.limiter.try_acquire(size):
+                        await asyncio.sleep(delay)
+                    if self.limiter.finished:
+                        self.stopped = True
+                        break
+
+                draw = await loop.run_in_executor(
+                    generator, self.draw_step, size
+                )
+                self.get_reservoir(draw.collection_name)
+                await refresh_reservoirs(draw.collection_name)
+                if self.batch_size:
+                    batch = self.prepare_batch(size, draw)
+                    outcome = await loop.run_in_executor(
+                        executor, self.execute_batch, batch
+                    )
+                    self.complete_batch(batch, outcome)
+                else:
+                    operation = self.prepare_action(draw)
+                    outcome = await loop.run_in_executor(
+                        executor, self.execute_action, operation
+                    )
+                    self.complete_action(operation, outcome)
+
+                self.publish()
 
-        loop_count += 1
+                if self.time_action is not None:
+                    await asyncio.sleep(random.uniform(0, self.time_action))
 
-        if time_action is not None:
-            time.sleep(random.uniform(0, time_action))
+        self.begin()
+        self.pending_refreshes = set()
+        try:
+            with self.prefetching(), ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix='generator'
+            ) as generator, ThreadPoolExecutor(
+                max_workers=min(concurrency, MAX_WORKER_THREADS),
+                thread_name_prefix='request',
+            ) as executor:
+                await asyncio.gather(
+                    *(virtual_client() for _ in range(concurrency))
+                )
+                await asyncio.gather(*refreshes.values())
+        finally:
+            self.pending_refreshes = None
+        self.end()
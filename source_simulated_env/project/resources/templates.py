@@ -0,0 +1,121 @@
+import random
+from collections.abc import Callable
+
+import bson
+from bson.objectid import ObjectId
+from bson.raw_bson import RawBSONDocument
+from termcolor import colored
+
+TEMPLATE_POOL_SIZE = 1000
+# A BSON document starts with its int32 length, then each element with its
+# type byte and its null-terminated name: with ``_id`` first, its 12 bytes
+# start right after b'\x07_id\x00'.
+ID_OFFSET = 4 + 1 + len(b'_id\x00')
+ID_END = ID_OFFSET + 12
+
+
+class RawDocument(RawBSONDocument):
+    """
+    A ``RawBSONDocument`` whose ``_id`` is known without decoding it, so
+    pymongo and the simulator can read the id of an insert for free.
+    """
+
+    __slots__ = ('_document_id',)
+
+    def __init__(self, bson_bytes: bytes, document_id: ObjectId):
+        super().__init__(bson_bytes)
+        self._document_id = document_id
+
+    def __getitem__(self, key):
+        if key == '_id':
+            return self._document_id
+        return super().__getitem__(key)
+
+
+def encode_template(document: dict) -> tuple[bytes, bytes]:
+    """
+    Encode a document with a placeholder ``_id`` as its first field.
+
+    Returns:
+        ``tuple:`` The BSON bytes before and after the 12 bytes of the
+        ``_id``.
+    """
+    raw = bson.encode({'_id': ObjectId(), **document})
+    return raw[:ID_OFFSET], raw[ID_END:]
+
+
+def patch_id(template: tuple[bytes, bytes], document_id: ObjectId) -> bytes:
+    """Return the BSON of a template with ``document_id`` as its ``_id``."""
+    head, tail = template
+    return b''.join((head, document_id.binary, tail))
+
+
+class TemplatePool:
+    """
+    A pool of documents of a model pre-encoded to BSON, from which inserts
+    are sent as ``RawBSONDocument``s: only the ``_id`` is written into a
+    copy of a random template, instead of building a dict and encoding it
+    for every insert.
+
+    The templates are generated with ``data_generator_func`` by ``prepare``
+    (``Simulation.begin`` calls it before the clock starts) or else on first
+    use, so they have the shapes of the generated documents; inserts
+    therefore repeat the contents of ``size`` documents, with their own
+    ``_id``.
+
+    Arguments and Attributes:
+        - ``data_generator_func (Callable):`` The ``generator_*_data``
+        function of the simulated model.
+        - ``size (int, optional):`` Number of templates. Default is 1000.
+        - ``rng (Random, optional):`` The random generator to use.
+    """
+
+    def __init__(
+        self,
+        data_generator_func: Callable,
+        size: int = TEMPLATE_POOL_SIZE,
+        rng: random.Random | None = None,
+    ):
+        if size < 1:
+            message_error = colored(
+                f'✗ THE "size" PARAMETER MUST BE A POSITIVE INTEGER.[** "{size}":INVALID **]',
+                'red',
+            )
+            raise ValueError(message_error)
+
+        self.data_generator_func = data_generator_func
+        self.size = size
+        self.rng = rng or random.Random()
+        self.collection_name = None
+        self.templates = []
+
+    def build(self):
+        """Generate and encode the templates."""
+        data_generator = self.data_generator_func(quantity=self.size)
+        self.collection_name, documents = next(iter(data_generator.items()))
+        self.templates = [encode_template(document) for document in documents]
+
+    def prepare(self):
+        """Build the templates unless they are already built."""
+        if not self.templates:
+            self.build()
+
+    def take(self, quantity: int = 1) -> list[RawDocument]:
+        """Return ``quantity`` documents with new ids, ready to insert."""
+        self.prepare()
+
+        documents = []
+        for template in self.rng.choices(self.templates, k=quantity):
+            document_id = ObjectId()
+            documents.append(
+                RawDocument(patch_id(template, document_id), document_id)
+            )
+        return documents
+
+    def __call__(self, quantity: int = 1) -> dict[str, list[RawDocument]]:
+        """
+        Take ``quantity`` documents, in the format of
+        ``data_generator_func``.
+        """
+        documents = self.take(quantity)
+        return {self.collection_name: documents}
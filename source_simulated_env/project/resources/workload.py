@@ -0,0 +1,249 @@
+import random
+from functools import partial
+
+import yaml
+from data_generator import (generator_client_data, generator_delivery_data,
+                            generator_driver_data, generator_location_data,
+                            generator_product_data, generator_vehicle_data)
+from rate_limiter import RateSchedule
+from reservoir import DISTRIBUTIONS
+from simulator import build_action_mix
+from termcolor import colored
+
+GENERATORS = {
+    'driver': generator_driver_data,
+    'vehicle': generator_vehicle_data,
+    'client': generator_client_data,
+    'location': generator_location_data,
+    'product': generator_product_data,
+    'delivery': generator_delivery_data,
+}
+PAYLOAD_FIELD = 'payload'
+# Options of a profile passed as they are to ``simulate_data``.
+SIMULATION_OPTIONS = {
+    'time_action': float,
+    'editing_grade': int,
+    'quantity': int,
+    'duration': float,
+    'rate': float,
+    'key_distribution': str,
+    'key_skew': float,
+    'reservoir_size': int,
+    'batch_size': int,
+    'concurrency': int,
+    'pool_size': int,
+    'prefetch_depth': int,
+    'template_pool_size': int,
+}
+MODEL_OPTIONS = ('weight', 'actions', 'payload_bytes', 'collection')
+
+
+def generate_with_payload(
+    data_generator_func, payload_bytes: int, quantity: int = 1
+) -> dict[str, list[dict]]:
+    """
+    Generate documents with ``data_generator_func`` and pad each of them
+    with a ``PAYLOAD_FIELD`` of ``payload_bytes`` random bytes.
+    """
+    data_generator = data_generator_func(quantity=quantity)
+    for documents in data_generator.values():
+        for document in documents:
+            document[PAYLOAD_FIELD] = random.randbytes(payload_bytes)
+    return data_generator
+
+
+class WorkloadProfile:
+    """
+    A production-shaped load described in one file: the models run
+    together as one weighted stream, the action mix of each model and the
+    options of the run::
+
+        duration: 600
+        rate: 2000
+        key_distribution: zipf
+        key_skew: 1.1
+        batch_size: 50
+        models:
+          delivery:
+            weight: 70
+            actions: {read: 70, update: 20, create: 10}
+            payload_bytes: 512
+          client:
+            weight: 20
+            actions: {lookup: 80, create: 20}
+          driver:
+            weight: 10
+
+    Each model of ``models`` (a key of ``GENERATORS``) takes a ``weight``
+    (its share of the steps, default 1), ``actions`` (a list of actions or
+    a mapping of actions to weights, default create, update and delete),
+    ``payload_bytes`` (random bytes added to every document, to shape the
+    document size) and ``collection`` (instead of the default collection).
+
+    The options of the run are those of ``SIMULATION_OPTIONS``, plus a
+    ``rate_schedule`` (see ``RateSchedule``) instead of a constant ``rate``.
+    The run ends after ``quantity`` actions or ``duration`` seconds,
+    whichever comes first.
+
+    Arguments and Attributes:
+        - ``models (dict):`` The options of each model.
+        - ``options (dict, optional):`` The options of the run.
+    """
+
+    def __init__(self, models: dict, options: dict | None = None):
+        if not isinstance(models, dict) or not models:
+            raise ValueError(
+                colored('✗ THE WORKLOAD PROFILE HAS NO MODELS.', 'red')
+            )
+        self.models = {
+            name: self.validate_model(name, model or {})
+            for name, model in models.items()
+        }
+        self.options = self.validate_options(options or {})
+
+    @staticmethod
+    def validate_model(name: str, model: dict) -> dict:
+        """
+        Check the options of a model and return them with their defaults.
+        """
+        if name not in GENERATORS or not isinstance(model, dict):
+            message_error = colored(
+                f'✗ PROFILE MODELS MUST BE ONE OF {tuple(GENERATORS)} WITH A MAPPING OF OPTIONS.[** "{name}":INVALID **]',
+                'red',
+            )
+            raise ValueError(message_error)
+
+        unknown = set(model) - set(MODEL_OPTIONS)
+        if unknown:
+            message_error = colored(
+                f'✗ PROFILE MODEL OPTIONS MUST BE ONE OF {MODEL_OPTIONS}.[** "{name}": {sorted(unknown)}:INVALID **]',
+                'red',
+            )
+            raise ValueError(message_error)
+
+        actions = model.get('actions')
+        if isinstance(actions, list):
+            actions = {action: 1 for action in actions}
+        build_action_mix(action_weights=actions)
+
+        try:
+            weight = float(model.get('weight', 1))
+            payload_bytes = int(model.get('payload_bytes', 0))
+            valid = weight >= 0 and payload_bytes >= 0
+        except (TypeError, ValueError):
+            valid = False
+        if not valid:
+            message_error = colored(
+                f'✗ PROFILE MODEL "weight" AND "payload_bytes" MUST NOT BE NEGATIVE.[** "{name}": {model}:INVALID **]',
+                'red',
+            )
+            raise ValueError(message_error)
+
+        return {
+            'weight': weight,
+            'actions': actions,
+            'payload_bytes': payload_bytes,
+            'collection': model.get('collection'),
+        }
+
+    @staticmethod
+    def validate_options(options: dict) -> dict:
+        """Check the options of the run and convert them to their types."""
+        validated = {}
+        for option, value in options.items():
+            if option == 'rate_schedule':
+                validated[option] = RateSchedule.from_config(
+                    value
+                ).to_config()
+                continue
+            if option not in SIMULATION_OPTIONS:
+                message_error = colored(
+                    f'✗ PROFILE OPTIONS MUST BE ONE OF {tuple(SIMULATION_OPTIONS)} OR "rate_schedule".[** "{option}":INVALID **]',
+                    'red',
+                )
+                raise ValueError(message_error)
+            try:
+                validated[option] = SIMULATION_OPTIONS[option](value)
+            except (TypeError, ValueError):
+                message_error = colored(
+                    f'✗ THE "{option}" PROFILE OPTION MUST BE OF TYPE {SIMULATION_OPTIONS[option].__name__}.[** "{value}":INVALID **]',
+                    'red',
+                )
+                raise ValueError(message_error)
+
+        distribution = validated.get('key_distribution', 'uniform')
+        if distribution not in DISTRIBUTIONS:
+            message_error = colored(
+                f'✗ THE "key_distribution" PROFILE OPTION MUST BE ONE OF {DISTRIBUTIONS}.[** "{distribution}":INVALID **]',
+                'red',
+            )
+            raise ValueError(message_error)
+        return validated
+
+    @classmethod
+    def from_file(cls, path: str) -> 'WorkloadProfile':
+        """Load a profile from a YAML (or JSON) file."""
+        with open(path, 'r', encoding='utf-8') as profile_file:
+            try:
+                config = yaml.safe_load(profile_file)
+            except yaml.YAMLError as error:
+                message_error = colored(
+                    f'✗ THE WORKLOAD PROFILE IS NOT VALID YAML.[** "{path}": {error}:INVALID **]',
+                    'red',
+                )
+                raise ValueError(message_error)
+        if not isinstance(config, dict):
+            message_error = colored(
+                f'✗ THE WORKLOAD PROFILE MUST BE A MAPPING.[** "{path}":INVALID **]',
+                'red',
+            )
+            raise ValueError(message_error)
+        return cls.from_config(config)
+
+    @classmethod
+    def from_config(cls, config: dict) -> 'WorkloadProfile':
+        """Build a profile from a ``models`` object and the run options."""
+        options = dict(config)
+        models = options.pop('models', None)
+        return cls(models, options)
+
+    def to_config(self) -> dict:
+        """Return the profile as a JSON-serializable object."""
+        return {'models': self.models, **self.options}
+
+    def workloads(self) -> list[dict]:
+        """Return the keyword arguments of the ``Workload`` of each model."""
+        workloads = []
+        for name, model in self.models.items():
+            data_generator_func = GENERATORS[name]
+            if model['collection']:
+                data_generator_func = partial(
+                    data_generator_func, collection_name=model['collection']
+                )
+            if model['payload_bytes']:
+                data_generator_func = partial(
+                    generate_with_payload,
+                    data_generator_func,
+                    model['payload_bytes'],
+                )
+            workloads.append(
+                {
+                    'data_generator_func': data_generator_func,
+                    'action_weights': model['actions'],
+                    'weight': model['weight'],
+                }
+            )
+        return workloads
+
+    def simulation_options(self) -> dict:
+        """Return the keyword arguments of ``simulate_data`` of the run."""
+        options = dict(self.options)
+        options['quantity_interactions'] = options.pop('quantity', None)
+        return options
+
+    def actions(self) -> list[str]:
+        """Return the actions run on any of the models."""
+        actions = {}
+        for model in self.models.values():
+            actions.update(dict.fromkeys(model['actions'] or ()))
+        return list(actions) or ['create', 'update', 'delete']
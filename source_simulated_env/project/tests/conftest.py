@@ -0,0 +1,22 @@
+import actions_db
+import pytest
+
+from project.resources import actions_db as package_actions_db
+
+MONGO_HOST = 'localhost'
+MONGO_PORT = 27017
+
+
+@pytest.fixture
+def mongo_uri():
+    """
+    The URI of an in-process ``mongomock`` server, emptied after use. The
+    resources import each other by flat module names, so their pooled
+    clients live in another copy of ``actions_db`` than the tests' one:
+    both are closed.
+    """
+    mongomock = pytest.importorskip('mongomock')
+    with mongomock.patch(servers=((MONGO_HOST, MONGO_PORT),)):
+        yield f'mongodb://{MONGO_HOST}:{MONGO_PORT}/'
+        actions_db.close_clients()
+        package_actions_db.close_clients()
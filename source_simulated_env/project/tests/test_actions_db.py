@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo import DeleteOne, InsertOne, UpdateOne
+
+from project.resources import actions_db
+from project.resources.actions_db import (MongoDBActions, close_clients,
+                                          date_window, document_paths,
+                                          find_lookup_key, get_client,
+                                          get_path, select_keys_to_update)
+from project.resources.data_generator import (generator_delivery_data,
+                                              generator_location_data,
+                                              generator_vehicle_data)
+
+
+def test_document_paths_of_nested_fields():
+    vehicle = generator_vehicle_data()['VehicleCollection'][0]
+    vehicle['_id'] = 'inserted'
+    assert document_paths(vehicle) == [
+        'name',
+        'vehicle_plate',
+        'dimensions.length',
+        'dimensions.width',
+        'dimensions.height',
+    ]
+
+
+def test_get_path_of_nested_field():
+    location = generator_location_data()['LocationCollection'][0]
+    assert get_path(location, 'coordinates.latitude') == (
+        location['coordinates']['latitude']
+    )
+
+
+@pytest.mark.parametrize(
+    'percent_to_update, default_quantity, expected',
+    [(10, None, 1), (50, None, 5), (100, None, 10), (10, 3, 3), (10, 20, 10)],
+)
+def test_select_keys_to_update_quantity(
+    percent_to_update, default_quantity, expected
+):
+    keys = select_keys_to_update(
+        list(range(10)), percent_to_update, default_quantity
+    )
+    assert len(set(keys)) == expected
+
+
+def test_find_lookup_key_of_nested_field():
+    delivery = generator_delivery_data()['DeliveryCollection'][0]
+    assert find_lookup_key(delivery) == 'client.cnpj'
+    assert find_lookup_key({'name': 'x'}) is None
+
+
+def test_date_window_around_delivery_start():
+    delivery = generator_delivery_data()['DeliveryCollection'][0]
+    start, end = date_window(delivery, timedelta(hours=1))
+    assert start == delivery['data_delivery']['data_start']
+    assert datetime.fromisoformat(end) - datetime.fromisoformat(start) == (
+        timedelta(hours=1)
+    )
+    assert date_window({'name': 'x'}, timedelta(hours=1)) is None
+
+
+def test_get_client_is_pooled_per_process(mongo_uri, monkeypatch):
+    client = get_client(mongo_uri)
+    assert get_client(mongo_uri) is client
+    assert get_client(mongo_uri, max_pool_size=5) is not client
+
+    monkeypatch.setattr(actions_db.os, 'getpid', lambda: -1)
+    forked = get_client(mongo_uri)
+    assert forked is not client
+    assert get_client(mongo_uri) is forked
+
+    close_clients()
+    assert get_client(mongo_uri) is not forked
+
+
+def test_actions_close_keeps_pooled_client_alive(mongo_uri):
+    with MongoDBActions(mongo_uri, 'test') as actions:
+        client = actions.client
+    assert get_client(mongo_uri) is client
+
+    with MongoDBActions(mongo_uri, 'test', keep_alive=False) as actions:
+        client = actions.client
+    assert get_client(mongo_uri) is not client
+
+
+def test_insert_documents_counts_write_errors(mongo_uri):
+    actions = MongoDBActions(mongo_uri, 'test')
+    actions.create_document('Drivers', {'_id': 1})
+
+    result = actions.insert_documents(
+        'Drivers', [{'_id': 1}, {'_id': 2}, {'_id': 1}, {'_id': 3}]
+    )
+    assert result == {'inserted': 2, 'errors': 2}
+    assert actions.db['Drivers'].count_documents({}) == 3
+    assert actions.insert_documents('Drivers', [{'_id': 4}]) == {
+        'inserted': 1,
+        'errors': 0,
+    }
+
+
+def test_bulk_write_reports_write_errors(mongo_uri):
+    actions = MongoDBActions(mongo_uri, 'test')
+    actions.insert_documents('Drivers', [{'_id': 1}, {'_id': 2}])
+
+    summary = actions.bulk_write(
+        'Drivers',
+        [
+            InsertOne({'_id': 1}),
+            InsertOne({'_id': 3}),
+            UpdateOne({'_id': 2}, {'$set': {'name': 'updated'}}),
+            DeleteOne({'_id': 1}),
+        ],
+    )
+    assert summary['nInserted'] == 1
+    assert summary['nModified'] == 1
+    assert summary['nRemoved'] == 1
+    assert [error['index'] for error in summary['writeErrors']] == [0]
+
+    summary = actions.bulk_write('Drivers', [InsertOne({'_id': 4})])
+    assert summary['nInserted'] == 1
+    assert summary['writeErrors'] == []
@@ -0,0 +1,73 @@
+import pytest
+
+from project.resources import benchmark
+from project.resources.benchmark import (ActionBenchmark, baseline_path,
+                                         benchmark_generator, benchmark_target,
+                                         compare_to_baseline, load_baseline,
+                                         open_actions, save_baseline)
+
+
+def test_generator_benchmark_measures_records_per_second(monkeypatch):
+    monkeypatch.setattr(benchmark, 'MIN_RUN_SECONDS', 0)
+
+    result = benchmark_generator('driver', 5, repeat=2)
+
+    assert result['records_per_sec'] > 0
+
+
+def test_baseline_roundtrip_and_comparison(tmp_path):
+    path = str(tmp_path / 'baselines' / 'actions.json')
+    assert load_baseline(path) is None
+
+    save_baseline(
+        'actions', {'read/batch=1': {'ops_per_sec': 100, 'p99': 2.0}}, path
+    )
+    baseline = load_baseline(path)
+
+    results = {
+        'read/batch=1': {'ops_per_sec': 85, 'p99': 2.1},
+        'create/batch=1': {'ops_per_sec': 10, 'p99': 9.0},
+    }
+    comparison = {
+        row['metric']: row['regression']
+        for row in compare_to_baseline(results, baseline, tolerance=0.1)
+    }
+    assert comparison == {
+        'read/batch=1 ops_per_sec': True,
+        'read/batch=1 p99': False,
+    }
+
+
+def test_baselines_are_kept_per_backend(tmp_path):
+    directory = str(tmp_path)
+    in_memory = benchmark_target('actions', in_memory=True)
+    mongodb = benchmark_target('actions')
+    assert benchmark_target('generators', in_memory=True) is None
+    assert baseline_path('generators', directory).endswith('generators.json')
+    assert baseline_path('actions', directory, in_memory).endswith(
+        'actions-inmemory.json'
+    )
+    assert baseline_path('actions', directory, mongodb).endswith(
+        'actions-mongodb.json'
+    )
+
+    path = baseline_path('actions', directory, in_memory)
+    save_baseline('actions', {'read/batch=1': {'p99': 0.1}}, path, in_memory)
+    assert load_baseline(path, in_memory) == {'read/batch=1': {'p99': 0.1}}
+    with pytest.raises(ValueError):
+        load_baseline(path, mongodb)
+
+
+def test_action_benchmark_runs_every_action_in_memory():
+    pytest.importorskip('mongomock')
+
+    with open_actions('', 'benchmark', in_memory=True) as actions:
+        action_benchmark = ActionBenchmark(actions, 'driver', operations=20)
+        for action in benchmark.BENCHMARK_ACTIONS:
+            result = action_benchmark.measure(action, concurrency=2)
+            assert result['ops_per_sec'] > 0
+            assert result['p99'] >= result['p50'] > 0
+
+        action_benchmark.measure('delete', batch_size=8)
+        collection = actions.db[action_benchmark.collection_name]
+        assert collection.count_documents({}) == 0
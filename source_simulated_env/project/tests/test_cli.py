@@ -0,0 +1,56 @@
+import os
+import runpy
+
+import click
+import pytest
+
+CLI_PATH = os.path.join(os.path.dirname(__file__), '..', 'cli', 'cli.py')
+
+
+@pytest.fixture(scope='module')
+def cli():
+    return runpy.run_path(CLI_PATH)['cli']
+
+
+def parse(command, args):
+    with command.make_context(command.name, args) as context:
+        return context.params
+
+
+def test_run_short_options_are_unique(cli):
+    run = cli.commands['simulate-run']
+    short_options = [
+        option
+        for param in run.params
+        for option in param.opts
+        if not option.startswith('--')
+    ]
+    assert len(short_options) == len(set(short_options))
+
+
+def test_run_pool_size_short_option(cli):
+    params = parse(cli.commands['simulate-run'], ['-p', '50', 'driver'])
+
+    assert params['pool_size'] == 50
+    assert params['profile'] is None
+    assert params['models'] == ('driver',)
+
+
+def test_run_parses_action_mix(cli):
+    params = parse(
+        cli.commands['simulate-run'], ['-m', 'read=70,create=30', 'client']
+    )
+    assert params['action_mix'] == {'read': 70.0, 'create': 30.0}
+
+    with pytest.raises(click.BadParameter):
+        parse(cli.commands['simulate-run'], ['-m', 'drop=1', 'client'])
+
+
+def test_run_prefetch_is_opt_in(cli):
+    params = parse(cli.commands['simulate-run'], ['driver'])
+    assert params['prefetch_depth'] == 0
+
+    params = parse(
+        cli.commands['simulate-run'], ['--prefetch', '1000', 'driver']
+    )
+    assert params['prefetch_depth'] == 1000
@@ -0,0 +1,37 @@
+import json
+import logging
+
+from project import config
+
+
+def make_record(level=logging.INFO, message='ADD DOCUMENT'):
+    return logging.LogRecord('SIMULATOR', level, '', 0, message, None, None)
+
+
+def test_sampling_filter_keeps_one_record_out_of_rate():
+    sampling = config.SamplingFilter(rate=10)
+    kept = [sampling.filter(make_record()) for _ in range(100)]
+    assert sum(kept) == 10
+    assert sampling.filter(make_record(logging.WARNING))
+
+
+def test_json_formatter_writes_one_compact_line():
+    line = config.JsonFormatter().format(make_record(message='ADD %s'))
+    assert '\n' not in line
+    assert json.loads(line)['message'] == 'ADD %s'
+
+
+def test_setup_custom_logger_is_idempotent(tmp_path, monkeypatch):
+    path = tmp_path / 'simulate.log'
+    monkeypatch.setattr(config, 'LOG_PATH', str(path))
+    try:
+        config.setup_custom_logger()
+        logger = config.setup_custom_logger(json_lines=True)
+        logger.info('ADD DOCUMENT      [%s - ObjectID: %s]', 'Drivers', 1)
+    finally:
+        config.shutdown_logger()
+
+    assert len(logger.handlers) == 0
+    lines = path.read_text().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0])['message'].endswith('ObjectID: 1]')
@@ -1,11 +1,23 @@
+import threading
+
 import pytest
 
+from project.resources import data_generator
 from project.resources.data_generator import (generator_client_data,
                                               generator_delivery_data,
                                               generator_driver_data,
                                               generator_location_data,
                                               generator_product_data,
-                                              generator_vehicle_data)
+                                              generator_vehicle_data,
+                                              load_municipalities,
+                                              load_product_catalog,
+                                              seed_generators, split_quantity,
+                                              stream_client_data,
+                                              stream_delivery_data,
+                                              stream_driver_data,
+                                              stream_location_data,
+                                              stream_product_data,
+                                              stream_vehicle_data)
 
 GENERATING_FUNCTIONS = [
     generator_driver_data,
@@ -16,6 +28,15 @@ GENERATING_FUNCTIONS = [
     generator_product_data,
 ]
 
+STREAMING_FUNCTIONS = [
+    stream_driver_data,
+    stream_vehicle_data,
+    stream_client_data,
+    stream_delivery_data,
+    stream_location_data,
+    stream_product_data,
+]
+
 
 @pytest.mark.parametrize('generate_function', GENERATING_FUNCTIONS)
 def test_generate_data_result_and_single_key_value_pair(generate_function):
@@ -71,3 +92,114 @@ def test_generate_data_change_collection_name(
     result = generate_function(collection_name=collection_name)
     key = list(result.keys())[0]
     assert key == collection_name
+
+
+def test_load_municipalities_reads_seed_once():
+    table = load_municipalities()
+    assert load_municipalities() is table
+    assert len(table.city_ids) == len(table.city_names) == 5570
+
+
+def test_generate_location_data_from_seed_rows():
+    table = load_municipalities()
+    locations = generator_location_data(quantity=50)['LocationCollection']
+    for location in locations:
+        index = table.city_ids.index(location['city_id'])
+        assert location['city_name'] == table.city_names[index]
+        assert location['coordinates'] == {
+            'latitude': table.latitudes[index],
+            'longitude': table.longitudes[index],
+        }
+        assert isinstance(location['coordinates']['latitude'], str)
+
+
+def test_generate_product_data_does_not_share_catalog_templates():
+    catalog = load_product_catalog()
+    product = generator_product_data()['ProductCollection'][0]
+    product['_id'] = 'inserted'
+    product['dimensions']['width'] = -1
+    assert load_product_catalog() is catalog
+    assert all('_id' not in template for template in catalog)
+    assert all(template['dimensions']['width'] != -1 for template in catalog)
+
+
+def test_generate_delivery_data_locations_and_products():
+    deliveries = generator_delivery_data(quantity=50)['DeliveryCollection']
+    for delivery in deliveries:
+        data_delivery = delivery['data_delivery']
+        assert data_delivery['origin'] != data_delivery['destination']
+        assert 1 <= len(data_delivery['products']) <= 5
+    assert deliveries[0]['data_delivery']['products'] is not (
+        deliveries[1]['data_delivery']['products']
+    )
+
+
+@pytest.mark.parametrize('stream_function', STREAMING_FUNCTIONS)
+def test_stream_data_yields_fixed_size_chunks(stream_function):
+    chunks = list(stream_function(quantity=7, chunk_size=3))
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert all(isinstance(record, dict) for record in chunks[0])
+
+
+@pytest.mark.parametrize('stream_function', STREAMING_FUNCTIONS)
+def test_stream_data_without_quantity_is_endless(stream_function):
+    chunks = stream_function(chunk_size=2)
+    assert [len(next(chunks)) for _ in range(3)] == [2, 2, 2]
+
+
+@pytest.mark.parametrize('stream_function', STREAMING_FUNCTIONS)
+def test_stream_data_with_invalid_chunk_size(stream_function):
+    with pytest.raises(ValueError):
+        stream_function(chunk_size=0)
+
+
+@pytest.mark.parametrize(
+    'total, parts, expected',
+    [(10, 3, [4, 3, 3]), (2, 4, [1, 1, 0, 0]), (9, 1, [9])],
+)
+def test_split_quantity(total, parts, expected):
+    assert split_quantity(total, parts) == expected
+
+
+@pytest.mark.parametrize(
+    'generate_function, key',
+    [
+        (generator_driver_data, 'cnh_number'),
+        (generator_vehicle_data, 'vehicle_plate'),
+        (generator_client_data, 'cnpj'),
+    ],
+)
+def test_business_keys_are_not_pooled(monkeypatch, generate_function, key):
+    monkeypatch.setattr(data_generator, 'FAKER_POOL_SIZE', 10)
+    data_generator.faker_pool.cache_clear()
+
+    (records,) = generate_function(quantity=500).values()
+    data_generator.faker_pool.cache_clear()
+
+    assert len({record[key] for record in records}) > 490
+    assert len({record['name'] for record in records}) <= 100
+
+
+def test_business_keys_are_reproducible():
+    seed_generators(7)
+    first = generator_client_data(quantity=5)
+    seed_generators(7)
+    assert generator_client_data(quantity=5) == first
+
+
+def test_key_fakers_are_not_shared_across_threads():
+    fakers = []
+
+    def draw_keys():
+        fakers.append(data_generator.get_key_faker())
+        generator_client_data(quantity=5)
+
+    threads = [threading.Thread(target=draw_keys) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert data_generator.get_key_faker() is data_generator.get_key_faker()
+    assert len({id(faker) for faker in fakers}) == 2
+    assert data_generator.get_key_faker() not in fakers
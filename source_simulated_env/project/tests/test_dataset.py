@@ -0,0 +1,106 @@
+import gzip
+import json
+
+import bson
+import pytest
+
+from project.resources import dataset
+from project.resources.actions_db import MongoDBActions
+from project.resources.dataset import (Shard, export_dataset, plan_shards,
+                                       seed_database, seed_shard, split_shards)
+
+
+@pytest.mark.parametrize(
+    'quantity, shard_size, expected',
+    [(25, 10, [9, 8, 8]), (10, 10, [10]), (3, 10, [3])],
+)
+def test_split_shards(quantity, shard_size, expected):
+    assert split_shards(quantity, shard_size) == expected
+
+
+def test_plan_shards_splits_quantity():
+    shards = plan_shards('driver', 25, 'out', shard_size=10)
+    assert [shard.quantity for shard in shards] == [9, 8, 8]
+    assert shards[0].path.endswith('driver-00000.jsonl.gz')
+
+    with pytest.raises(ValueError):
+        plan_shards('driver', 25, 'out', file_format='csv')
+
+
+def test_export_dataset_is_reproducible(tmp_path):
+    first = export_dataset(
+        'driver', 300, str(tmp_path / 'a'), shard_size=100, seed=1, processes=1
+    )
+    second = export_dataset(
+        'driver', 300, str(tmp_path / 'b'), shard_size=100, seed=1, processes=2
+    )
+
+    records = [
+        [json.loads(line) for line in gzip.open(path)]
+        for path in first['files'] + second['files']
+    ]
+    assert sum(len(shard) for shard in records) == 600
+    assert records[:3] == records[3:]
+
+
+def test_export_dataset_to_bson(tmp_path):
+    summary = export_dataset(
+        'location',
+        50,
+        str(tmp_path),
+        file_format='bson',
+        compress=False,
+        processes=1,
+    )
+    with open(summary['files'][0], 'rb') as bson_file:
+        documents = bson.decode_all(bson_file.read())
+    assert len(documents) == 50
+    assert summary['bytes'] > 0
+
+
+class InlinePool:
+    """Stand-in for ``multiprocessing.Pool`` running the tasks in-process."""
+
+    def __init__(self, processes, initializer=None, initargs=()):
+        if initializer is not None:
+            initializer(*initargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def imap_unordered(self, func, iterable):
+        return map(func, iterable)
+
+
+def test_seed_shard_inserts_in_batches(mongo_uri):
+    shard = Shard('driver', 0, 25, '')
+    totals = seed_shard(shard, 1, mongo_uri, 'test', 'Drivers', batch_size=10)
+
+    assert totals == {'inserted': 25, 'errors': 0}
+    actions = MongoDBActions(mongo_uri, 'test')
+    assert actions.db['Drivers'].count_documents({}) == 25
+
+
+def test_seed_database_drops_collection_first(mongo_uri, monkeypatch):
+    monkeypatch.setattr(dataset.multiprocessing, 'Pool', InlinePool)
+    actions = MongoDBActions(mongo_uri, 'test')
+    collection = actions.db['DriverCollection']
+    collection.insert_one({'name': 'stale'})
+
+    summary = seed_database(
+        'driver', 30, mongo_uri, 'test', batch_size=5, seed=1, processes=2
+    )
+    assert summary['collection'] == 'DriverCollection'
+    assert summary['inserted'] == 30
+    assert summary['errors'] == 0
+    assert collection.count_documents({}) == 31
+
+    summary = seed_database(
+        'driver', 20, mongo_uri, 'test', batch_size=5, seed=1, drop=True
+    )
+    assert summary['inserted'] == 20
+    assert collection.count_documents({}) == 20
+    assert collection.count_documents({'name': 'stale'}) == 0
@@ -0,0 +1,88 @@
+import pytest
+
+from project.resources.metrics import (LatencyHistogram, MetricsExporter,
+                                       SimulationMetrics, ThroughputWindow)
+
+
+def test_histogram_percentiles_are_within_two_percent():
+    histogram = LatencyHistogram()
+    for value in range(1, 10_001):
+        histogram.record(value / 1_000_000)
+
+    assert histogram.count == 10_000
+    assert histogram.percentile(0.5) == pytest.approx(0.005, rel=0.02)
+    assert histogram.percentile(0.99) == pytest.approx(0.0099, rel=0.02)
+    assert histogram.percentile(1) == 0.01
+
+
+def test_histogram_merge_and_roundtrip():
+    first, second = LatencyHistogram(), LatencyHistogram()
+    first.record(0.001)
+    second.record(0.2)
+    first.merge(second)
+
+    restored = LatencyHistogram.from_dict(first.to_dict())
+    assert restored.count == 2
+    assert restored.max == 200_000
+    assert restored.snapshot() == first.snapshot()
+
+
+def test_histogram_since_earlier_copy():
+    histogram = LatencyHistogram()
+    histogram.record(0.001)
+    earlier = LatencyHistogram()
+    earlier.merge(histogram)
+    for _ in range(99):
+        histogram.record(0.010)
+
+    recent = histogram.since(earlier)
+    assert recent.count == 99
+    assert recent.percentile(0.01) == pytest.approx(0.010, rel=0.02)
+    assert recent.max == histogram.max
+
+
+def test_metrics_merge_and_roundtrip():
+    metrics = SimulationMetrics()
+    metrics.record('Drivers', 'bulk_write', 0.002, operations=0, errors=1)
+    metrics.count('Drivers', 'create', 40)
+    metrics.record_underrun(0.5)
+
+    restored = SimulationMetrics.from_dict(metrics.to_dict())
+    restored.merge(metrics)
+    assert restored.operations[('Drivers', 'create')] == 80
+    assert restored.errors[('Drivers', 'bulk_write')] == 2
+    assert restored.histograms[('Drivers', 'bulk_write')].count == 2
+    assert restored.underruns == 2
+
+
+def test_metrics_export_prometheus_file(tmp_path):
+    metrics = SimulationMetrics()
+    metrics.record('drivers', 'create', 0.002)
+    metrics.record('drivers', 'bulk_write', 0.01, operations=0, errors=1)
+    metrics.count('drivers', 'update', 5)
+
+    path = tmp_path / 'simulate.prom'
+    MetricsExporter(metrics, str(path)).export()
+    text = path.read_text()
+
+    assert (
+        'simulator_operations_total{collection="drivers",action="update"} 5'
+        in text
+    )
+    assert (
+        'simulator_errors_total{collection="drivers",action="bulk_write"} 1'
+        in text
+    )
+    assert (
+        'simulator_operations_total{collection="drivers",action="bulk_write"}'
+        not in text
+    )
+    assert 'quantile="0.99"' in text
+
+
+def test_throughput_window_only_counts_recent_operations():
+    clock = iter([0, 5, 10, 20, 25])
+    window = ThroughputWindow(window=10, clock=lambda: next(clock))
+    for operations in (0, 100, 200, 1200, 1700):
+        window.add(operations)
+    assert window.rate() == 100.0
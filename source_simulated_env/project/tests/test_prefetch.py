@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from project.resources.metrics import SimulationMetrics
+from project.resources.prefetch import PrefetchBuffer
+
+
+def counting_generator():
+    counter = iter(range(1_000_000))
+
+    def generate(quantity=1):
+        return {'Collection': [{'n': next(counter)} for _ in range(quantity)]}
+
+    return generate
+
+
+def test_prefetch_buffer_returns_documents_in_order():
+    with PrefetchBuffer(counting_generator(), depth=10, chunk_size=4) as buffer:
+        first = buffer(quantity=3)['Collection']
+        second = buffer(quantity=6)['Collection']
+    assert [document['n'] for document in first + second] == list(range(9))
+
+
+def test_prefetch_buffer_records_underruns():
+    def slow_generator(quantity=1):
+        time.sleep(0.05)
+        return {'Collection': [{}] * quantity}
+
+    metrics = SimulationMetrics()
+    buffer = PrefetchBuffer(slow_generator, depth=1, metrics=metrics)
+    buffer()
+    buffer.stop()
+    assert buffer.underruns == metrics.underruns == 1
+
+
+def test_prefetch_buffer_raises_generator_errors():
+    def failing_generator(quantity=1):
+        raise RuntimeError('generator failed')
+
+    with PrefetchBuffer(failing_generator) as buffer:
+        with pytest.raises(RuntimeError):
+            buffer()
+
+
+def test_prefetch_buffer_rejects_empty_depth():
+    with pytest.raises(ValueError):
+        PrefetchBuffer(counting_generator(), depth=0)
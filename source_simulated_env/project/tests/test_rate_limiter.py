@@ -0,0 +1,70 @@
+import pytest
+
+from project.resources.rate_limiter import RateLimiter, RateSchedule
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_rate_limiter_paces_to_rate():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=100, clock=clock)
+    acquired = 0
+    while clock.now < 10:
+        if limiter.try_acquire() == 0:
+            acquired += 1
+        else:
+            clock.now += 0.001
+    assert 1000 <= acquired <= 1011
+
+
+def test_rate_limiter_accepts_batches_larger_than_bucket():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=10, clock=clock)
+    assert limiter.try_acquire(50) == 0
+    assert limiter.try_acquire() > 0
+    clock.now += 5
+    assert limiter.try_acquire() == 0
+
+
+def test_rate_schedule_ramps_and_plateaus():
+    schedule = RateSchedule(
+        [
+            {'duration': 10, 'start_rate': 0, 'end_rate': 100},
+            {'duration': 5, 'rate': 500},
+        ]
+    )
+    assert schedule.duration == 15
+    assert schedule.rate_at(5) == pytest.approx(50)
+    assert schedule.rate_at(12) == 500
+    assert schedule.rate_at(15) is None
+
+
+def test_repeating_rate_schedule_starts_over():
+    schedule = RateSchedule.from_config(
+        {'phases': [{'duration': 10, 'rate': 1}], 'repeat': True}
+    )
+    assert schedule.rate_at(25) == 1
+
+
+def test_rate_limiter_finishes_with_schedule():
+    clock = FakeClock()
+    limiter = RateLimiter(
+        schedule=RateSchedule([{'duration': 1, 'rate': 10}]), clock=clock
+    )
+    clock.now = 2
+    limiter.try_acquire()
+    assert limiter.finished
+
+
+@pytest.mark.parametrize(
+    'phase', [{'rate': 10}, {'duration': 0, 'rate': 1}, {'duration': 1}]
+)
+def test_rate_schedule_with_invalid_phase(phase):
+    with pytest.raises(ValueError):
+        RateSchedule([phase])
@@ -0,0 +1,110 @@
+import logging
+import sqlite3
+
+import pytest
+
+from project.resources import tasks
+from project.resources.registry import TaskRegistry
+
+
+class InMemoryRedis:
+    """Stand-in for the hash commands of a ``Redis`` client."""
+
+    def __init__(self):
+        self.hashes = {}
+
+    def hset(self, key, field, value):
+        self.hashes.setdefault(key, {})[field.encode()] = value.encode()
+
+    def hsetnx(self, key, field, value):
+        if field.encode() not in self.hashes.get(key, {}):
+            self.hset(key, field, value)
+
+    def hdel(self, key, *fields):
+        fields = [field.encode() for field in fields]
+        hash = self.hashes.get(key, {})
+        return sum(hash.pop(field, None) is not None for field in fields)
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def hkeys(self, key):
+        return list(self.hashes.get(key, {}))
+
+    def delete(self, key):
+        self.hashes.pop(key, None)
+
+    def pipeline(self):
+        return InMemoryPipeline(self)
+
+
+class InMemoryPipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    def execute(self):
+        for name, args in self.commands:
+            getattr(self.client, name)(*args)
+
+
+def test_registry_adds_and_removes_tasks():
+    registry = TaskRegistry(InMemoryRedis())
+    registry.add(TaskRegistry.entry('b', 'simulate', (1, None), 'w1', 20.0))
+    registry.add(TaskRegistry.entry('a', 'simulate', (2, None), 'w2', 10.0))
+
+    assert [task['id'] for task in registry.tasks()] == ['a', 'b']
+    assert registry.tasks()[0]['args'] == [2, None]
+
+    registry.add(TaskRegistry.entry('a', 'simulate', (2, None), 'w1', 30.0))
+    assert registry.tasks()[0]['time_start'] == 10.0
+    assert sorted(registry.task_ids()) == ['a', 'b']
+
+    assert registry.remove('a', 'missing') == 1
+    assert registry.remove() == 0
+    assert registry.task_ids() == ['b']
+
+
+def test_registry_remove_worker_and_replace():
+    registry = TaskRegistry(InMemoryRedis())
+    registry.add(TaskRegistry.entry('a', 'simulate', (), 'w1'))
+    registry.add(TaskRegistry.entry('b', 'simulate', (), 'w2'))
+
+    assert registry.remove_worker('w1') == 1
+    assert registry.task_ids() == ['b']
+
+    registry.replace([TaskRegistry.entry('c', 'simulate', (), 'w1')])
+    assert registry.task_ids() == ['c']
+
+
+@pytest.mark.parametrize('terminate', [True, False])
+def test_revoke_tasks_keeps_gracefully_revoked_tasks(monkeypatch, terminate):
+    registry = TaskRegistry(InMemoryRedis())
+    registry.add(TaskRegistry.entry('a', 'simulate', (), 'w1'))
+    revoked = []
+    monkeypatch.setattr(tasks, 'get_registry', lambda: registry)
+    monkeypatch.setattr(
+        tasks.app.control,
+        'revoke',
+        lambda task_ids, terminate: revoked.append((task_ids, terminate)),
+    )
+
+    assert tasks.revoke_tasks(['a', 'missing'], terminate) == ['a']
+    assert revoked == [(['a'], terminate)]
+    assert registry.task_ids() == ([] if terminate else ['a'])
+
+
+def test_record_run_logs_unsaved_results(monkeypatch, caplog):
+    class FailingStore:
+        def save(self, *args):
+            raise sqlite3.OperationalError('database is locked')
+
+    monkeypatch.setattr(tasks, 'ResultsStore', FailingStore)
+
+    with caplog.at_level(logging.WARNING, logger='SIMULATOR'):
+        tasks.record_run('a', 'simulate_driver_data', {}, {})
+
+    assert 'RESULTS OF TASK a NOT SAVED: database is locked' in caplog.text
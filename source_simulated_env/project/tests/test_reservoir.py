@@ -0,0 +1,69 @@
+import random
+from collections import Counter
+
+import pytest
+
+from project.resources.reservoir import IdReservoir
+
+
+def test_reservoir_add_discard_and_choose():
+    reservoir = IdReservoir(capacity=10)
+    reservoir.extend(range(5))
+    reservoir.discard(1)
+    reservoir.discard(42)
+    assert len(reservoir) == 4 and 1 not in reservoir
+    assert all(reservoir.choose() in {0, 2, 3, 4} for _ in range(100))
+
+
+def test_empty_reservoir_choose_returns_none():
+    assert IdReservoir().choose() is None
+
+
+def test_reservoir_keeps_capacity():
+    reservoir = IdReservoir(capacity=10, rng=random.Random(1))
+    reservoir.extend(range(1000))
+    assert len(reservoir) == 10 and reservoir.seen == 1000
+    assert len(set(reservoir)) == 10
+
+
+def test_reservoir_with_invalid_distribution():
+    with pytest.raises(ValueError):
+        IdReservoir(distribution='normal')
+
+
+@pytest.mark.parametrize('distribution', ['zipf', 'hotset'])
+def test_skewed_distributions_favor_recent_ids(distribution):
+    reservoir = IdReservoir(distribution=distribution, rng=random.Random(1))
+    reservoir.extend(range(100))
+    picks = Counter(reservoir.choose() for _ in range(10_000))
+    recent = sum(picks[id] for id in range(80, 100))
+    assert recent > 5000
+
+
+def test_reservoir_keeps_insertion_order_after_discards():
+    reservoir = IdReservoir(capacity=100, rng=random.Random(1))
+    reservoir.extend(range(100))
+    for document_id in range(0, 100, 3):
+        reservoir.discard(document_id)
+    reservoir.extend(range(100, 200))
+
+    ids = list(reservoir)
+    assert len(ids) == 100
+    assert ids == sorted(ids)
+
+
+@pytest.mark.parametrize('distribution', ['zipf', 'hotset'])
+def test_skewed_distributions_favor_newest_ids_after_discards(distribution):
+    reservoir = IdReservoir(
+        capacity=100, distribution=distribution, rng=random.Random(1)
+    )
+    reservoir.extend(range(100))
+    for document_id in range(0, 90, 2):
+        reservoir.discard(document_id)
+    reservoir.extend(range(100, 120))
+
+    ids = list(reservoir)
+    picks = Counter(reservoir.choose() for _ in range(10_000))
+    newest = sum(picks[document_id] for document_id in ids[-20:])
+    assert newest > 5000
+    assert picks[ids[-1]] > picks[ids[0]]
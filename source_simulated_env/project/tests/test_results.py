@@ -0,0 +1,71 @@
+from project.resources.metrics import LatencyHistogram
+from project.resources.results import ResultsStore, compare_runs, diff_configs
+
+
+def make_summary(operations, wall_time, latency, errors=0):
+    histogram = LatencyHistogram()
+    for _ in range(operations):
+        histogram.record(latency)
+    return {
+        'operations': operations,
+        'actions': {'create': operations},
+        'errors': errors,
+        'wall_time': wall_time,
+        'ops_per_sec': operations / wall_time,
+        'latency': {'create': histogram.snapshot()},
+        'histograms': {'create': histogram.to_dict()},
+    }
+
+
+def test_store_saves_and_lists_runs(tmp_path):
+    store = ResultsStore(str(tmp_path / 'results' / 'runs.sqlite3'))
+    first = store.save(
+        'simulate_driver_data',
+        {'rate': 100},
+        make_summary(100, 10, 0.002),
+        task_id='a',
+        label='wiredtiger',
+    )
+    second = store.save(
+        'simulate_client_data', {'rate': 200}, make_summary(50, 10, 0.004)
+    )
+
+    assert [run['id'] for run in store.runs()] == [second, first]
+    assert [run['id'] for run in store.runs(label='wiredtiger')] == [first]
+    assert [run['id'] for run in store.runs(task_name='client')] == [second]
+
+    run = store.get(first)
+    assert run['task_id'] == 'a'
+    assert run['config'] == {'rate': 100}
+    assert run['ops_per_sec'] == 10
+    assert 1.9 < run['p99'] < 2.1
+    assert run['summary']['actions'] == {'create': 100}
+    assert store.get(42) is None
+
+
+def test_compare_runs_flags_regressions_beyond_threshold(tmp_path):
+    store = ResultsStore(str(tmp_path / 'runs.sqlite3'))
+    baseline = store.get(
+        store.save('simulate', {'rate': 100}, make_summary(100, 10, 0.002))
+    )
+    candidate = store.get(
+        store.save(
+            'simulate',
+            {'rate': 200},
+            make_summary(95, 10, 0.003, errors=1),
+        )
+    )
+
+    comparison = {
+        row['metric']: row for row in compare_runs(baseline, candidate, 0.1)
+    }
+    assert not comparison['ops_per_sec']['regression']
+    assert comparison['p99']['regression']
+    assert comparison['create p99']['regression']
+    assert comparison['error_rate']['change'] is None
+    assert comparison['error_rate']['regression']
+
+    comparison = compare_runs(candidate, baseline, 0.1)
+    assert not any(row['regression'] for row in comparison)
+
+    assert diff_configs(baseline, candidate) == [('rate', 100, 200)]
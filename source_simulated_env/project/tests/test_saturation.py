@@ -0,0 +1,64 @@
+import pytest
+
+from project.resources.metrics import SimulationMetrics
+from project.resources.saturation import SaturationSearch
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def run_step(search, clock, metrics, operations, latency):
+    for _ in range(100):
+        metrics.record('Drivers', 'create', latency)
+    clock.now += search.interval
+    return search.update(metrics, operations)
+
+
+def test_saturation_search_increases_then_backs_off():
+    clock = FakeClock()
+    metrics = SimulationMetrics()
+    search = SaturationSearch(
+        target_p99=10, start_rate=100, increase=50, max_backoffs=2, clock=clock
+    )
+    search.start(metrics, 0)
+
+    assert run_step(search, clock, metrics, 250, 0.5) == 100  # warm-up
+    assert run_step(search, clock, metrics, 750, 0.002) == 150
+    assert run_step(search, clock, metrics, 1500, 0.002) == 200
+    assert run_step(search, clock, metrics, 2500, 0.050) == 100
+    assert not search.finished
+    assert run_step(search, clock, metrics, 3000, 0.002) == 150
+    assert run_step(search, clock, metrics, 3200, 0.002) == 75
+    assert search.finished
+
+    report = search.report()
+    assert report['max_throughput'] == 150
+    assert report['max_rate'] == 150
+    assert [step['sustained'] for step in report['steps']] == [
+        True,
+        True,
+        False,
+        True,
+        False,
+    ]
+
+
+def test_saturation_search_waits_for_the_end_of_a_step():
+    clock = FakeClock()
+    search = SaturationSearch(clock=clock)
+    search.start(SimulationMetrics(), 0)
+    clock.now = search.interval / 2
+    assert search.update(SimulationMetrics(), 10) is None
+
+
+@pytest.mark.parametrize(
+    'options', [{'target_p99': 0}, {'backoff': 1}, {'interval': -1}]
+)
+def test_saturation_search_rejects_invalid_options(options):
+    with pytest.raises(ValueError):
+        SaturationSearch(**options)
@@ -0,0 +1,413 @@
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+from bson.objectid import ObjectId
+from bson.raw_bson import RawBSONDocument
+
+from project.resources import simulator
+from project.resources.data_generator import (generator_delivery_data,
+                                              generator_driver_data,
+                                              generator_vehicle_data)
+from project.resources.simulator import (Simulation, build_action_mix,
+                                         merge_summaries)
+
+
+class InMemoryActions:
+    """Stand-in for ``MongoDBActions`` keeping documents in a dict."""
+
+    def __init__(self):
+        self.collections = {}
+
+    def sample_ids(self, collection_name, size):
+        return list(self.collections.get(collection_name, {}))[:size]
+
+    def create_document(self, collection_name, document):
+        if '_id' not in document:
+            document['_id'] = ObjectId()
+        self.collections.setdefault(collection_name, {})[
+            document['_id']
+        ] = document
+        return document['_id']
+
+    def update_document(self, collection_name, document, **kwargs):
+        target_id = kwargs['target_id']
+        if target_id in self.collections.get(collection_name, {}):
+            return target_id
+        return None
+
+    def delete_document(self, collection_name, target_id=None, **kwargs):
+        self.collections.get(collection_name, {}).pop(target_id, None)
+        return target_id
+
+    def ensure_read_indexes(self, collection_name, document):
+        pass
+
+    def read_document(self, collection_name, target_id):
+        return int(target_id in self.collections.get(collection_name, {}))
+
+    def lookup_documents(self, collection_name, document):
+        return 1
+
+    def range_documents(self, collection_name, document, target_id=None):
+        return len(self.collections.get(collection_name, {}))
+
+    aggregate_documents = range_documents
+
+
+def test_build_action_mix_weights():
+    actions, cum_weights = build_action_mix(
+        ['create'], {'read': 70, 'update': 20, 'create': 10}
+    )
+    assert actions == ('read', 'update', 'create')
+    assert cum_weights == (70, 90, 100)
+    assert build_action_mix() == (('create', 'update', 'delete'), (1, 2, 3))
+
+
+@pytest.mark.parametrize(
+    'action_weights', [{'scan': 1}, {'read': -1}, {'read': 0}]
+)
+def test_build_action_mix_rejects_invalid_weights(action_weights):
+    with pytest.raises(ValueError):
+        build_action_mix(action_weights=action_weights)
+
+
+def test_merge_summaries():
+    summaries = [
+        {
+            'operations': 10,
+            'actions': {'create': 6, 'delete': 4},
+            'errors': 1,
+            'wall_time': 2.0,
+            'ops_per_sec': 5.0,
+        },
+        {
+            'operations': 30,
+            'actions': {'create': 30},
+            'errors': 0,
+            'wall_time': 4.0,
+            'ops_per_sec': 7.5,
+        },
+    ]
+    merged = merge_summaries(summaries)
+    assert merged['operations'] == 40
+    assert merged['actions'] == {'create': 36, 'delete': 4}
+    assert merged['errors'] == 1
+    assert merged['ops_per_sec'] == 10.0
+
+
+def test_simulation_tracks_known_documents():
+    actions = InMemoryActions()
+    simulation = Simulation(
+        actions,
+        logging.getLogger('TEST'),
+        generator_vehicle_data,
+        quantity_interactions=200,
+    )
+    simulation.run()
+
+    summary = simulation.summary()
+    documents = actions.collections['VehicleCollection']
+    assert summary['operations'] == 200
+    assert set(simulation.reservoirs['VehicleCollection']) == set(
+        documents
+    )
+
+
+def test_simulation_reports_progress():
+    reports = []
+    simulation = Simulation(
+        InMemoryActions(),
+        logging.getLogger('TEST'),
+        generator_vehicle_data,
+        quantity_interactions=50,
+        progress=reports.append,
+    )
+    simulation.run()
+
+    assert reports
+    assert reports[0]['operations'] == 1
+    assert reports[0]['quantity'] == 50
+    assert simulation.progress_snapshot()['operations'] == 50
+
+
+def test_simulation_with_prefetch_buffer():
+    actions = InMemoryActions()
+    simulation = Simulation(
+        actions,
+        logging.getLogger('TEST'),
+        generator_vehicle_data,
+        quantity_interactions=95,
+        prefetch_depth=20,
+    )
+    simulation.run()
+    assert simulation.summary()['operations'] == 95
+    assert simulation.workloads[0].buffer._thread is None
+
+
+def test_simulation_inserts_templates():
+    actions = InMemoryActions()
+    simulation = Simulation(
+        actions,
+        logging.getLogger('TEST'),
+        generator_vehicle_data,
+        custom_actions=['create'],
+        quantity_interactions=20,
+        template_pool_size=5,
+    )
+    simulation.run()
+
+    documents = actions.collections['VehicleCollection']
+    assert len(documents) == 20
+    assert all(
+        isinstance(document, RawBSONDocument)
+        for document in documents.values()
+    )
+
+
+def test_simulation_with_read_mix():
+    actions = InMemoryActions()
+    simulation = Simulation(
+        actions,
+        logging.getLogger('TEST'),
+        generator_vehicle_data,
+        quantity_interactions=300,
+        action_weights={'create': 20, 'read': 60, 'lookup': 10, 'range': 10},
+    )
+    simulation.run()
+
+    summary = simulation.summary()
+    assert summary['operations'] == 300
+    assert summary['errors'] == 0
+    assert set(summary['actions']) <= {'create', 'read', 'lookup', 'range'}
+    assert summary['actions']['read'] > summary['actions']['lookup']
+
+
+def test_simulation_spreads_steps_over_workloads():
+    actions = InMemoryActions()
+    simulation = Simulation(
+        actions,
+        logging.getLogger('TEST'),
+        None,
+        quantity_interactions=400,
+        workloads=[
+            {'data_generator_func': generator_vehicle_data, 'weight': 3},
+            {
+                'data_generator_func': generator_driver_data,
+                'action_weights': {'create': 1},
+            },
+        ],
+    )
+    simulation.run()
+
+    assert simulation.summary()['operations'] == 400
+    drivers = len(actions.collections['DriverCollection'])
+    assert 50 < drivers < 150
+
+
+def test_simulation_stops_after_duration():
+    simulation = Simulation(
+        InMemoryActions(),
+        logging.getLogger('TEST'),
+        generator_vehicle_data,
+        time_action=0.01,
+        duration=0.1,
+    )
+    simulation.run()
+    assert 0.1 <= simulation.summary()['wall_time'] < 1
+
+
+def test_simulation_resumes_from_checkpoints():
+    actions = InMemoryActions()
+    checkpoint = None
+    slices = 0
+    while True:
+        simulation = Simulation(
+            actions,
+            logging.getLogger('TEST'),
+            generator_vehicle_data,
+            quantity_interactions=100,
+            slice_operations=30,
+        )
+        if checkpoint:
+            simulation.restore(checkpoint)
+        simulation.run()
+        slices += 1
+        if not simulation.paused:
+            break
+        checkpoint = simulation.checkpoint()
+        assert checkpoint['claimed'] == 30 * slices
+
+    summary = simulation.summary()
+    assert slices == simulation.slices == 4
+    assert summary['operations'] == 100
+    latency = summary['latency']['create']
+    assert latency['count'] == summary['actions']['create']
+
+
+def test_simulation_runs_concurrently_on_capped_threads(monkeypatch):
+    monkeypatch.setattr(simulator, 'MAX_WORKER_THREADS', 2)
+    request_threads = set()
+    generator_threads = set()
+
+    class ThreadedActions(InMemoryActions):
+        def create_document(self, collection_name, document):
+            request_threads.add(threading.current_thread().name)
+            return super().create_document(collection_name, document)
+
+    def generator_func(quantity=1):
+        generator_threads.add(threading.current_thread().name)
+        return generator_vehicle_data(quantity=quantity)
+
+    actions = ThreadedActions()
+    simulation = Simulation(
+        actions,
+        logging.getLogger('TEST'),
+        generator_func,
+        custom_actions=['create'],
+        quantity_interactions=200,
+    )
+    asyncio.run(simulation.run_concurrently(16))
+
+    assert simulation.summary()['operations'] == 200
+    assert len(actions.collections['VehicleCollection']) == 200
+    assert 0 < len(request_threads) <= 2
+    assert all(name.startswith('request') for name in request_threads)
+    assert all(name.startswith('generator') for name in generator_threads)
+
+
+def test_simulate_data_sizes_the_pool_to_the_threads(monkeypatch):
+    pool_sizes = []
+
+    class PooledActions(InMemoryActions):
+        def __init__(self, db_address, db_name, max_pool_size, **kwargs):
+            super().__init__()
+            pool_sizes.append(max_pool_size)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *args):
+            pass
+
+    monkeypatch.setattr(simulator, 'MongoDBActions', PooledActions)
+    monkeypatch.setattr(
+        simulator,
+        'setup_custom_logger',
+        lambda *args: logging.getLogger('TEST'),
+    )
+    for concurrency in (1, 16, 1000):
+        simulator.simulate_data(
+            '',
+            'test',
+            generator_vehicle_data,
+            pool_size=10,
+            quantity_interactions=20,
+            concurrency=concurrency,
+            metrics_interval=None,
+        )
+
+    assert pool_sizes == [10, 16, simulator.MAX_WORKER_THREADS]
+
+
+def test_simulation_removes_metrics_file_when_finished(tmp_path):
+    path = tmp_path / 'simulate.prom'
+    actions = InMemoryActions()
+    simulation = Simulation(
+        actions,
+        logging.getLogger('TEST'),
+        generator_vehicle_data,
+        quantity_interactions=20,
+        slice_operations=10,
+        metrics_path=str(path),
+    )
+    simulation.run()
+    assert simulation.paused
+    assert 'simulator_operations_total' in path.read_text()
+
+    checkpoint = simulation.checkpoint()
+    simulation = Simulation(
+        actions,
+        logging.getLogger('TEST'),
+        generator_vehicle_data,
+        quantity_interactions=20,
+        slice_operations=10,
+        metrics_path=str(path),
+    )
+    simulation.restore(checkpoint)
+    simulation.run()
+    assert not simulation.paused
+    assert not path.exists()
+
+
+def test_simulation_builds_templates_before_the_clock_starts():
+    build_seconds = 0.2
+
+    def slow_generator_func(quantity=1):
+        if quantity == 50:
+            time.sleep(build_seconds)
+        return generator_vehicle_data(quantity=quantity)
+
+    simulation = Simulation(
+        InMemoryActions(),
+        logging.getLogger('TEST'),
+        slow_generator_func,
+        custom_actions=['create'],
+        quantity_interactions=10,
+        template_pool_size=50,
+    )
+    simulation.run()
+
+    assert len(simulation.workloads[0].templates.templates) == 50
+    summary = simulation.summary()
+    assert summary['operations'] == 10
+    assert summary['wall_time'] < build_seconds
+
+
+def test_simulation_keeps_reads_on_an_empty_collection():
+    actions = InMemoryActions()
+    simulation = Simulation(
+        actions,
+        logging.getLogger('TEST'),
+        generator_delivery_data,
+        quantity_interactions=60,
+        action_weights={'read': 1, 'range': 1, 'aggregate': 1},
+    )
+    simulation.run()
+
+    summary = simulation.summary()
+    assert summary['operations'] == 60
+    assert set(summary['actions']) == {'read', 'range', 'aggregate'}
+    assert summary['errors'] == 0
+    assert not actions.collections
+
+
+def test_concurrent_simulation_samples_reservoirs_off_the_loop(monkeypatch):
+    monkeypatch.setattr(simulator, 'RESERVOIR_REFRESH_INTERVAL', 20)
+    sample_threads = []
+
+    class ThreadedActions(InMemoryActions):
+        def sample_ids(self, collection_name, size):
+            sample_threads.append(threading.current_thread().name)
+            return super().sample_ids(collection_name, size)
+
+    actions = ThreadedActions()
+    for _ in range(10):
+        actions.create_document('VehicleCollection', {})
+    simulation = Simulation(
+        actions,
+        logging.getLogger('TEST'),
+        generator_vehicle_data,
+        custom_actions=['update'],
+        quantity_interactions=100,
+    )
+    asyncio.run(simulation.run_concurrently(4))
+
+    summary = simulation.summary()
+    assert summary['actions'] == {'update': 100}
+    assert len(actions.collections['VehicleCollection']) == 10
+    assert len(sample_threads) > 1
+    assert all(name.startswith('request') for name in sample_threads)
+    assert simulation.pending_refreshes is None
@@ -0,0 +1,41 @@
+import bson
+import pytest
+from bson.objectid import ObjectId
+
+from project.resources.data_generator import generator_delivery_data
+from project.resources.templates import (RawDocument, TemplatePool,
+                                         encode_template, patch_id)
+
+
+def test_patch_id_replaces_only_the_id():
+    document = {'name': 'Truck', 'dimensions': {'length': 1.5}}
+    document_id = ObjectId()
+    decoded = bson.decode(patch_id(encode_template(document), document_id))
+    assert decoded == {'_id': document_id, **document}
+
+
+def test_template_pool_takes_documents_with_new_ids():
+    pool = TemplatePool(generator_delivery_data, size=3)
+    data = pool(quantity=10)
+    documents = data['DeliveryCollection']
+
+    assert len({document['_id'] for document in documents}) == 10
+    assert all(isinstance(document, RawDocument) for document in documents)
+    assert bson.decode(documents[0].raw)['_id'] == documents[0]['_id']
+    assert 'data_delivery' in documents[0]
+
+
+def test_template_pool_rejects_empty_size():
+    with pytest.raises(ValueError):
+        TemplatePool(generator_delivery_data, size=0)
+
+
+def test_template_pool_is_built_once():
+    pool = TemplatePool(generator_delivery_data, size=3)
+    pool.prepare()
+    templates = pool.templates
+    assert len(templates) == 3
+
+    pool.prepare()
+    pool.take(5)
+    assert pool.templates is templates
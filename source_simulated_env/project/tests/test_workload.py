@@ -0,0 +1,65 @@
+import pytest
+
+from project.resources.data_generator import generator_driver_data
+from project.resources.workload import (PAYLOAD_FIELD, WorkloadProfile,
+                                        generate_with_payload)
+
+PROFILE = """
+duration: 60
+quantity: 1000
+key_distribution: zipf
+models:
+  delivery:
+    weight: 70
+    actions: {read: 70, update: 20, create: 10}
+    payload_bytes: 64
+  driver:
+    actions: [create, lookup]
+"""
+
+
+def test_profile_from_yaml_file(tmp_path):
+    path = tmp_path / 'profile.yaml'
+    path.write_text(PROFILE)
+    profile = WorkloadProfile.from_file(str(path))
+
+    assert profile.models['driver']['weight'] == 1
+    assert profile.models['driver']['actions'] == {'create': 1, 'lookup': 1}
+    assert profile.actions() == ['read', 'update', 'create', 'lookup']
+    assert profile.simulation_options() == {
+        'duration': 60.0,
+        'quantity_interactions': 1000,
+        'key_distribution': 'zipf',
+    }
+    assert WorkloadProfile.from_config(profile.to_config()).models == (
+        profile.models
+    )
+
+    delivery, driver = profile.workloads()
+    assert delivery['weight'] == 70
+    (document,) = delivery['data_generator_func']()['DeliveryCollection']
+    assert len(document[PAYLOAD_FIELD]) == 64
+
+
+@pytest.mark.parametrize(
+    'config',
+    [
+        {'models': {}},
+        {'models': {'truck': {}}},
+        {'models': {'driver': {'weight': -1}}},
+        {'models': {'driver': {'actions': {'scan': 1}}}},
+        {'models': {'driver': {'size': 10}}},
+        {'models': {'driver': {}}, 'rate': 'fast'},
+        {'models': {'driver': {}}, 'threads': 4},
+    ],
+)
+def test_invalid_profiles(config):
+    with pytest.raises(ValueError):
+        WorkloadProfile.from_config(config)
+
+
+def test_generate_with_payload():
+    data = generate_with_payload(generator_driver_data, 10, quantity=3)
+    assert all(
+        len(driver[PAYLOAD_FIELD]) == 10 for driver in data['DriverCollection']
+    )